@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-18 19:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('rooms', '0002_alter_room_is_available_alter_room_number_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(help_text='Night the figures belong to.', unique=True)),
+                ('nights_sold', models.PositiveIntegerField(default=0, help_text='Room nights sold.')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, help_text='Room revenue earned.', max_digits=14)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RoomDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(help_text='Night the figures belong to.')),
+                ('nights_sold', models.PositiveIntegerField(default=0, help_text='Room nights sold.')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, help_text='Room revenue earned.', max_digits=12)),
+                ('room', models.ForeignKey(help_text='Room the figures belong to.', on_delete=django.db.models.deletion.CASCADE, to='rooms.room')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'room'), name='roomdailystat_day_room_uniq')],
+            },
+        ),
+    ]
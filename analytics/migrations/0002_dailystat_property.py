@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-18 20:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+        ('rooms', '0004_property'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailystat',
+            name='property',
+            field=models.ForeignKey(db_index=False, default=1, help_text='Property the figures belong to.', on_delete=django.db.models.deletion.CASCADE, to='rooms.property'),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='dailystat',
+            name='day',
+            field=models.DateField(help_text='Night the figures belong to.'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailystat',
+            constraint=models.UniqueConstraint(fields=('property', 'day'), name='dailystat_property_day_uniq'),
+        ),
+    ]
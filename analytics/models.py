@@ -0,0 +1,36 @@
+from django.db import models
+from rooms.models import Property, Room
+
+class DailyStat(models.Model):
+    """Nights sold and revenue earned across one property on one day."""
+    property = models.ForeignKey(
+        Property, on_delete=models.CASCADE, db_index=False, help_text="Property the figures belong to.",
+    )
+    day = models.DateField(help_text="Night the figures belong to.")
+    nights_sold = models.PositiveIntegerField(default=0, help_text="Room nights sold.")
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text="Room revenue earned.")
+
+    class Meta:
+        constraints = [
+            # Also the index for the property's day-range reports.
+            models.UniqueConstraint(fields=['property', 'day'], name='dailystat_property_day_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.day}: {self.nights_sold} nights, {self.revenue}"
+
+class RoomDailyStat(models.Model):
+    """Nights sold and revenue earned by one room on one day."""
+    day = models.DateField(help_text="Night the figures belong to.")
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, help_text="Room the figures belong to.")
+    nights_sold = models.PositiveIntegerField(default=0, help_text="Room nights sold.")
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text="Room revenue earned.")
+
+    class Meta:
+        constraints = [
+            # Also the index for day-range reports grouped by room.
+            models.UniqueConstraint(fields=['day', 'room'], name='roomdailystat_day_room_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} room {self.room_id}: {self.nights_sold} nights, {self.revenue}"
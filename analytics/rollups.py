@@ -0,0 +1,89 @@
+import datetime
+from collections import defaultdict
+from decimal import ROUND_DOWN, Decimal
+
+from django.db import connections, router, transaction
+from django.utils import timezone
+from analytics.models import DailyStat, RoomDailyStat
+from bookings.archive import history
+
+CENT = Decimal('0.01')
+
+def stay_nights(booking):
+    """Yield ``(day, revenue)`` for every night a checked-out booking paid for.
+
+    Nights are counted the way checkout prices them (whole days from check-in, at least one) and
+    ``full_price`` is spread evenly over them, with any rounding remainder on the last night.
+    """
+    nights = max((booking.check_out - booking.check_in).days, 1)
+    first = timezone.localdate(booking.check_in)
+    full_price = Decimal(booking.full_price)
+    share = (full_price / nights).quantize(CENT, rounding=ROUND_DOWN)
+    for night in range(nights):
+        revenue = share if night < nights - 1 else full_price - share * (nights - 1)
+        yield first + datetime.timedelta(days=night), revenue
+
+def _totals(bookings, start=None, end=None):
+    days = defaultdict(lambda: [0, Decimal(0)])
+    rooms = defaultdict(lambda: [0, Decimal(0)])
+    for booking in bookings:
+        for day, revenue in stay_nights(booking):
+            if (start and day < start) or (end and day >= end):
+                continue
+            for key, totals in (((booking.property_id, day), days), ((day, booking.room_id), rooms)):
+                totals[key][0] += 1
+                totals[key][1] += revenue
+    return days, rooms
+
+def _upsert(model, key_columns, rows):
+    # Concurrent checkouts can add to the same day; the database does the addition so no update is lost.
+    connection = connections[router.db_for_write(model)]
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    columns = [*key_columns, 'nights_sold', 'revenue']
+    sql = (
+        f"INSERT INTO {table} ({', '.join(qn(c) for c in columns)}) VALUES ({', '.join(['%s'] * len(columns))}) "
+        f"ON CONFLICT ({', '.join(qn(c) for c in key_columns)}) DO UPDATE SET "
+        f"nights_sold = {table}.nights_sold + excluded.nights_sold, revenue = {table}.revenue + excluded.revenue"
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+
+def record_checkouts(bookings):
+    """Add freshly checked-out bookings to the daily rollups."""
+    days, rooms = _totals(bookings)
+    if not days:
+        return
+    with transaction.atomic(using=router.db_for_write(DailyStat)):
+        _upsert(DailyStat, ['property_id', 'day'], [(prop, day, n, revenue) for (prop, day), (n, revenue) in sorted(days.items())])
+        _upsert(RoomDailyStat, ['day', 'room_id'], [(day, room, n, revenue) for (day, room), (n, revenue) in sorted(rooms.items())])
+
+def rebuild(start=None, end=None, chunk_size=2000):
+    """Recompute the rollups for days in [start, end) (all days if unbounded) from checked-out bookings.
+
+    Archived bookings are included.
+    Returns the number of room-day rows written.
+    """
+    bookings = history().filter(status='CHECKED_OUT', check_out__isnull=False).only(
+        'property_id', 'room_id', 'check_in', 'check_out', 'full_price',
+    )
+    stats, room_stats = DailyStat.objects.all(), RoomDailyStat.objects.all()
+    if start:
+        bookings = bookings.filter(check_out__gte=timezone.make_aware(datetime.datetime.combine(start, datetime.time.min)))
+        stats, room_stats = stats.filter(day__gte=start), room_stats.filter(day__gte=start)
+    if end:
+        bookings = bookings.filter(check_in__lt=timezone.make_aware(datetime.datetime.combine(end, datetime.time.min)))
+        stats, room_stats = stats.filter(day__lt=end), room_stats.filter(day__lt=end)
+    days, rooms = _totals(bookings.iterator(chunk_size=chunk_size), start, end)
+    with transaction.atomic():
+        stats.delete()
+        room_stats.delete()
+        DailyStat.objects.bulk_create(
+            (DailyStat(property_id=prop, day=day, nights_sold=n, revenue=revenue) for (prop, day), (n, revenue) in days.items()),
+            batch_size=chunk_size,
+        )
+        RoomDailyStat.objects.bulk_create(
+            (RoomDailyStat(day=day, room_id=room, nights_sold=n, revenue=revenue) for (day, room), (n, revenue) in rooms.items()),
+            batch_size=chunk_size,
+        )
+    return len(rooms)
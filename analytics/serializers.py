@@ -0,0 +1,13 @@
+from rest_framework import serializers
+from bookings.serializers import StayRangeSerializer
+
+class ReportRangeSerializer(StayRangeSerializer):
+    MAX_DAYS = 731
+
+    group = serializers.ChoiceField(choices=('day', 'room'), default='day', help_text="Report per day or per room.")
+
+    def validate(self, data):
+        data = super().validate(data)
+        if (data['end'] - data['start']).days > self.MAX_DAYS:
+            raise serializers.ValidationError(f"Reports cover at most {self.MAX_DAYS} days.")
+        return data
@@ -0,0 +1,10 @@
+from analytics.rollups import record_checkouts
+from bookings.archive import history
+from jobs.queue import handles
+
+@handles('booking.checked_out')
+def update_rollups(payload):
+    """Add the checked-out bookings to the daily rollups."""
+    record_checkouts(history().filter(pk__in=payload['bookings'], status='CHECKED_OUT').only(
+        'property_id', 'room_id', 'check_in', 'check_out', 'full_price',
+    ))
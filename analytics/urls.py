@@ -0,0 +1,8 @@
+# analytics/urls.py
+from django.urls import path
+from analytics.views import OccupancyReportView, RevenueReportView
+
+urlpatterns = [
+    path('occupancy/', OccupancyReportView.as_view(), name='report-occupancy'),
+    path('revenue/', RevenueReportView.as_view(), name='report-revenue'),
+]
@@ -0,0 +1,80 @@
+import abc
+import datetime
+from decimal import Decimal
+
+from django.db.models import Sum
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from analytics.models import DailyStat, RoomDailyStat
+from analytics.serializers import ReportRangeSerializer
+from rooms.models import Room
+from rooms.tenancy import property_id
+
+def _ratio(numerator, denominator, places):
+    if not denominator:
+        return None
+    return str((Decimal(numerator) / denominator).quantize(Decimal(1).scaleb(-places)))
+
+class ReportView(APIView, abc.ABC):
+    """Occupancy and revenue figures of the request's property, read from the daily rollups, never from the bookings table.
+
+    Capacity is the property's current number of rooms for every day in the range.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        params = ReportRangeSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        start, end, group = params.validated_data['start'], params.validated_data['end'], params.validated_data['group']
+        prop = property_id(request)
+        rooms = Room.objects.in_property(prop).count()
+        if group == 'day':
+            stats = {
+                day: (sold, revenue)
+                for day, sold, revenue in DailyStat.objects.filter(property_id=prop, day__gte=start, day__lt=end).values_list(
+                    'day', 'nights_sold', 'revenue',
+                )
+            }
+            days = ((start + datetime.timedelta(days=i)) for i in range((end - start).days))
+            figures = [({'day': day}, *stats.get(day, (0, 0)), rooms) for day in days]
+        else:
+            stats = {
+                room: (sold, revenue)
+                for room, sold, revenue in RoomDailyStat.objects.filter(
+                    room__property_id=prop, day__gte=start, day__lt=end,
+                ).values('room').annotate(
+                    sold=Sum('nights_sold'), total=Sum('revenue'),
+                ).values_list('room', 'sold', 'total')
+            }
+            nights = (end - start).days
+            figures = [
+                ({'room': pk, 'room_number': number}, *stats.get(pk, (0, 0)), nights)
+                for pk, number in Room.objects.in_property(prop).order_by('number').values_list('pk', 'number')
+            ]
+        sold = sum(figure[1] for figure in figures)
+        revenue = sum((Decimal(figure[2]) for figure in figures), Decimal(0))
+        return Response({
+            'start': start, 'end': end, 'group': group,
+            'totals': self.row({}, sold, revenue, rooms * (end - start).days),
+            'results': [self.row(*figure) for figure in figures],
+        })
+
+    @abc.abstractmethod
+    def row(self, key, sold, revenue, capacity):
+        """The report's figures for one day or room (``key``), or for the totals (an empty key)."""
+
+class OccupancyReportView(ReportView):
+    def row(self, key, sold, revenue, capacity):
+        return {**key, 'nights_sold': sold, 'nights_available': capacity, 'occupancy': _ratio(sold, capacity, 4)}
+
+class RevenueReportView(ReportView):
+    def row(self, key, sold, revenue, capacity):
+        revenue = Decimal(revenue)
+        return {
+            **key,
+            'nights_sold': sold,
+            'revenue': f'{revenue:.2f}',
+            'adr': _ratio(revenue, sold, 2),
+            'revpar': _ratio(revenue, capacity, 2),
+        }
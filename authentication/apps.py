@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class AuthenticationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'authentication'
+
+    def ready(self):
+        from authentication import signals  # noqa: F401
+        from django.contrib.auth.password_validation import CommonPasswordValidator, get_default_password_validators
+
+        # Build the validators (and read the 20k common-password list) once at startup, not on the first registration.
+        for validator in get_default_password_validators():
+            if isinstance(validator, CommonPasswordValidator):
+                validator.passwords = frozenset(validator.passwords)
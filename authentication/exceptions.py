@@ -1,17 +1,12 @@
-from rest_framework.exceptions import APIException
+from rest_framework.exceptions import APIException, Throttled
 from rest_framework import status
-from django.contrib.auth.password_validation import validate_password
 
 class PasswordValidationError(APIException):
     status_code = status.HTTP_400_BAD_REQUEST
     default_code = 'invalid_password'
 
-    def __init__(self, password, user=None):
-        try:
-            validate_password(password, user=user)
-            self.detail = {}  # No error if validation passes
-        except Exception as e:
-            self.detail = {'password': list(e.messages)}
+    def __init__(self, messages):
+        super().__init__({'password': list(messages)})
 
 class DuplicateEmailError(APIException):
     status_code = status.HTTP_400_BAD_REQUEST
@@ -21,4 +16,13 @@ class DuplicateEmailError(APIException):
 class InvalidCredentialsError(APIException):
     status_code = status.HTTP_401_UNAUTHORIZED
     default_detail = 'Invalid username or password.'
-    default_code = 'invalid_credentials'
\ No newline at end of file
+    default_code = 'invalid_credentials'
+
+class PropertyAccessError(APIException):
+    status_code = status.HTTP_403_FORBIDDEN
+    default_detail = 'You do not have access to this property.'
+    default_code = 'property_access_denied'
+
+class TooManyLoginAttemptsError(Throttled):
+    default_detail = 'Too many failed login attempts. Try again later.'
+    default_code = 'too_many_login_attempts'
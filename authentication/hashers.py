@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, ScryptPasswordHasher
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    """Scrypt with cost parameters from settings.
+
+    Hashes made with other parameters verify as usual and are rehashed on the next login.
+    """
+    work_factor = getattr(settings, 'PASSWORD_SCRYPT_N', ScryptPasswordHasher.work_factor)
+    block_size = getattr(settings, 'PASSWORD_SCRYPT_R', ScryptPasswordHasher.block_size)
+    parallelism = getattr(settings, 'PASSWORD_SCRYPT_P', ScryptPasswordHasher.parallelism)
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """Argon2id with cost parameters from settings (requires argon2-cffi)."""
+    time_cost = getattr(settings, 'PASSWORD_ARGON2_TIME_COST', Argon2PasswordHasher.time_cost)
+    memory_cost = getattr(settings, 'PASSWORD_ARGON2_MEMORY_COST', Argon2PasswordHasher.memory_cost)
+    parallelism = getattr(settings, 'PASSWORD_ARGON2_PARALLELISM', Argon2PasswordHasher.parallelism)
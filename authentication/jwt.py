@@ -0,0 +1,134 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication as SimpleJWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+def _token_key(jti):
+    return f'jwt:revoked:{jti}'
+
+def _user_key(user_id):
+    return f'jwt:revoked-before:{user_id}'
+
+def revoke_token(token):
+    """Reject one token until it would have expired anyway."""
+    remaining = int(token['exp'] - time.time())
+    if remaining > 0:
+        cache.set(_token_key(token[api_settings.JTI_CLAIM]), True, remaining)
+
+def revoke_user_tokens(user_id):
+    """Reject every access token issued to the user up to now."""
+    lifetime = api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+    cache.set(_user_key(user_id), int(time.time()), int(lifetime) + 1)
+
+def _revocation_keys(token):
+    return _token_key(token.get(api_settings.JTI_CLAIM)), _user_key(token.get(api_settings.USER_ID_CLAIM))
+
+def _revoked(token, found):
+    token_key, user_key = _revocation_keys(token)
+    if found.get(token_key):
+        return True
+    revoked_before = found.get(user_key)
+    return revoked_before is not None and token.get('iat', 0) <= revoked_before
+
+def is_revoked(token):
+    """One cache round trip covering both the token and its user."""
+    return _revoked(token, cache.get_many(_revocation_keys(token)))
+
+async def ais_revoked(token):
+    return _revoked(token, await cache.aget_many(_revocation_keys(token)))
+
+class LazyTokenUser(TokenUser):
+    """User built from validated token claims.
+
+    ``id``/``pk`` come straight from the token; any other attribute loads the
+    ``User`` row once, on first access.
+    """
+
+    @cached_property
+    def id(self):
+        return User._meta.pk.to_python(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def user(self):
+        return User.objects.get(pk=self.id)
+
+    @cached_property
+    def username(self):
+        return self.token.get('username') or self.user.username
+
+    @cached_property
+    def is_staff(self):
+        return self.user.is_staff
+
+    @cached_property
+    def is_superuser(self):
+        return self.user.is_superuser
+
+    def has_perm(self, perm, obj=None):
+        return self.user.has_perm(perm, obj)
+
+    def has_perms(self, perm_list, obj=None):
+        return self.user.has_perms(perm_list, obj)
+
+    def has_module_perms(self, module):
+        return self.user.has_module_perms(module)
+
+    def __getattr__(self, attr):
+        if attr.startswith('_') or attr in self.token:
+            return super().__getattr__(attr)
+        return getattr(self.user, attr)
+
+class JWTAuthentication(SimpleJWTAuthentication):
+    """simplejwt authentication with revocation and an optional stateless mode.
+
+    With ``JWT_STATELESS_AUTH`` on, requests are authenticated from the token
+    claims alone and no ``User`` query is made unless a view needs one.
+    """
+
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        if is_revoked(token):
+            raise InvalidToken("Token has been revoked.")
+        return token
+
+    def get_user(self, validated_token):
+        if not getattr(settings, 'JWT_STATELESS_AUTH', False):
+            return super().get_user(validated_token)
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken("Token contained no recognizable user identification")
+        return LazyTokenUser(validated_token)
+
+    async def aauthenticate(self, request):
+        """``authenticate`` for async views: the revocation check and any user lookup don't block the event loop."""
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = super().get_validated_token(raw_token)
+        if await ais_revoked(validated_token):
+            raise InvalidToken("Token has been revoked.")
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken("Token contained no recognizable user identification")
+        if getattr(settings, 'JWT_STATELESS_AUTH', False):
+            return LazyTokenUser(validated_token)
+        try:
+            user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: validated_token[api_settings.USER_ID_CLAIM]})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed("The user's password has been changed.", code="password_changed")
+        return user
@@ -0,0 +1,78 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.db.models.functions import Lower
+from django.db.models import Q
+from authentication.serializers import RegisterSerializer
+from pmsapi.importing import ImportCommand
+
+class UserImportSerializer(RegisterSerializer):
+    """RegisterSerializer rules plus staff fields, without the per-row username query.
+
+    Existing usernames and emails are looked up once per batch instead.
+    """
+    class Meta(RegisterSerializer.Meta):
+        fields = RegisterSerializer.Meta.fields + ('first_name', 'last_name', 'is_staff')
+        extra_kwargs = {
+            **RegisterSerializer.Meta.extra_kwargs,
+            'username': {**RegisterSerializer.Meta.extra_kwargs['username'], 'validators': [UnicodeUsernameValidator()]},
+        }
+
+def _init_worker():
+    # Spawned workers start without Django configured; forked ones already are.
+    django.setup()
+
+class Command(ImportCommand):
+    help = "Bulk-create user accounts from a CSV or JSONL file (columns: username, email, password, first_name, last_name, is_staff)."
+    serializer_class = UserImportSerializer
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help="Processes used to hash passwords. 1 hashes in the command's own process.",
+        )
+
+    def setup(self, options):
+        workers = options['workers']
+        self.workers = workers
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) if workers > 1 else None
+
+    def teardown(self):
+        if self.pool:
+            self.pool.shutdown()
+
+    def hash_passwords(self, passwords):
+        if not self.pool:
+            return [make_password(password) for password in passwords]
+        return list(self.pool.map(make_password, passwords, chunksize=max(1, len(passwords) // (self.workers * 4))))
+
+    def write_batch(self, validated):
+        users = {}
+        emails = set()
+        for data in validated:
+            username = User.normalize_username(data['username'])
+            email = User.objects.normalize_email(data['email'])
+            # Skip repeats within the batch, keeping the first row, as the database would across batches.
+            if username in users or email.lower() in emails:
+                continue
+            users[username] = {**data, 'username': username, 'email': email}
+            emails.add(email.lower())
+        taken = User.objects.annotate(email_ci=Lower('email')).filter(
+            Q(username__in=list(users)) | Q(email_ci__in=list(emails))
+        ).values_list('username', 'email_ci')
+        taken_usernames, taken_emails = set(), set()
+        for username, email in taken:
+            taken_usernames.add(username)
+            taken_emails.add(email)
+        new = [data for username, data in users.items() if username not in taken_usernames and data['email'].lower() not in taken_emails]
+        # Hashing dominates the cost of an import, so only rows that will be inserted are hashed.
+        passwords = self.hash_passwords([data['password'] for data in new])
+        User.objects.bulk_create(
+            [User(**{**data, 'password': password}) for data, password in zip(new, passwords)], ignore_conflicts=True,
+        )
+        return len(new), 0
@@ -0,0 +1,38 @@
+import logging
+
+from django.db import migrations
+from django.db.models.functions import Lower
+
+logger = logging.getLogger(__name__)
+
+
+def blank_duplicate_emails(apps, schema_editor):
+    # Emails were not unique before this migration. Of the users sharing an email (ignoring case) the
+    # oldest keeps it; the others get a blank one, which the index allows, and are logged so their
+    # owners can be asked for a new address.
+    User = apps.get_model('auth', 'User')
+    previous = None
+    duplicates = []
+    users = User.objects.exclude(email='').annotate(email_ci=Lower('email')).order_by('email_ci', 'pk')
+    for pk, username, email, email_ci in users.values_list('pk', 'username', 'email', 'email_ci').iterator():
+        if email_ci == previous:
+            duplicates.append(pk)
+            logger.warning("Blanked duplicate email %s of user %s (id %s).", email, username, pk)
+        previous = email_ci
+    User.objects.filter(pk__in=duplicates).update(email='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(blank_duplicate_emails, migrations.RunPython.noop),
+        # Case-insensitive unique email; blank emails (e.g. createsuperuser without one) stay allowed.
+        migrations.RunSQL(
+            "CREATE UNIQUE INDEX auth_user_email_ci_uniq ON auth_user (LOWER(email)) WHERE email <> ''",
+            'DROP INDEX auth_user_email_ci_uniq',
+        ),
+    ]
@@ -1,5 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
 from authentication.exceptions import DuplicateEmailError, PasswordValidationError, InvalidCredentialsError
 from django.contrib.auth.password_validation import validate_password
 
@@ -13,18 +15,13 @@ class RegisterSerializer(serializers.ModelSerializer):
             'password': {'required': True, 'write_only': True, 'style': {'input_type': 'password'}, 'help_text': 'Required. At least 8 characters.'}
         }
 
-    def validate_email(self, value):
-        if User.objects.filter(email=value).exists():
-            raise DuplicateEmailError()
-        return value
-
     def validate_password(self, value):
         if value is None or value == '':
             raise InvalidCredentialsError("Password cannot be null or empty.")
         try:
             validate_password(value, user=None)
-        except Exception as e:
-            raise PasswordValidationError(str(e))
+        except DjangoValidationError as e:
+            raise PasswordValidationError(e.messages)
         return value
 
     def validate(self, data):
@@ -33,9 +30,18 @@ class RegisterSerializer(serializers.ModelSerializer):
         return data
 
     def create(self, validated_data):
-        user = User.objects.create_user(**validated_data)
-        return user
+        # Duplicate emails are caught by the auth_user_email_ci_uniq index rather than a lookup first.
+        try:
+            with transaction.atomic():
+                return User.objects.create_user(**validated_data)
+        except IntegrityError as e:
+            if 'auth_user_email_ci_uniq' in str(e):
+                raise DuplicateEmailError()
+            raise
 
 class LoginSerializer(serializers.Serializer):
     username = serializers.CharField()
-    password = serializers.CharField(write_only=True, style={'input_type': 'password'})
\ No newline at end of file
+    password = serializers.CharField(write_only=True, style={'input_type': 'password'})
+    property = serializers.SlugField(
+        required=False, help_text="Code of the property to work in. Defaults to the default property.",
+    )
@@ -0,0 +1,13 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from authentication.jwt import revoke_user_tokens
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, **kwargs):
+    if not created and not instance.is_active:
+        revoke_user_tokens(instance.pk)
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    revoke_user_tokens(instance.pk)
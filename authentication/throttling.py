@@ -0,0 +1,37 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+class LoginAttemptLimiter:
+    """Counts failed logins per username and per client IP in the cache.
+
+    Checked before ``authenticate`` so brute-force traffic is turned away without
+    paying for a password hash.
+    """
+
+    def __init__(self, request, username):
+        self.window = settings.LOGIN_ATTEMPT_WINDOW
+        # Hashed: usernames may hold spaces, control characters or be too long for a memcached key.
+        user = hashlib.sha256(username.lower().encode()).hexdigest()
+        self.limits = {
+            f'login:failures:user:{user}': settings.LOGIN_ATTEMPT_LIMIT,
+            f'login:failures:ip:{request.META.get("REMOTE_ADDR", "")}': settings.LOGIN_IP_ATTEMPT_LIMIT,
+        }
+
+    def is_blocked(self):
+        counts = cache.get_many(list(self.limits))
+        return any(counts.get(key, 0) >= limit for key, limit in self.limits.items())
+
+    def failed(self):
+        for key in self.limits:
+            # add() starts the window; incr() keeps its expiry.
+            cache.add(key, 0, self.window)
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, 1, self.window)
+
+    def succeeded(self):
+        # Only the username counter is cleared: a shared IP keeps its count.
+        cache.delete(next(iter(self.limits)))
@@ -6,25 +6,57 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
+from django.db.models import Q
 from authentication.serializers import RegisterSerializer, LoginSerializer
-from authentication.exceptions import InvalidCredentialsError
+from authentication.exceptions import InvalidCredentialsError, PropertyAccessError, TooManyLoginAttemptsError
+from authentication.throttling import LoginAttemptLimiter
+from rooms.models import DEFAULT_PROPERTY_ID, Property
+from rooms.tenancy import PROPERTY_CLAIM
 
 class RegisterView(generics.CreateAPIView):
     serializer_class = RegisterSerializer
     permission_classes = [AllowAny]
+    query_budget = 2
 
 class LoginView(generics.GenericAPIView):
     serializer_class = LoginSerializer
     permission_classes = [AllowAny]
+    # The user, the refresh token record, the property membership when one is chosen and, after a
+    # hasher change, the upgraded hash.
+    query_budget = 4
 
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user = authenticate(**serializer.validated_data)
+        limiter = LoginAttemptLimiter(request, serializer.validated_data['username'])
+        if limiter.is_blocked():
+            raise TooManyLoginAttemptsError(wait=limiter.window)
+        # Rehashes the stored password if the preferred hasher or its cost has changed.
+        user = authenticate(username=serializer.validated_data['username'], password=serializer.validated_data['password'])
         if not user:
+            limiter.failed()
             raise InvalidCredentialsError()
+        limiter.succeeded()
         refresh = RefreshToken.for_user(user)
+        # Access tokens derived from this one carry the claim; see rooms.tenancy.
+        refresh[PROPERTY_CLAIM] = self.property_for(user, serializer.validated_data.get('property'))
         return Response({
             'refresh': str(refresh),
             'access': str(refresh.access_token),
         }, status=status.HTTP_200_OK)
+
+    def property_for(self, user, code):
+        """Id of property ``code`` (by default the default property) if ``user`` may work in it, or PropertyAccessError.
+
+        Every user may work in the default property, so registered and imported users can log in
+        without further setup. Other properties are open to their members and to staff.
+        """
+        if not code:
+            return DEFAULT_PROPERTY_ID
+        properties = Property.objects.filter(code=code)
+        if not user.is_staff:
+            properties = properties.filter(Q(pk=DEFAULT_PROPERTY_ID) | Q(members=user))
+        pk = properties.values_list('pk', flat=True).first()
+        if pk is None:
+            raise PropertyAccessError()
+        return pk
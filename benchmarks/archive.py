@@ -0,0 +1,61 @@
+"""Archiving old checkouts: rows moved per second, bookings table size, and hot-table reads before and after.
+
+Queries without a selective index, like counting the open stays, read the whole bookings table and
+shrink with it. The guest's booking list reads both tables once bookings are archived.
+
+    python -m benchmarks.archive --scale 0.1 --older-than 90
+"""
+import datetime
+import time
+
+from benchmarks import harness
+
+
+def main():
+    p = harness.parser(__doc__)
+    p.add_argument('--scale', type=float, default=0.1, help='Fraction of 10k rooms / 100k users / 1M bookings to seed.')
+    p.add_argument('--older-than', type=int, default=90, help='Archive bookings checked out more than this many days ago.')
+    p.add_argument('--batch-size', type=int, default=5000)
+    p.add_argument('--repeat', type=int, default=20)
+    args = p.parse_args()
+    harness.setup()
+
+    from django.contrib.auth.models import User
+    from django.urls import reverse
+    from django.utils import timezone
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import AccessToken
+    from benchmarks.factories import seed
+    from bookings.archive import archive_batch, table_size
+    from bookings.models import ArchivedBooking, Booking
+
+    with harness.test_database():
+        counts = seed(int(10_000 * args.scale), int(100_000 * args.scale), int(1_000_000 * args.scale), rollups=False)
+        guest = User.objects.get(pk=Booking.objects.values('user_id').order_by('-pk')[:1])
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(guest)}')
+        open_stays = Booking.objects.exclude(status='CHECKED_OUT')
+
+        def reads():
+            return {
+                'rows': Booking.objects.count(),
+                'size_bytes': table_size(Booking),
+                'open_stays_scan': harness.summarize(harness.timed(open_stays.count, args.repeat)),
+                'guest_booking_list': harness.summarize(harness.timed(lambda: client.get(reverse('booking-list-create')), args.repeat)),
+            }
+
+        results = {'seeded': counts, 'before': reads()}
+        before = timezone.now() - datetime.timedelta(days=args.older_than)
+        moved, last = 0, 0
+        start = time.perf_counter()
+        while ids := archive_batch(before, last, args.batch_size):
+            moved, last = moved + len(ids), ids[-1]
+        elapsed = time.perf_counter() - start
+        results['archived'] = {'rows': moved, 'rows_per_sec': round(moved / elapsed) if elapsed else 0}
+        results['after'] = reads()
+        results['archive_rows'] = ArchivedBooking.objects.count()
+        harness.report(results, args.json)
+
+
+if __name__ == '__main__':
+    main()
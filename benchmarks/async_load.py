@@ -0,0 +1,82 @@
+"""Sync (WSGI, a thread per in-flight request) against async (ASGI, one event loop) at high concurrency.
+
+Both stacks run in-process through Django's test clients, so the numbers compare the request
+handling models rather than a particular server. ``threads`` is the peak number of live threads.
+
+    python -m benchmarks.async_load --requests 2000 --concurrency 500
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import harness
+
+
+def main():
+    p = harness.parser(__doc__)
+    p.add_argument('--requests', type=int, default=2000)
+    p.add_argument('--concurrency', type=int, default=500)
+    p.add_argument('--rooms', type=int, default=50)
+    args = p.parse_args()
+    harness.setup()
+
+    from django.contrib.auth.models import User
+    from django.test import AsyncClient, Client
+    from django.urls import reverse
+    from rest_framework_simplejwt.tokens import AccessToken
+    from rooms.models import Room
+
+    with harness.test_database():
+        user = User.objects.create(username='bench', email='bench@example.com')
+        token = f'Bearer {AccessToken.for_user(user)}'
+        Room.objects.bulk_create(Room(number=str(i), price='100.00') for i in range(args.rooms))
+
+        def run_sync(url):
+            client = Client(headers={'Authorization': token})
+
+            def one(_):
+                start = time.perf_counter()
+                assert client.get(url).status_code == 200
+                peak[0] = max(peak[0], threading.active_count())
+                return (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+                samples = list(pool.map(one, range(args.requests)))
+            return samples, time.perf_counter() - start
+
+        def run_async(url):
+            async def load():
+                client = AsyncClient()
+                gate = asyncio.Semaphore(args.concurrency)
+
+                async def one():
+                    async with gate:
+                        start = time.perf_counter()
+                        response = await client.get(url, headers={'Authorization': token})
+                        assert response.status_code == 200
+                        peak[0] = max(peak[0], threading.active_count())
+                        return (time.perf_counter() - start) * 1000
+
+                return await asyncio.gather(*(one() for _ in range(args.requests)))
+
+            start = time.perf_counter()
+            samples = asyncio.run(load())
+            return samples, time.perf_counter() - start
+
+        peak = [0]
+        results = {'requests': args.requests, 'concurrency': args.concurrency}
+        for name, sync_url, async_url in (
+            ('room_list', reverse('room-list-create'), reverse('async-room-list')),
+            ('available_rooms', reverse('room-available-list'), reverse('async-room-available-list')),
+        ):
+            for stack, run, url in (('sync', run_sync, sync_url), ('async', run_async, async_url)):
+                peak[0] = 0
+                samples, elapsed = run(url)
+                results[f'{name}_{stack}'] = {**harness.summarize(samples), 'rps': round(len(samples) / elapsed), 'threads': peak[0]}
+        harness.report(results, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Date-range availability lookups over a large booking history.
+
+    python -m benchmarks.availability --rooms 2000 --bookings 300000
+"""
+import datetime
+import random
+
+from benchmarks import harness
+
+
+def seed(rooms, bookings):
+    from django.contrib.auth.models import User
+    from bookings.models import Booking, OPEN_DEPARTURE
+    from rooms.models import DEFAULT_PROPERTY_ID, Room
+
+    user = User.objects.create(username='bench', email='bench@example.com')
+    Room.objects.bulk_create(Room(number=str(i), price='100.00', is_available=True) for i in range(rooms))
+    room_ids = list(Room.objects.values_list('id', flat=True))
+
+    # Each room gets a back-to-back history of short stays ending a little after today.
+    today = datetime.date.today()
+    per_room = max(1, bookings // rooms)
+    rng = random.Random(42)
+    batch = []
+    for room_id in room_ids:
+        day = today - datetime.timedelta(days=per_room * 3)
+        for n in range(per_room):
+            nights = rng.randint(1, 4)
+            departure = day + datetime.timedelta(days=nights)
+            if departure <= today:
+                status = 'CHECKED_OUT'
+            elif day <= today:
+                status, departure = 'CHECKED_IN', OPEN_DEPARTURE
+            else:
+                status = 'RESERVED'
+            batch.append(Booking(
+                user=user, room_id=room_id, property_id=DEFAULT_PROPERTY_ID, arrival=day, departure=departure, status=status,
+            ))
+            if status == 'CHECKED_IN':
+                break
+            day = departure + datetime.timedelta(days=rng.randint(0, 1))
+        if len(batch) >= 10000:
+            Booking.objects.bulk_create(batch)
+            batch = []
+    Booking.objects.bulk_create(batch)
+    return Booking.objects.count()
+
+
+def main():
+    p = harness.parser(__doc__)
+    p.add_argument('--rooms', type=int, default=2000)
+    p.add_argument('--bookings', type=int, default=300000)
+    p.add_argument('--repeat', type=int, default=200)
+    args = p.parse_args()
+    harness.setup()
+
+    from bookings.availability import free_rooms
+    from rooms.models import DEFAULT_PROPERTY_ID
+
+    with harness.test_database():
+        total = seed(args.rooms, args.bookings)
+        start = datetime.date.today() + datetime.timedelta(days=30)
+        end = start + datetime.timedelta(days=3)
+        query = free_rooms(start, end, DEFAULT_PROPERTY_ID).values_list('id', flat=True)
+        free = len(list(query))
+        samples = harness.timed(lambda: list(query.all()), args.repeat)
+        harness.report({
+            'bookings': total,
+            'rooms': args.rooms,
+            'free_rooms': free,
+            'free_rooms_between': harness.summarize(samples),
+            'plan': query.explain(),
+        }, args.json)
+
+
+if __name__ == '__main__':
+    main()
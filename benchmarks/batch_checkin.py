@@ -0,0 +1,64 @@
+"""N single check-in/checkout calls against one batch call of the same size.
+
+    python -m benchmarks.batch_checkin --rooms 200
+"""
+import time
+
+from benchmarks import harness
+
+
+def run(client, fn):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as ctx:
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+    return {'ms': round(elapsed * 1000, 1), 'queries': len(ctx.captured_queries)}
+
+
+def main():
+    p = harness.parser(__doc__)
+    p.add_argument('--rooms', type=int, default=200)
+    args = p.parse_args()
+    harness.setup()
+
+    from django.contrib.auth.models import User
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import AccessToken
+    from rooms.models import Room
+
+    with harness.test_database():
+        user = User.objects.create(username='bench', email='bench@example.com')
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        Room.objects.bulk_create(Room(number=str(i), price='100.00') for i in range(args.rooms))
+        numbers = [str(i) for i in range(args.rooms)]
+
+        def single_checkin():
+            for number in numbers:
+                client.post(reverse('booking-list-create'), {'room_number': number}, format='json')
+
+        def single_checkout():
+            for number in numbers:
+                client.post(reverse('booking-checkout'), {'room_number': number}, format='json')
+
+        def batch_checkin():
+            client.post(reverse('booking-batch-checkin'), {'room_numbers': numbers}, format='json')
+
+        def batch_checkout():
+            client.post(reverse('booking-batch-checkout'), {'room_numbers': numbers}, format='json')
+
+        harness.report({
+            'rooms': args.rooms,
+            'single_checkin': run(client, single_checkin),
+            'single_checkout': run(client, single_checkout),
+            'batch_checkin': run(client, batch_checkin),
+            'batch_checkout': run(client, batch_checkout),
+        }, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Throughput with a new database connection per request against the configured connection profile.
+
+Requests go through Django's WSGI handler in a pool of threads, like gthread workers, so the
+request_started/request_finished signals open and close connections exactly as in production.
+Run it against Postgres (where connecting costs a round trip and authentication) or, as a local
+stand-in, with DB_ENGINE=sqlite. With DB_POOL=True the profile run uses the psycopg pool.
+
+    DB_ENGINE=sqlite python -m benchmarks.connections --requests 2000 --threads 4
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import harness
+
+
+def main():
+    p = harness.parser(__doc__)
+    p.add_argument('--requests', type=int, default=2000)
+    p.add_argument('--threads', type=int, default=4)
+    p.add_argument('--rooms', type=int, default=50)
+    args = p.parse_args()
+    harness.setup()
+
+    from django.contrib.auth.models import User
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.db import connections
+    from django.db.backends.signals import connection_created
+    from django.test import RequestFactory
+    from django.urls import reverse
+    from rest_framework_simplejwt.tokens import AccessToken
+    from rooms.models import Room
+
+    with harness.test_database() as connection:
+        user = User.objects.create(username='bench', email='bench@example.com')
+        Room.objects.bulk_create(Room(number=str(i), price='100.00') for i in range(args.rooms))
+        environ = RequestFactory()._base_environ(
+            PATH_INFO=reverse('room-list-create'), HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}',
+        )
+        handler = WSGIHandler()
+        opened = [0]
+        lock = threading.Lock()
+
+        def count(sender, **kwargs):
+            with lock:
+                opened[0] += 1
+
+        def one(_):
+            start = time.perf_counter()
+            response = handler(dict(environ), lambda status, headers: None)
+            b''.join(response)
+            response.close()
+            return (time.perf_counter() - start) * 1000
+
+        def run(conn_max_age, pool):
+            settings_dict = connection.settings_dict
+            settings_dict['CONN_MAX_AGE'] = conn_max_age
+            settings_dict['OPTIONS'] = {k: v for k, v in profile_options.items() if pool or k != 'pool'}
+            connections.close_all()
+            opened[0] = 0
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.threads) as executor:
+                samples = list(executor.map(one, range(args.requests)))
+                # Persistent connections belong to the pool's threads: close each one in its own thread.
+                barrier = threading.Barrier(args.threads)
+                list(executor.map(lambda _: (barrier.wait(), connections.close_all()), range(args.threads)))
+            elapsed = time.perf_counter() - start
+            return {**harness.summarize(samples), 'rps': round(len(samples) / elapsed), 'connections_opened': opened[0]}
+
+        profile_age = connection.settings_dict.get('CONN_MAX_AGE', 0)
+        profile_options = dict(connection.settings_dict.get('OPTIONS', {}))
+        pooled = 'pool' in profile_options
+        connection_created.connect(count)
+        try:
+            results = {
+                'vendor': connection.vendor,
+                'requests': args.requests,
+                'threads': args.threads,
+                'connect_per_request': run(0, False),
+                'pooled' if pooled else f'persistent_{profile_age or 60}s': run(0 if pooled else profile_age or 60, pooled),
+            }
+        finally:
+            connection_created.disconnect(count)
+            connection.settings_dict['CONN_MAX_AGE'] = profile_age
+            connection.settings_dict['OPTIONS'] = profile_options
+            connections.close_all()
+        harness.report(results, args.json)
+
+
+if __name__ == '__main__':
+    main()
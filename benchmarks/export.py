@@ -0,0 +1,68 @@
+"""Booking export: streaming encoder against serializing the whole queryset with BookingSerializer.
+
+    python -m benchmarks.export --bookings 1000 100000
+"""
+import time
+import tracemalloc
+
+from benchmarks import harness
+
+
+def measure(fn):
+    start = time.perf_counter()
+    rows = fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'rows_per_sec': round(rows / elapsed), 'peak_mb': round(peak / 2 ** 20, 1)}
+
+
+def main():
+    p = harness.parser(__doc__)
+    p.add_argument('--bookings', type=int, nargs='+', default=[1000, 100000])
+    args = p.parse_args()
+    harness.setup()
+
+    from django.contrib.auth.models import User
+    from rest_framework.renderers import JSONRenderer
+    from bookings.export import encode_csv, encode_ndjson, export_rows
+    from bookings.models import Booking
+    from bookings.serializers import BookingSerializer
+    from rooms.models import DEFAULT_PROPERTY_ID, Room
+
+    results = {}
+    with harness.test_database():
+        user = User.objects.create(username='bench', email='bench@example.com')
+        rooms = Room.objects.bulk_create(Room(number=str(i), price='100.00') for i in range(100))
+        seeded = 0
+        for total in sorted(args.bookings):
+            Booking.objects.bulk_create(
+                (Booking(user=user, room=rooms[i % len(rooms)], property_id=DEFAULT_PROPERTY_ID, status='CHECKED_OUT', full_price='100.00')
+                 for i in range(seeded, total)),
+                batch_size=5000,
+            )
+            seeded = total
+
+            def serializer():
+                JSONRenderer().render(BookingSerializer(Booking.objects.all(), many=True).data)
+                return total
+
+            def stream(encode):
+                def run():
+                    for _ in encode(export_rows(Booking.objects.all())):
+                        pass
+                    return total
+                return run
+
+            results[total] = {
+                'serializer': measure(serializer),
+                'stream_ndjson': measure(stream(encode_ndjson)),
+                'stream_csv': measure(stream(encode_csv)),
+            }
+    harness.report(results, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""Bulk factories that seed a realistic hotel: rooms, guests and years of stays.
+
+Rows are built in plain Python and written with bulk_create in batches, so a million bookings take
+minutes, not hours. Every guest shares one password hash (hashing is the slow part of a user).
+
+Each room gets ``bookings / rooms`` consecutive stays ending today, without overlaps (the Postgres
+exclusion constraint holds). About a third of the rooms then have a guest checked in and a fifth of
+the rest a reservation next month; the remaining rooms are free for the benchmarks to book.
+"""
+import contextlib
+import datetime
+import random
+from decimal import Decimal
+
+from pmsapi.importing import chunked
+
+GUEST_PASSWORD = 'StrongPass1234!'
+
+
+@contextlib.contextmanager
+def synthetic_check_in():
+    """Let bulk_create keep the generated check_in times instead of stamping them with now()."""
+    from bookings.models import Booking
+
+    field = Booking._meta.get_field('check_in')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def seed_rooms(count, batch_size=5000):
+    from rooms.models import Room
+
+    rng = random.Random(1)
+    rooms = (Room(number=str(1000 + i), price=rng.choice(('80.00', '100.00', '120.00', '180.00'))) for i in range(count))
+    for batch in chunked(rooms, batch_size):
+        Room.objects.bulk_create(batch)
+    return list(Room.objects.order_by('pk').values_list('pk', 'price'))
+
+
+def seed_users(count, batch_size=5000, prefix='guest', **fields):
+    from django.contrib.auth.hashers import make_password
+    from django.contrib.auth.models import User
+
+    password = make_password(GUEST_PASSWORD)
+    users = (
+        User(username=f'{prefix}{i}', email=f'{prefix}{i}@example.com', password=password, **fields)
+        for i in range(count)
+    )
+    for batch in chunked(users, batch_size):
+        User.objects.bulk_create(batch)
+    return list(User.objects.filter(username__startswith=prefix).order_by('pk').values_list('pk', flat=True))
+
+
+def _stays(rooms, user_ids, per_room, today, rng):
+    from django.utils import timezone
+    from bookings.models import Booking
+    from rooms.models import DEFAULT_PROPERTY_ID
+
+    def at(day, hour):
+        return timezone.make_aware(datetime.datetime.combine(day, datetime.time(hour)))
+
+    for room_id, price in rooms:
+        occupied = rng.random() < 0.33
+        reserved = not occupied and rng.random() < 0.2
+        day = today
+        if occupied:
+            nights = rng.randint(1, 7)
+            arrival = today - datetime.timedelta(days=rng.randint(0, nights - 1))
+            yield Booking(
+                user_id=rng.choice(user_ids), room_id=room_id, property_id=DEFAULT_PROPERTY_ID, status='CHECKED_IN', check_in=at(arrival, 15),
+                check_out=at(arrival + datetime.timedelta(days=nights), 11), arrival=arrival,
+                departure=arrival + datetime.timedelta(days=nights),
+            )
+            day = arrival
+        if reserved:
+            arrival = today + datetime.timedelta(days=rng.randint(20, 40))
+            yield Booking(
+                user_id=rng.choice(user_ids), room_id=room_id, property_id=DEFAULT_PROPERTY_ID, status='RESERVED', check_in=at(today, 9),
+                arrival=arrival, departure=arrival + datetime.timedelta(days=rng.randint(1, 7)),
+            )
+        for _ in range(per_room - occupied - reserved):
+            departure = day - datetime.timedelta(days=rng.randint(0, 3))
+            nights = rng.randint(1, 7)
+            arrival = departure - datetime.timedelta(days=nights)
+            yield Booking(
+                user_id=rng.choice(user_ids), room_id=room_id, property_id=DEFAULT_PROPERTY_ID, status='CHECKED_OUT', check_in=at(arrival, 15),
+                check_out=at(departure, 11), arrival=arrival, departure=departure, full_price=price * nights,
+            )
+            day = arrival
+
+
+def seed_bookings(rooms, user_ids, count, batch_size=5000, seed=42):
+    """Write about ``count`` bookings spread evenly over ``rooms`` and return how many were written."""
+    from django.utils import timezone
+    from bookings.models import Booking
+    from rooms.models import Room
+
+    rng = random.Random(seed)
+    per_room = max(1, count // max(1, len(rooms)))
+    written = 0
+    with synthetic_check_in():
+        for batch in chunked(_stays(rooms, user_ids, per_room, timezone.localdate(), rng), batch_size):
+            Booking.objects.bulk_create(batch)
+            written += len(batch)
+    Room.objects.filter(booking__status='CHECKED_IN').update(is_available=False)
+    return written
+
+
+def seed(rooms=10_000, users=100_000, bookings=1_000_000, batch_size=5000, rollups=True):
+    """Seed the whole dataset and return the row counts."""
+    from analytics.rollups import rebuild
+
+    room_rows = [(pk, Decimal(price)) for pk, price in seed_rooms(rooms, batch_size)]
+    user_ids = seed_users(users, batch_size)
+    counts = {'rooms': len(room_rows), 'users': len(user_ids), 'bookings': seed_bookings(room_rows, user_ids, bookings, batch_size)}
+    if rollups:
+        counts['rollup_rows'] = rebuild()
+    return counts
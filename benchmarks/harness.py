@@ -0,0 +1,74 @@
+"""Shared setup for the benchmark scripts.
+
+Benchmarks always run against a throwaway test database created from the
+configured settings, never against the live one.
+"""
+import argparse
+import contextlib
+import json
+import logging
+import os
+import statistics
+import time
+
+import django
+
+
+def setup():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pmsapi.settings')
+    django.setup()
+    # Expected 4xx responses would otherwise be logged once per request.
+    logging.getLogger('django.request').setLevel(logging.ERROR)
+
+
+def parser(description):
+    p = argparse.ArgumentParser(description=description)
+    p.add_argument('--json', action='store_true', help='Print the results as JSON.')
+    return p
+
+
+@contextlib.contextmanager
+def test_database():
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def timed(fn, repeat):
+    """Call ``fn`` ``repeat`` times and return the wall time of each call in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+    return {
+        'n': len(ordered),
+        'mean_ms': round(statistics.fmean(ordered), 3),
+        'p50_ms': round(pct(0.50), 3),
+        'p95_ms': round(pct(0.95), 3),
+        'p99_ms': round(pct(0.99), 3),
+    }
+
+
+def report(results, as_json=False):
+    if as_json:
+        print(json.dumps(results, indent=2, default=str))
+        return
+    for name, value in results.items():
+        print(f'{name}: {value}')
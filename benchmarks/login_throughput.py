@@ -0,0 +1,57 @@
+"""Logins per second per worker for each password hasher profile.
+
+    python -m benchmarks.login_throughput --logins 30 --profiles pbkdf2 scrypt argon2
+
+A "worker" is one thread issuing logins back to back, the same as one gunicorn sync worker.
+"""
+import time
+
+from benchmarks import harness
+
+
+def main():
+    p = harness.parser(__doc__)
+    p.add_argument('--logins', type=int, default=30, help='Logins per profile.')
+    p.add_argument('--profiles', nargs='+', default=['pbkdf2', 'scrypt', 'argon2'])
+    args = p.parse_args()
+    harness.setup()
+
+    from django.conf import settings
+    from django.contrib.auth.hashers import make_password
+    from django.contrib.auth.models import User
+    from django.test import override_settings
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    results = {}
+    with harness.test_database():
+        for profile in args.profiles:
+            hashers = [settings.PASSWORD_HASHER_PROFILES[profile]] + [
+                h for h in settings.PASSWORD_HASHERS if h != settings.PASSWORD_HASHER_PROFILES[profile]
+            ]
+            with override_settings(PASSWORD_HASHERS=hashers):
+                try:
+                    password = make_password('StrongPass1234!')
+                except ValueError as exc:  # argon2-cffi not installed
+                    results[profile] = f'skipped: {exc}'
+                    continue
+                User.objects.bulk_create(
+                    User(username=f'{profile}{i}', email=f'{profile}{i}@example.com', password=password)
+                    for i in range(args.logins)
+                )
+                client = APIClient()
+                users = iter(range(args.logins))
+
+                def login():
+                    i = next(users)
+                    client.post(reverse('login'), {'username': f'{profile}{i}', 'password': 'StrongPass1234!'}, format='json')
+
+                start = time.perf_counter()
+                samples = harness.timed(login, args.logins)
+                elapsed = time.perf_counter() - start
+                results[profile] = {'logins_per_sec': round(args.logins / elapsed, 1), **harness.summarize(samples)}
+    harness.report(results, args.json)
+
+
+if __name__ == '__main__':
+    main()
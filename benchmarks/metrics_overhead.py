@@ -0,0 +1,56 @@
+"""Cost of the request instrumentation (metrics and query budgets): the same requests with and without it.
+
+    python -m benchmarks.metrics_overhead --requests 500 --rounds 5
+"""
+from benchmarks import harness
+
+
+def main():
+    p = harness.parser(__doc__)
+    p.add_argument('--requests', type=int, default=500)
+    p.add_argument('--rounds', type=int, default=5)
+    p.add_argument('--rooms', type=int, default=200)
+    args = p.parse_args()
+    harness.setup()
+
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from django.test import override_settings
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import AccessToken
+    from rooms.models import Room
+
+    with harness.test_database():
+        user = User.objects.create(username='bench', email='bench@example.com')
+        token = f'Bearer {AccessToken.for_user(user)}'
+        Room.objects.bulk_create(Room(number=str(i), price='100.00') for i in range(args.rooms))
+        instrumentation = ('pmsapi.metrics.MetricsMiddleware', 'pmsapi.querybudget.QueryBudgetMiddleware')
+        without = [name for name in settings.MIDDLEWARE if name not in instrumentation]
+
+        def client(middleware):
+            # Each client builds its own middleware chain on the first request.
+            with override_settings(MIDDLEWARE=middleware):
+                c = APIClient()
+                c.credentials(HTTP_AUTHORIZATION=token)
+                c.get('/')
+            return c
+
+        results = {'requests': args.requests, 'rounds': args.rounds}
+        for name, url, params in (
+            ('room_list_page_100', reverse('room-list-create'), {'page_size': 100}),
+            ('room_detail', reverse('room-detail', args=[1]), {}),
+        ):
+            clients = {'instrumented': client(settings.MIDDLEWARE), 'bare': client(without)}
+            samples = {label: [] for label in clients}
+            for _ in range(args.rounds):
+                for label, c in clients.items():
+                    samples[label].extend(harness.timed(lambda: c.get(url, params), args.requests // args.rounds))
+            summaries = {label: harness.summarize(values) for label, values in samples.items()}
+            overhead = summaries['instrumented']['mean_ms'] / summaries['bare']['mean_ms'] - 1
+            results[name] = {**summaries, 'overhead_pct': round(overhead * 100, 1)}
+        harness.report(results, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""365-night stay quotes across every room, from the rate calendar and night by night.
+
+Seeds --rooms rooms in four room types with seasonal, weekend and promotion rates, then prices a
+365-night stay starting within the next year in every room: from the running totals of the price
+calendar, night by night in Python with the rates in memory, and night by night with a query per
+night (the last two on a sample of rooms). Also times building the calendar and the quote endpoint.
+
+    python -m benchmarks.rates --rooms 10000
+"""
+import datetime
+import random
+import time
+
+from benchmarks import harness
+
+
+def seed_rates(today):
+    from rates.models import Rate, RoomType
+    from rooms.models import Room
+
+    types = [RoomType.objects.create(code=code, name=code.title()) for code in ('single', 'double', 'family', 'suite')]
+    room_ids = list(Room.objects.order_by('pk').values_list('pk', flat=True))
+    for i, room_type in enumerate(types):
+        Room.objects.filter(pk__in=room_ids[i::len(types)]).update(room_type=room_type)
+    rng = random.Random(3)
+    rates = []
+    for year in range(today.year - 1, today.year + 3):
+        for month, name in ((1, 'Winter'), (4, 'Spring'), (7, 'Summer'), (10, 'Autumn')):
+            start = datetime.date(year, month, 1)
+            end = datetime.date(year + (month == 10), 1 if month == 10 else month + 3, 1)
+            rates.append(Rate(name=f'{name} {year}', start=start, end=end, price=rng.choice(('90.00', '110.00', '140.00'))))
+            for room_type in types:
+                rates.append(Rate(name=f'{name} {year} {room_type.code}', room_type=room_type, start=start, end=end, price=f'{rng.randint(100, 300)}.00'))
+    for room_type in types:
+        # Friday and Saturday nights.
+        rates.append(Rate(name=f'Weekend {room_type.code}', room_type=room_type, weekdays=0b0110000, price=f'{rng.randint(150, 350)}.00', priority=1))
+    for k in range(20):
+        start = today + datetime.timedelta(days=rng.randint(0, 700))
+        rates.append(Rate(name=f'Event {k}', start=start, end=start + datetime.timedelta(days=rng.randint(1, 5)), price='450.00', priority=5))
+    Rate.objects.bulk_create(rates)
+    return len(types), len(rates)
+
+
+def main():
+    p = harness.parser(__doc__)
+    p.add_argument('--rooms', type=int, default=10_000)
+    p.add_argument('--nights', type=int, default=365)
+    p.add_argument('--sample', type=int, default=200, help='Rooms priced night by night in Python.')
+    p.add_argument('--query-sample', type=int, default=5, help='Rooms priced with a query per night.')
+    p.add_argument('--repeat', type=int, default=500, help='Quote endpoint requests.')
+    args = p.parse_args()
+    harness.setup()
+
+    from django.contrib.auth.models import User
+    from django.db import connection
+    from django.db.models import F, Q
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+    from django.utils import timezone
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import AccessToken
+    from benchmarks.factories import seed_rooms
+    from rates.calendar import invalidate_rates, price_calendar
+    from rates.models import Rate
+    from rooms.models import DEFAULT_PROPERTY_ID, Room
+
+    with harness.test_database():
+        today = timezone.localdate()
+        seed_rooms(args.rooms)
+        room_types, rate_count = seed_rates(today)
+        rooms = {pk: (room_type, price) for pk, room_type, price in Room.objects.values_list('pk', 'room_type_id', 'price')}
+        rng = random.Random(7)
+        stays = [(pk, today + datetime.timedelta(days=rng.randint(0, 365))) for pk in rooms]
+        rates = list(Rate.objects.all())
+
+        def night_by_night(pk, first):
+            room_type, price = rooms[pk]
+            total = 0
+            for night in (first + datetime.timedelta(days=i) for i in range(args.nights)):
+                best = max((
+                    rate for rate in rates
+                    if rate.room_type_id in (None, room_type) and (rate.start is None or rate.start <= night)
+                    and (rate.end is None or night < rate.end) and rate.weekdays >> night.weekday() & 1
+                ), key=lambda rate: (rate.priority, rate.room_type_id is not None, rate.pk), default=None)
+                total += best.price if best else price
+            return total
+
+        def query_per_night(pk, first):
+            room_type, price = rooms[pk]
+            total = 0
+            for night in (first + datetime.timedelta(days=i) for i in range(args.nights)):
+                applicable = Rate.objects.in_property(DEFAULT_PROPERTY_ID).annotate(
+                    night=F('weekdays').bitand(1 << night.weekday()),
+                ).filter(
+                    Q(room_type__isnull=True) | Q(room_type=room_type),
+                    Q(start__isnull=True) | Q(start__lte=night), Q(end__isnull=True) | Q(end__gt=night), night__gt=0,
+                ).values_list('priority', 'room_type_id', 'pk', 'price')
+                best = max(applicable, key=lambda rate: (rate[0], rate[1] is not None, rate[2]), default=None)
+                total += best[3] if best else price
+            return total
+
+        invalidate_rates(DEFAULT_PROPERTY_ID)
+        with CaptureQueriesContext(connection) as build_queries:
+            start = time.perf_counter()
+            calendar = price_calendar(DEFAULT_PROPERTY_ID)
+            calendar.plan(next(iter(rooms)))
+            build_ms = (time.perf_counter() - start) * 1000
+        build = {'ms': round(build_ms, 1), 'queries': len(build_queries.captured_queries), 'days': calendar.days}
+        start = time.perf_counter()
+        quotes = {pk: calendar.stay_price(pk, first, args.nights) for pk, first in stays}
+        first_pass_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        for pk, first in stays:
+            calendar.stay_price(pk, first, args.nights)
+        warm_ms = (time.perf_counter() - start) * 1000
+
+        sample = stays[:args.sample]
+        start = time.perf_counter()
+        for pk, first in sample:
+            assert night_by_night(pk, first) == quotes[pk], pk
+        python_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        for pk, first in stays[:args.query_sample]:
+            assert query_per_night(pk, first) == quotes[pk], pk
+        query_ms = (time.perf_counter() - start) * 1000
+
+        user = User.objects.create_user(username='bench', email='bench@example.com', password='Bench1234!')
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        urls = [
+            (reverse('room-quote', args=[pk]), {'start': first.isoformat(), 'end': (first + datetime.timedelta(days=args.nights)).isoformat()})
+            for pk, first in (rng.choice(stays) for _ in range(args.repeat))
+        ]
+        requests = iter(urls * 2)
+        endpoint = harness.timed(lambda: client.get(*next(requests)), args.repeat)
+
+        harness.report({
+            'rooms': len(rooms),
+            'room_types': room_types,
+            'rates': rate_count,
+            'nights': args.nights,
+            'calendar_build': build,
+            'calendar_quotes': {
+                'plans': len({calendar.plan(pk) for pk in rooms}),
+                'first_pass_ms': round(first_pass_ms, 1),
+                'warm_ms': round(warm_ms, 1),
+                'warm_us_per_quote': round(warm_ms * 1000 / len(stays), 2),
+            },
+            'python_night_by_night_us_per_quote': round(python_ms * 1000 / len(sample), 1),
+            'query_per_night_ms_per_quote': round(query_ms / max(1, args.query_sample), 1),
+            'quote_endpoint': harness.summarize(endpoint),
+        }, args.json)
+
+
+if __name__ == '__main__':
+    main()
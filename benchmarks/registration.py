@@ -0,0 +1,53 @@
+"""Registrations per second through /api/auth/register/.
+
+    python -m benchmarks.registration --registrations 300 --existing-users 20000
+
+Password hashing normally dominates; --fast-hasher swaps in MD5 so the
+validation and duplicate-check pipeline is what gets measured.
+"""
+import time
+
+from benchmarks import harness
+
+
+def main():
+    p = harness.parser(__doc__)
+    p.add_argument('--registrations', type=int, default=300)
+    p.add_argument('--existing-users', type=int, default=20000)
+    p.add_argument('--fast-hasher', action='store_true')
+    args = p.parse_args()
+    harness.setup()
+
+    from django.contrib.auth.models import User
+    from django.test import override_settings
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    hashers = ['django.contrib.auth.hashers.MD5PasswordHasher'] if args.fast_hasher else None
+    with harness.test_database(), override_settings(**({'PASSWORD_HASHERS': hashers} if hashers else {})):
+        User.objects.bulk_create(
+            User(username=f'existing{i}', email=f'existing{i}@example.com', password='!') for i in range(args.existing_users)
+        )
+        client = APIClient()
+        counter = iter(range(args.registrations * 2))
+
+        def register():
+            i = next(counter)
+            data = {'username': f'new{i}', 'email': f'new{i}@example.com', 'password': 'StrongPass1234!'}
+            assert client.post(reverse('register'), data, format='json').status_code == 201
+
+        def rejected():
+            i = next(counter)
+            data = {'username': f'bad{i}', 'email': f'bad{i}@example.com', 'password': 'password'}
+            assert client.post(reverse('register'), data, format='json').status_code == 400
+
+        start = time.perf_counter()
+        samples = harness.timed(register, args.registrations)
+        elapsed = time.perf_counter() - start
+        results = {'registrations_per_sec': round(args.registrations / elapsed, 1), 'accepted': harness.summarize(samples)}
+        results['rejected_weak_password'] = harness.summarize(harness.timed(rejected, args.registrations))
+    harness.report(results, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""Read throughput with and without read replicas, under a concurrent check-in/checkout load.
+
+The primary and each replica are SQLite files; a replication thread copies the primary into the
+replicas every --replication-interval seconds (copy_sqlite_replica). Reader threads fetch the room
+list, a room and their own bookings; writer threads check guests in and out, which blocks readers
+of the same SQLite file while each write commits. The read-your-writes check has guests check in
+and list their bookings straight away, with and without the pin on the primary.
+
+    DB_ENGINE=sqlite python -m benchmarks.replicas --replicas 2 --threads 8 --writers 2
+"""
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from benchmarks import harness
+
+
+def main():
+    p = harness.parser(__doc__)
+    p.add_argument('--scale', type=float, default=0.02, help='Fraction of 10k rooms / 100k users / 1M bookings to seed.')
+    p.add_argument('--replicas', type=int, default=2)
+    p.add_argument('--requests', type=int, default=3000)
+    p.add_argument('--threads', type=int, default=8)
+    p.add_argument('--writers', type=int, default=2)
+    p.add_argument('--replication-interval', type=float, default=0.5)
+    p.add_argument('--guests', type=int, default=50, help='Guests in the read-your-writes check.')
+    args = p.parse_args()
+    harness.setup()
+
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from django.db import connection, connections
+    from django.db.backends.signals import connection_created
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import AccessToken
+    from benchmarks.factories import seed
+    from bookings.models import Booking
+    from pmsapi.replicas import copy_sqlite_replica
+    from rooms.models import Room
+
+    if connection.vendor != 'sqlite':
+        raise SystemExit('Run with DB_ENGINE=sqlite: the replicas are copies of a SQLite primary.')
+    workdir = Path(tempfile.mkdtemp(prefix='pms-replicas-'))
+    # A file, not the in-memory default, so the replicas have something to copy and compare with.
+    connection.settings_dict.setdefault('TEST', {})['NAME'] = str(workdir / 'primary.sqlite3')
+
+    with harness.test_database():
+        counts = seed(int(10_000 * args.scale), int(100_000 * args.scale), int(1_000_000 * args.scale), rollups=False)
+        aliases = [f'replica{i}' for i in range(1, args.replicas + 1)]
+        for alias in aliases:
+            connections.settings[alias] = {**connection.settings_dict, 'NAME': str(workdir / f'{alias}.sqlite3')}
+            copy_sqlite_replica(alias)
+
+        guests = list(Booking.objects.values_list('user_id', flat=True).distinct()[:200])
+        tokens = {user_id: f'Bearer {AccessToken.for_user(User(pk=user_id))}' for user_id in guests}
+        room_ids = list(Room.objects.values_list('pk', flat=True)[:500])
+        free = iter(list(Room.objects.filter(is_available=True).exclude(booking__status='RESERVED').values_list('number', flat=True)))
+
+        queries = {}
+        lock = threading.Lock()
+
+        def count(execute, sql, params, many, context):
+            with lock:
+                queries[context['connection'].alias] = queries.get(context['connection'].alias, 0) + 1
+            return execute(sql, params, many, context)
+
+        def install(connection, **kwargs):
+            connection.execute_wrappers.append(count)
+
+        def client(user_id):
+            c = APIClient()
+            c.credentials(HTTP_AUTHORIZATION=tokens[user_id])
+            return c
+
+        def read(i):
+            rng = random.Random(i)
+            c = client(rng.choice(guests))
+            url = rng.choice((
+                reverse('room-list-create'),
+                reverse('room-detail', args=[rng.choice(room_ids)]),
+                reverse('booking-list-create'),
+            ))
+            start = time.perf_counter()
+            c.get(url)
+            return (time.perf_counter() - start) * 1000
+
+        def write(stop, number):
+            c = client(guests[0])
+            while not stop.is_set():
+                c.post(reverse('booking-list-create'), {'room_number': number}, format='json')
+                c.post(reverse('booking-checkout'), {'room_number': number}, format='json')
+            connections.close_all()
+
+        def replicate(stop):
+            while not stop.wait(args.replication_interval):
+                for alias in settings.DATABASE_REPLICAS:
+                    copy_sqlite_replica(alias)
+            connections.close_all()
+
+        def run(replicas):
+            settings.DATABASE_REPLICAS = replicas
+            for alias in replicas:
+                copy_sqlite_replica(alias)
+            queries.clear()
+            stop = threading.Event()
+            background = [threading.Thread(target=replicate, args=(stop,))]
+            background += [threading.Thread(target=write, args=(stop, next(free))) for _ in range(args.writers)]
+            for thread in background:
+                thread.start()
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.threads) as executor:
+                samples = list(executor.map(read, range(args.requests)))
+                barrier = threading.Barrier(args.threads)
+                list(executor.map(lambda _: (barrier.wait(), connections.close_all()), range(args.threads)))
+            elapsed = time.perf_counter() - start
+            stop.set()
+            for thread in background:
+                thread.join()
+            return {**harness.summarize(samples), 'rps': round(len(samples) / elapsed), 'queries': dict(sorted(queries.items()))}
+
+        def read_your_writes(pin_seconds):
+            settings.DATABASE_REPLICAS = aliases
+            settings.DB_REPLICA_PIN_SECONDS = pin_seconds
+            settings.DB_REPLICA_MAX_LAG = 60
+            for alias in aliases:
+                copy_sqlite_replica(alias)
+            seen = 0
+            for user_id in guests[1:args.guests + 1]:
+                c = client(user_id)
+                booking = c.post(reverse('booking-list-create'), {'room_number': next(free)}, format='json').json()['id']
+                seen += booking in {b['id'] for b in c.get(reverse('booking-list-create'), {'fields': 'id'}).json()['results']}
+            return f'{seen}/{args.guests}'
+
+        connection_created.connect(install)
+        for c in connections.all():
+            c.execute_wrappers.append(count)
+        harness.report({
+            'seeded': counts,
+            'threads': args.threads,
+            'writers': args.writers,
+            'primary_only': run([]),
+            f'{args.replicas}_replicas': run(aliases),
+            'read_your_writes_pinned': read_your_writes(settings.DB_REPLICA_PIN_SECONDS),
+            'read_your_writes_unpinned': read_your_writes(0),
+        }, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Year-long occupancy/revenue reports from the rollups against scanning the bookings table.
+
+    python -m benchmarks.reports --rooms 100 --years 3
+"""
+import datetime
+import random
+
+from benchmarks import harness
+
+
+def main():
+    p = harness.parser(__doc__)
+    p.add_argument('--rooms', type=int, default=100)
+    p.add_argument('--years', type=int, default=3)
+    p.add_argument('--repeat', type=int, default=20)
+    args = p.parse_args()
+    harness.setup()
+
+    from django.contrib.auth.models import User
+    from django.urls import reverse
+    from django.utils import timezone
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import AccessToken
+    from analytics.rollups import _totals, rebuild
+    from bookings.models import Booking
+    from rooms.models import Room
+
+    rng = random.Random(42)
+    with harness.test_database():
+        user = User.objects.create(username='bench', email='bench@example.com', is_staff=True)
+        rooms = Room.objects.bulk_create(Room(number=str(i), price='100.00') for i in range(args.rooms))
+        first = timezone.localdate() - datetime.timedelta(days=365 * args.years)
+        bookings = []
+        for room in rooms:
+            day = first
+            while day < timezone.localdate():
+                nights = rng.randint(1, 7)
+                check_in = timezone.make_aware(datetime.datetime.combine(day, datetime.time(15)))
+                bookings.append(Booking(
+                    user=user, room=room, property_id=room.property_id, status='CHECKED_OUT', check_in=check_in,
+                    check_out=check_in + datetime.timedelta(days=nights), full_price=100 * nights,
+                    arrival=day, departure=day + datetime.timedelta(days=nights),
+                ))
+                day += datetime.timedelta(days=nights + rng.randint(0, 3))
+        check_ins = [booking.check_in for booking in bookings]
+        Booking.objects.bulk_create(bookings, batch_size=5000)
+        # check_in is auto_now_add, so bulk_create overwrote the synthetic timestamps.
+        for booking, check_in in zip(bookings, check_ins):
+            booking.check_in = check_in
+        Booking.objects.bulk_update(bookings, ['check_in'], batch_size=5000)
+
+        rebuild_ms = harness.timed(rebuild, 1)[0]
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        end = timezone.localdate()
+        start = end - datetime.timedelta(days=365)
+        params = {'start': start.isoformat(), 'end': end.isoformat()}
+
+        def scan():
+            # What a report without rollups has to do: read every stay touching the range.
+            stays = Booking.objects.filter(
+                status='CHECKED_OUT', check_in__lt=timezone.make_aware(datetime.datetime.combine(end, datetime.time.min)),
+                check_out__gte=timezone.make_aware(datetime.datetime.combine(start, datetime.time.min)),
+            ).only('property_id', 'room_id', 'check_in', 'check_out', 'full_price')
+            _totals(stays.iterator(), start, end)
+
+        harness.report({
+            'rooms': args.rooms,
+            'bookings': len(bookings),
+            'rebuild_ms': round(rebuild_ms, 1),
+            'revenue_by_day': harness.summarize(harness.timed(lambda: client.get(reverse('report-revenue'), params), args.repeat)),
+            'occupancy_by_room': harness.summarize(harness.timed(
+                lambda: client.get(reverse('report-occupancy'), {**params, 'group': 'room'}), args.repeat,
+            )),
+            'scan_bookings': harness.summarize(harness.timed(scan, max(1, args.repeat // 4))),
+        }, args.json)
+
+
+if __name__ == '__main__':
+    main()
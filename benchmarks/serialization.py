@@ -0,0 +1,56 @@
+"""List rendering: RowEncoder over .values() rows and FastJSONRenderer against the serializers and JSONRenderer.
+
+Both paths fetch the rows and produce the same response bytes (checked before timing).
+
+    python -m benchmarks.serialization --rows 10000 --repeat 10
+"""
+from benchmarks import harness
+
+
+def main():
+    p = harness.parser(__doc__)
+    p.add_argument('--rows', type=int, default=10000)
+    p.add_argument('--repeat', type=int, default=10)
+    args = p.parse_args()
+    harness.setup()
+
+    from django.contrib.auth.models import User
+    from rest_framework.renderers import JSONRenderer
+    from bookings.models import Booking
+    from bookings.serializers import BookingSerializer
+    from pmsapi.fastread import RowEncoder
+    from pmsapi.renderers import FastJSONRenderer, orjson
+    from rooms.models import Room
+    from rooms.serializers import RoomSerializer
+
+    results = {'rows': args.rows, 'orjson': orjson is not None}
+    with harness.test_database():
+        user = User.objects.create(username='bench', email='bench@example.com')
+        rooms = Room.objects.bulk_create((Room(number=str(i), price='100.00') for i in range(args.rows)), batch_size=5000)
+        Booking.objects.bulk_create(
+            (Booking(user=user, room=room, property_id=room.property_id, status='CHECKED_OUT', full_price='250.00') for room in rooms), batch_size=5000,
+        )
+
+        for name, queryset, serializer_class in (
+            ('rooms', Room.objects.order_by('pk'), RoomSerializer),
+            ('bookings', Booking.objects.order_by('pk'), BookingSerializer),
+        ):
+            def serializer():
+                return JSONRenderer().render(serializer_class(queryset.all(), many=True).data)
+
+            def fast():
+                encoder = RowEncoder.for_serializer(serializer_class())
+                return FastJSONRenderer().render(encoder.encode_many(queryset.values(*encoder.columns)))
+
+            assert fast() == serializer(), f'{name}: outputs differ'
+            summaries = {
+                'serializer': harness.summarize(harness.timed(serializer, args.repeat)),
+                'fast': harness.summarize(harness.timed(fast, args.repeat)),
+            }
+            speedup = summaries['serializer']['mean_ms'] / summaries['fast']['mean_ms']
+            results[name] = {**summaries, 'speedup': round(speedup, 1)}
+    harness.report(results, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""Queries and latency per request on /api/bookings/ with and without stateless JWT auth.
+
+    python -m benchmarks.stateless_auth --requests 500
+"""
+from benchmarks import harness
+
+
+def measure(client, url, requests):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as ctx:
+        samples = harness.timed(lambda: client.get(url), requests)
+    return {'queries_per_request': len(ctx.captured_queries) / requests, **harness.summarize(samples)}
+
+
+def main():
+    p = harness.parser(__doc__)
+    p.add_argument('--requests', type=int, default=500)
+    p.add_argument('--bookings', type=int, default=20)
+    args = p.parse_args()
+    harness.setup()
+
+    from django.contrib.auth.models import User
+    from django.test import override_settings
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import AccessToken
+    from bookings.models import Booking
+    from rooms.models import Room
+
+    with harness.test_database():
+        user = User.objects.create(username='bench', email='bench@example.com')
+        Room.objects.bulk_create(Room(number=str(i), price='100.00') for i in range(args.bookings))
+        Booking.objects.bulk_create(Booking(user=user, room=room, property_id=room.property_id) for room in Room.objects.all())
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        url = reverse('booking-list-create')
+
+        results = {}
+        for mode, stateless in (('database_user', False), ('stateless', True)):
+            with override_settings(JWT_STATELESS_AUTH=stateless):
+                client.get(url)  # warm caches
+                results[mode] = measure(client, url, args.requests)
+        harness.report(results, args.json)
+
+
+if __name__ == '__main__':
+    main()
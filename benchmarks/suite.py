@@ -0,0 +1,354 @@
+"""Load test of every API route against a seeded hotel, in-process and over HTTP, checked against a baseline.
+
+    python -m benchmarks.suite --scale 0.01 --requests 200 --concurrency 8
+    python -m benchmarks.suite --save-baseline benchmarks/baseline.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json
+
+--scale 1 seeds 10k rooms, 100k users and 1M bookings (benchmarks/factories.py). Each scenario is one
+route and method, run by --concurrency threads: "inprocess" calls Django's handler directly and "http"
+goes through a threaded WSGI server on a local port. Every scenario reports throughput, latency
+percentiles and queries per request (read from the Server-Timing header).
+
+With --baseline, a scenario regresses when its throughput drops or its p95 rises by more than
+--tolerance, or when it issues more queries per request; the script then exits with status 1.
+Record the baseline on the machine that runs the comparison.
+"""
+import collections
+import datetime
+import http.client
+import json
+import random
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from benchmarks import harness
+
+# ``user`` indexes the drivers' tokens; None sends the request anonymously.
+Call = collections.namedtuple('Call', 'method path body user expected', defaults=(None, 0, 200))
+
+_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+class InProcessDriver:
+    """Requests through Django's test client, one client per thread."""
+
+    def __init__(self, tokens):
+        from django.test import Client
+
+        self.tokens = tokens
+        self.local = threading.local()
+        self.client_class = Client
+
+    def send(self, call):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = self.client_class(raise_request_exception=False)
+        auth = {} if call.user is None else {'HTTP_AUTHORIZATION': self.tokens[call.user]}
+        response = client.generic(
+            call.method, call.path, json.dumps(call.body) if call.body is not None else '',
+            content_type='application/json', **auth,
+        )
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        response.close()
+        return response.status_code, response.headers.get('Server-Timing', ''), body
+
+
+class HttpDriver:
+    """Requests over keep-alive HTTP connections to a local threaded WSGI server, one per thread."""
+
+    def __init__(self, tokens):
+        from django.core.handlers.wsgi import WSGIHandler
+        from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+        from django.test.utils import modify_settings
+
+        class QuietHandler(WSGIRequestHandler):
+            def log_message(self, *args):
+                pass
+
+        self.tokens = tokens
+        self.local = threading.local()
+        self.allowed_hosts = modify_settings(ALLOWED_HOSTS={'append': '127.0.0.1'})
+        self.allowed_hosts.enable()
+        self.server = ThreadedWSGIServer(('127.0.0.1', 0), QuietHandler, allow_reuse_address=False)
+        self.server.set_app(WSGIHandler())
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def send(self, call):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = self.local.conn = http.client.HTTPConnection(*self.server.server_address)
+        headers = {'Content-Type': 'application/json'}
+        if call.user is not None:
+            headers['Authorization'] = self.tokens[call.user]
+        conn.request(call.method, call.path, json.dumps(call.body) if call.body is not None else None, headers)
+        response = conn.getresponse()
+        body = response.read()
+        return response.status, response.getheader('Server-Timing', ''), body
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.allowed_hosts.disable()
+
+
+def run(driver, calls, concurrency):
+    """Send ``calls`` from ``concurrency`` threads and summarise latency, throughput and queries."""
+    errors = []
+
+    def one(call):
+        start = time.perf_counter()
+        status, timing, body = driver.send(call)
+        elapsed = (time.perf_counter() - start) * 1000
+        if status != call.expected:
+            errors.append(f'{call.method} {call.path}: {status} {body[:200]!r}')
+        match = _QUERIES.search(timing)
+        return elapsed, int(match.group(1)) if match else 0
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(one, calls))
+    elapsed = time.perf_counter() - start
+    result = {
+        **harness.summarize([ms for ms, _ in samples]),
+        'rps': round(len(samples) / elapsed, 1),
+        'queries_per_request': round(sum(q for _, q in samples) / len(samples), 2),
+        'errors': len(errors),
+    }
+    if errors:
+        result['first_error'] = errors[0]
+    return result
+
+
+class Plan:
+    """Builds the calls of each scenario from the current state of the database."""
+
+    def __init__(self, mode, requests, writes, users, guests, free_rooms, rng):
+        from django.utils import timezone
+
+        self.mode = mode
+        self.requests = requests
+        self.writes = writes
+        self.logins = max(5, requests // 20)
+        self.users = users
+        self.guests = guests
+        self.free = free_rooms
+        self.rng = rng
+        self.today = timezone.localdate()
+
+    def url(self, name, *args, **query):
+        from django.urls import reverse
+
+        return reverse(name, args=args) + (f'?{urlencode(query)}' if query else '')
+
+    def take(self, count):
+        rooms, self.free[:] = self.free[:count], self.free[count:]
+        if len(rooms) < count:
+            raise SystemExit('Not enough free rooms for the write scenarios: lower --requests or raise --scale.')
+        return rooms
+
+    def user(self, i):
+        return i % len(self.users)
+
+    def scenarios(self):
+        """Yield ``(name, build)``; ``build()`` is called right before the scenario runs."""
+        from benchmarks.factories import GUEST_PASSWORD
+        from bookings.models import Booking
+        from rooms.models import Room
+
+        n, w, today = self.requests, self.writes, self.today
+        room_ids = list(Room.objects.values_list('pk', flat=True))
+        day = lambda offset: (today + datetime.timedelta(days=offset)).isoformat()
+        stays = {}
+
+        def bench_bookings(status):
+            return list(Booking.objects.filter(user_id__in=self.users, status=status).values_list('pk', 'user_id', 'room__number'))
+
+        yield 'room-list-create GET', lambda: [Call('GET', self.url('room-list-create', page_size=50)) for _ in range(n)]
+        yield 'room-detail GET', lambda: [Call('GET', self.url('room-detail', self.rng.choice(room_ids))) for _ in range(n)]
+        yield 'room-available-list GET', lambda: [Call('GET', self.url('room-available-list')) for _ in range(n)]
+        yield 'room-available-list GET range', lambda: [
+            Call('GET', self.url('room-available-list', start=day(k), end=day(k + 3)))
+            for k in (self.rng.randint(1, 60) for _ in range(n))
+        ]
+        yield 'room-quote GET', lambda: [
+            Call('GET', self.url('room-quote', self.rng.choice(room_ids), start=day(k), end=day(k + 365)))
+            for k in (self.rng.randint(1, 60) for _ in range(n))
+        ]
+        yield 'async-room-list GET', lambda: [Call('GET', self.url('async-room-list', page_size=50)) for _ in range(n)]
+        yield 'async-room-available-list GET', lambda: [Call('GET', self.url('async-room-available-list')) for _ in range(n)]
+
+        prefix = f'{self.mode[0].upper()}{self.rng.randint(0, 999):03d}'
+        yield 'room-list-create POST', lambda: [
+            Call('POST', self.url('room-list-create'), {'number': f'{prefix}{i}', 'price': '150.00', 'is_available': True}, expected=201)
+            for i in range(w)
+        ]
+
+        def patch_rooms():
+            new_rooms = list(Room.objects.filter(number__startswith=prefix).values_list('pk', 'number'))
+            self.free.extend(number for _, number in new_rooms)
+            return [Call('PATCH', self.url('room-detail', pk), {'price': '160.00'}) for pk, _ in new_rooms]
+
+        yield 'room-detail PATCH', patch_rooms
+
+        def check_in(name):
+            stays[name] = [(self.user(i), room) for i, room in enumerate(self.take(w))]
+            return [Call('POST', self.url(name), {'room_number': room}, user, 201) for user, room in stays[name]]
+
+        def check_out(name, stays_of):
+            return [Call('POST', self.url(name), {'room_number': room}, user) for user, room in stays[stays_of]]
+
+        yield 'booking-list-create POST', lambda: check_in('booking-list-create')
+        yield 'booking-list-create GET', lambda: [Call('GET', self.url('booking-list-create'), user=self.user(i)) for i in range(n)]
+        yield 'booking-detail GET', lambda: [
+            Call('GET', self.url('booking-detail', pk), user=self.users.index(user_id))
+            for pk, user_id, _ in bench_bookings('CHECKED_IN')
+        ]
+
+        def move():
+            moves = list(zip(bench_bookings('CHECKED_IN'), self.take(w)))
+            stays['booking-list-create'] = [(self.users.index(user_id), room) for (_, user_id, _), room in moves]
+            return [
+                Call('PATCH', self.url('booking-detail', pk), {'room_number': room}, self.users.index(user_id))
+                for (pk, user_id, _), room in moves
+            ]
+
+        yield 'booking-detail PATCH', move
+        yield 'booking-checkout POST', lambda: check_out('booking-checkout', 'booking-list-create')
+        yield 'async-booking-list-create POST', lambda: check_in('async-booking-list-create')
+        yield 'async-booking-checkout POST', lambda: check_out('async-booking-checkout', 'async-booking-list-create')
+
+        yield 'reservation-list-create POST', lambda: [
+            Call('POST', self.url('reservation-list-create'), {'room_number': room, 'arrival': day(90 + i % 30), 'departure': day(93 + i % 30)}, self.user(i), 201)
+            for i, room in enumerate(self.take(w))
+        ]
+        yield 'reservation-list-create GET', lambda: [Call('GET', self.url('reservation-list-create'), user=self.user(i)) for i in range(n)]
+        yield 'booking-detail DELETE', lambda: [
+            Call('DELETE', self.url('booking-detail', pk), user=self.users.index(user_id), expected=204)
+            for pk, user_id, _ in bench_bookings('RESERVED')
+        ]
+
+        def batch_in():
+            rooms = self.take(3 * w)
+            stays['batch'] = [(self.user(i), rooms[3 * i:3 * i + 3]) for i in range(w)]
+            return [Call('POST', self.url('booking-batch-checkin'), {'room_numbers': group}, user, 201) for user, group in stays['batch']]
+
+        yield 'booking-batch-checkin POST', batch_in
+        yield 'booking-batch-checkout POST', lambda: [
+            Call('POST', self.url('booking-batch-checkout'), {'room_numbers': group}, user) for user, group in stays['batch']
+        ]
+
+        yield 'report-occupancy GET', lambda: [Call('GET', self.url('report-occupancy', start=day(-365), end=day(0))) for _ in range(n)]
+        yield 'report-revenue GET', lambda: [Call('GET', self.url('report-revenue', start=day(-30), end=day(0), group='room')) for _ in range(n)]
+        yield 'booking-export GET', lambda: [
+            Call('GET', self.url('booking-export', 'ndjson', check_in_from=day(-2))) for _ in range(max(1, n // 10))
+        ]
+
+        def delete_rooms():
+            new_rooms = dict(Room.objects.filter(number__startswith=prefix).values_list('pk', 'number'))
+            self.free[:] = [number for number in self.free if number not in new_rooms.values()]
+            return [Call('DELETE', self.url('room-detail', pk), expected=204) for pk in new_rooms]
+
+        yield 'room-detail DELETE', delete_rooms
+
+        yield 'login POST', lambda: [
+            Call('POST', self.url('login'), {'username': f'guest{self.rng.randrange(self.guests)}', 'password': GUEST_PASSWORD}, None)
+            for _ in range(self.logins)
+        ]
+        yield 'register POST', lambda: [
+            Call('POST', self.url('register'), {'username': f'{prefix}new{i}', 'email': f'{prefix}new{i}@example.com', 'password': GUEST_PASSWORD}, None, 201)
+            for i in range(self.logins)
+        ]
+
+
+def compare(results, baseline, tolerance):
+    """Regressions of ``results`` against ``baseline``, as messages."""
+    regressions = []
+    for mode, scenarios in results['modes'].items():
+        for name, now in scenarios.items():
+            before = baseline.get('modes', {}).get(mode, {}).get(name)
+            if before is None:
+                continue
+            label = f'{mode} {name}'
+            if now['rps'] < before['rps'] * (1 - tolerance):
+                regressions.append(f'{label}: {now["rps"]} req/s, baseline {before["rps"]}')
+            if now['p95_ms'] > before['p95_ms'] * (1 + tolerance):
+                regressions.append(f'{label}: p95 {now["p95_ms"]} ms, baseline {before["p95_ms"]}')
+            if now['queries_per_request'] > before['queries_per_request']:
+                regressions.append(f'{label}: {now["queries_per_request"]} queries per request, baseline {before["queries_per_request"]}')
+    return regressions
+
+
+def main():
+    p = harness.parser(__doc__)
+    p.add_argument('--scale', type=float, default=1.0, help='Fraction of 10k rooms / 100k users / 1M bookings to seed.')
+    p.add_argument('--requests', type=int, default=500, help='Requests per read scenario.')
+    p.add_argument('--concurrency', type=int, default=8)
+    p.add_argument('--modes', nargs='+', choices=('inprocess', 'http'), default=['inprocess', 'http'])
+    p.add_argument('--baseline', help='Compare with this results file and exit 1 on a regression.')
+    p.add_argument('--save-baseline', help='Write the results to this file.')
+    p.add_argument('--tolerance', type=float, default=0.25, help='Allowed throughput/p95 change against the baseline.')
+    args = p.parse_args()
+    harness.setup()
+
+    from django.contrib.auth.models import User
+    from django.utils import timezone
+    from rest_framework_simplejwt.tokens import AccessToken
+    from benchmarks.factories import seed, seed_users
+    from rooms.models import Room
+
+    rng = random.Random(7)
+    with harness.test_database() as connection:
+        start = time.perf_counter()
+        counts = seed(int(10_000 * args.scale), int(100_000 * args.scale), int(1_000_000 * args.scale))
+        bench_users = seed_users(max(args.concurrency, 8), prefix='bench', is_staff=True)
+        seeding = time.perf_counter() - start
+        tokens = [f'Bearer {AccessToken.for_user(user)}' for user in User.objects.filter(pk__in=bench_users).order_by('pk')]
+
+        free = list(Room.objects.filter(is_available=True).exclude(booking__departure__gt=timezone.localdate()).values_list('number', flat=True))
+        rng.shuffle(free)
+        # Each mode books 7 rooms per write: check-in, move, async check-in, reservation and a batch of 3.
+        writes = max(1, min(args.requests, len(free) // (7 * len(args.modes))))
+        results = {
+            'meta': {
+                'vendor': connection.vendor, 'scale': args.scale, 'concurrency': args.concurrency, 'requests': args.requests,
+                'writes': writes, 'seeding_s': round(seeding, 1), **counts,
+            },
+            'modes': {},
+        }
+        for mode in args.modes:
+            driver = (InProcessDriver if mode == 'inprocess' else HttpDriver)(tokens)
+            plan = Plan(mode, args.requests, writes, bench_users, counts['users'], free, rng)
+            results['modes'][mode] = {}
+            for name, build in plan.scenarios():
+                calls = build()
+                if calls:
+                    results['modes'][mode][name] = run(driver, calls, args.concurrency)
+            if mode == 'http':
+                driver.close()
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        results['regressions'] = regressions
+    if args.json:
+        harness.report(results, True)
+    else:
+        harness.report({
+            'meta': results['meta'],
+            **{f'{mode} {name}': result for mode, scenarios in results['modes'].items() for name, result in scenarios.items()},
+            'regressions': regressions,
+        })
+    if regressions or any(r['errors'] for scenarios in results['modes'].values() for r in scenarios.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
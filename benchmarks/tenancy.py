@@ -0,0 +1,83 @@
+"""One property's bookings for the current month: the property-leading index against a join through rooms.
+
+Bookings are spread over ``--properties`` hotels and ``--months`` of check-ins. The scoped query reads one
+range of booking_property_check_in_idx; the joined one is what it costs without the copied property.
+
+    python -m benchmarks.tenancy --properties 20 --bookings 500000
+    python -m benchmarks.tenancy --properties 200 --bookings 50000000 --repeat 20   # Postgres
+"""
+import datetime
+
+from benchmarks import harness
+
+
+def seed(properties, rooms, bookings, months):
+    from django.contrib.auth.models import User
+    from django.utils import timezone
+    from benchmarks.factories import synthetic_check_in
+    from bookings.models import Booking
+    from pmsapi.importing import chunked
+    from rooms.models import Property, Room
+
+    user = User.objects.create(username='bench', email='bench@example.com')
+    Property.objects.bulk_create(Property(code=f'p{i}', name=f'Property {i}') for i in range(1, properties))
+    Room.objects.bulk_create(
+        (Room(property=prop, number=str(i), price='100.00') for prop in Property.objects.all() for i in range(rooms)),
+        batch_size=5000,
+    )
+    room_rows = list(Room.objects.values_list('pk', 'property_id'))
+    start = timezone.now() - datetime.timedelta(days=30 * months)
+    step = datetime.timedelta(days=30 * months) / bookings
+
+    def stays():
+        # Check-ins advance evenly through the period and rotate over every room of every property.
+        for i in range(bookings):
+            room_id, property_id = room_rows[i % len(room_rows)]
+            yield Booking(
+                user=user, room_id=room_id, property_id=property_id, status='CHECKED_OUT', check_in=start + step * i,
+                full_price='100.00',
+            )
+
+    with synthetic_check_in():
+        for batch in chunked(stays(), 10000):
+            Booking.objects.bulk_create(batch)
+
+
+def main():
+    p = harness.parser(__doc__)
+    p.add_argument('--properties', type=int, default=20)
+    p.add_argument('--rooms', type=int, default=50, help='Rooms per property.')
+    p.add_argument('--bookings', type=int, default=500000)
+    p.add_argument('--months', type=int, default=24)
+    p.add_argument('--repeat', type=int, default=20)
+    args = p.parse_args()
+    harness.setup()
+
+    from django.utils import timezone
+    from bookings.models import Booking
+    from rooms.models import DEFAULT_PROPERTY_ID
+
+    with harness.test_database():
+        seed(args.properties, args.rooms, args.bookings, args.months)
+        today = timezone.localdate()
+        month = timezone.make_aware(datetime.datetime(today.year, today.month, 1))
+        scoped = Booking.objects.in_property(DEFAULT_PROPERTY_ID).filter(check_in__gte=month).values_list('pk', 'full_price')
+        joined = Booking.objects.filter(room__property_id=DEFAULT_PROPERTY_ID, check_in__gte=month).values_list('pk', 'full_price')
+        rows = len(list(scoped))
+        assert sorted(joined) == sorted(scoped.all()), 'queries disagree'
+        summaries = {
+            'scoped': harness.summarize(harness.timed(lambda: list(scoped.all()), args.repeat)),
+            'joined': harness.summarize(harness.timed(lambda: list(joined.all()), args.repeat)),
+        }
+        harness.report({
+            'bookings': args.bookings,
+            'properties': args.properties,
+            'month_rows': rows,
+            **summaries,
+            'speedup': round(summaries['joined']['mean_ms'] / summaries['scoped']['mean_ms'], 1),
+            'plan': scoped.explain(),
+        }, args.json)
+
+
+if __name__ == '__main__':
+    main()
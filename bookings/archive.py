@@ -0,0 +1,163 @@
+"""Hot/cold storage of bookings.
+
+Checked-out bookings are never written again, so ``archive_batch`` moves the old ones into the
+ArchivedBooking table, keeping their ids. The bookings table and its indexes then only hold the
+stays that checkouts, check-ins and availability checks work through. ``history()`` reads both
+tables for the guest's booking list and detail, the export and the rollup rebuild.
+"""
+import heapq
+import itertools
+import operator
+
+from django.db import OperationalError, connection, transaction
+from django.utils import timezone
+from bookings.models import ArchivedBooking, Booking
+
+def archivable(before):
+    """Bookings checked out before ``before``.
+
+    Any of them, the newest included: ids come from a Postgres sequence or an SQLite AUTOINCREMENT
+    column, so a new booking never reuses an archived id.
+    """
+    return Booking.objects.filter(status='CHECKED_OUT', check_out__lt=before)
+
+def archive_batch(before, after_pk=0, batch_size=5000):
+    """Move up to ``batch_size`` archivable bookings with ids above ``after_pk`` to the archive.
+
+    Each batch is one short transaction: an INSERT ... SELECT of the rows by id, then a DELETE by id.
+    Returns the moved ids in order; pass the last one as ``after_pk`` to continue the scan.
+    """
+    qn = connection.ops.quote_name
+    booking, archive = qn(Booking._meta.db_table), qn(ArchivedBooking._meta.db_table)
+    columns = ', '.join(qn(field.column) for field in Booking._meta.concrete_fields)
+    with transaction.atomic():
+        # Locked rows are being deleted by their guest; leave them for the next run.
+        ids = list(
+            archivable(before).filter(pk__gt=after_pk).order_by('pk')
+            .select_for_update(skip_locked=True).values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            return []
+        placeholders = ', '.join(['%s'] * len(ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {archive} ({columns}, archived_at) SELECT {columns}, %s FROM {booking} WHERE id IN ({placeholders})',
+                [timezone.now(), *ids],
+            )
+            # Raw, so that no delete signals fire: the rooms do not change.
+            cursor.execute(f'DELETE FROM {booking} WHERE id IN ({placeholders})', ids)
+    return ids
+
+def table_size(model):
+    """Bytes used by the model's table and its indexes, or None if the database cannot tell."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT pg_total_relation_size(%s)', [model._meta.db_table])
+        elif connection.vendor == 'sqlite':
+            try:
+                cursor.execute(
+                    'SELECT SUM(pgsize) FROM dbstat WHERE name IN (SELECT name FROM sqlite_master WHERE tbl_name = %s)',
+                    [model._meta.db_table],
+                )
+            except OperationalError:
+                # SQLite built without the dbstat table.
+                return None
+        else:
+            return None
+        return cursor.fetchone()[0]
+
+class History:
+    """Read-only stand-in for a Booking queryset that covers the bookings table and the archive.
+
+    Filters, ``values()`` and the ordering apply to both tables. Rows come from both and are merged on
+    the ordering (a single field), then sliced. It supports what the list and detail views, cursor
+    pagination, ``keyset_page`` and the export do with a queryset.
+    """
+    model = Booking
+
+    def __init__(self, hot, cold, ordering=None, fields=None, bounds=(None, None)):
+        self.hot = hot
+        self.cold = cold
+        self.ordering = ordering
+        self.fields = fields
+        self.bounds = bounds
+
+    def _apply(self, method, *args, **kwargs):
+        return History(
+            getattr(self.hot, method)(*args, **kwargs), getattr(self.cold, method)(*args, **kwargs),
+            self.ordering, self.fields, self.bounds,
+        )
+
+    def all(self):
+        return self._apply('all')
+
+    def filter(self, *args, **kwargs):
+        return self._apply('filter', *args, **kwargs)
+
+    def in_property(self, property_id):
+        return self._apply('in_property', property_id)
+
+    def select_related(self, *fields):
+        return self._apply('select_related', *fields)
+
+    def only(self, *fields):
+        return self._apply('only', *fields)
+
+    def values(self, *fields):
+        return self._apply('values', *fields)
+
+    def values_list(self, *fields):
+        history = self._apply('values_list', *fields)
+        history.fields = fields
+        return history
+
+    def order_by(self, field):
+        history = self._apply('order_by', field)
+        history.ordering = field
+        return history
+
+    def __getitem__(self, k):
+        if not isinstance(k, slice) or k.step is not None or self.bounds != (None, None):
+            raise TypeError("History only supports one slice without a step.")
+        # Each table contributes at most k.stop rows to the merged slice.
+        return History(self.hot[:k.stop], self.cold[:k.stop], self.ordering, self.fields, (k.start, k.stop))
+
+    def _merge(self, hot, cold):
+        if self.ordering is None:
+            rows = itertools.chain(hot, cold)
+        else:
+            name = self.ordering.lstrip('-')
+            name = 'id' if name == 'pk' else name
+            if self.fields is not None:
+                key = operator.itemgetter(self.fields.index(name))
+            else:
+                key = lambda row: row[name] if isinstance(row, dict) else getattr(row, name)
+            rows = heapq.merge(hot, cold, key=key, reverse=self.ordering.startswith('-'))
+        return itertools.islice(rows, *self.bounds)
+
+    def __iter__(self):
+        return self._merge(self.hot, self.cold)
+
+    def iterator(self, chunk_size=None):
+        return self._merge(self.hot.iterator(chunk_size=chunk_size), self.cold.iterator(chunk_size=chunk_size))
+
+    async def __aiter__(self):
+        hot = [row async for row in self.hot]
+        cold = [row async for row in self.cold]
+        for row in self._merge(hot, cold):
+            yield row
+
+    def get(self, *args, **kwargs):
+        """The matching booking, looked up in the bookings table first."""
+        try:
+            return self.hot.get(*args, **kwargs)
+        except Booking.DoesNotExist:
+            pass
+        try:
+            return self.cold.get(*args, **kwargs)
+        except ArchivedBooking.DoesNotExist:
+            raise Booking.DoesNotExist("Booking matching query does not exist.") from None
+
+def history():
+    """All bookings, current and archived."""
+    return History(Booking.objects.all(), ArchivedBooking.objects.all())
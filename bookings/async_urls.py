@@ -0,0 +1,7 @@
+from django.urls import path
+from bookings.async_views import booking_list_create, booking_checkout
+
+urlpatterns = [
+    path('', booking_list_create, name='async-booking-list-create'),
+    path('checkout/', booking_checkout, name='async-booking-checkout'),
+]
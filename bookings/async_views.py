@@ -0,0 +1,32 @@
+from asgiref.sync import sync_to_async
+from rest_framework import status
+from pmsapi.asyncapi import async_api_view, json_response, keyset_page
+from bookings.archive import history
+from bookings.serializers import BookingSerializer
+from bookings.views import check_in_guest, check_out_guest
+from rooms.models import Room
+from rooms.tenancy import property_id
+
+@async_api_view('GET', 'POST')
+async def booking_list_create(request):
+    """Async counterpart of CheckinView.
+
+    Reads use the async ORM; the check-in itself needs a transaction, which Django only offers
+    synchronously, so it runs in a worker thread.
+    """
+    if request.method == 'GET':
+        return json_response(await keyset_page(request, history().in_property(property_id(request)).filter(user_id=request.user.id), BookingSerializer))
+    serializer = BookingSerializer(context={'request': request})
+    # The room comes from room_number; a client-supplied ``room`` would be a synchronous lookup and is ignored anyway.
+    data = serializer.to_internal_value({key: value for key, value in request.data.items() if key != 'room'})
+    room = await Room.objects.in_property(property_id(request)).filter(number=data['room_number']).afirst()
+    data = serializer.validate_stay(data, room)
+    booking = await sync_to_async(check_in_guest)(request.user.id, room, data.get('check_out'), data['departure'])
+    return json_response(BookingSerializer(booking, context={'request': request}).data, status=status.HTTP_201_CREATED)
+
+@async_api_view('POST')
+async def booking_checkout(request):
+    booking = await sync_to_async(check_out_guest)(request.user.id, property_id(request), request.data.get('room_number'))
+    if booking is None:
+        return json_response({"detail": "Booking not found."}, status=status.HTTP_404_NOT_FOUND)
+    return json_response(BookingSerializer(booking, context={'request': request}).data)
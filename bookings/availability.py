@@ -0,0 +1,15 @@
+from bookings.models import Booking
+from rooms.models import Room
+
+def free_rooms(start, end, property_id):
+    """The property's rooms with no stay overlapping the nights in [start, end).
+
+    Runs as a single query: the overlap test is answered from ``booking_stay_idx``,
+    which only visits the property's stays ending after ``start``.
+    """
+    busy = Booking.objects.in_property(property_id).overlapping(start, end).values('room_id')
+    return Room.objects.in_property(property_id).exclude(pk__in=busy)
+
+def room_conflicts(room, start, end):
+    """Stays on ``room`` that overlap the nights in [start, end)."""
+    return Booking.objects.overlapping(start, end).filter(room=room)
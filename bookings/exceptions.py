@@ -1,4 +1,5 @@
-from rest_framework.exceptions import ValidationError
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework import status
 from django.utils import timezone
 
 class InvalidDateRangeError(ValidationError):
@@ -13,14 +14,21 @@ class RoomNotAvailableError(ValidationError):
     default_detail = "Room is not available."
     default_code = 'room_not_available'
 
+class BatchItemsError(ValidationError):
+    default_detail = "Some items in the batch are invalid."
+    default_code = 'batch_invalid'
+
+class RoomConflictError(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Room was taken by another booking."
+    default_code = 'room_conflict'
+
 def validate_booking(room, check_in, check_out, instance=None):
-    """Validate booking"""
+    """Validate booking against the room as loaded by the caller."""
     if not check_in:
         check_in = timezone.now()  # Mimic auto_now_add
     if not (check_in.date() >= timezone.now().date()):
         raise PastDateError()
-    # Refresh room
-    room = room.__class__.objects.get(pk=room.pk)
     if not room.is_available:
         raise RoomNotAvailableError()
     if check_out and not (check_in < check_out):
@@ -0,0 +1,74 @@
+import csv
+import datetime
+import json
+
+from django.utils import timezone
+
+# Same names as BookingSerializer's output, plus the room number finance reconciles against.
+EXPORT_COLUMNS = ('id', 'user', 'room', 'room_number', 'check_in', 'check_out', 'arrival', 'departure', 'status', 'full_price')
+_VALUES = ('id', 'user_id', 'room_id', 'room__number', 'check_in', 'check_out', 'arrival', 'departure', 'status', 'full_price')
+
+def filter_export(queryset, check_in_from=None, check_in_to=None, check_out_from=None, check_out_to=None):
+    """Restrict bookings to check-in/check-out dates within inclusive day ranges (in the current time zone)."""
+    def day_start(day):
+        return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+    bounds = {
+        'check_in__gte': check_in_from and day_start(check_in_from),
+        'check_in__lt': check_in_to and day_start(check_in_to + datetime.timedelta(days=1)),
+        'check_out__gte': check_out_from and day_start(check_out_from),
+        'check_out__lt': check_out_to and day_start(check_out_to + datetime.timedelta(days=1)),
+    }
+    return queryset.filter(**{lookup: value for lookup, value in bounds.items() if value is not None})
+
+def _datetime(value, tz):
+    # Same rendering as DRF's DateTimeField.
+    if value is None:
+        return None
+    value = value.astimezone(tz).isoformat()
+    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+def export_rows(queryset, chunk_size=2000):
+    """Yield each booking as a tuple of JSON-ready values in ``EXPORT_COLUMNS`` order.
+
+    Rows come from a server-side cursor where the database supports one, so memory does not grow with the export.
+    """
+    tz = timezone.get_current_timezone()
+    rows = queryset.order_by('pk').values_list(*_VALUES).iterator(chunk_size=chunk_size)
+    for pk, user_id, room_id, number, check_in, check_out, arrival, departure, status, full_price in rows:
+        yield (
+            pk, user_id, room_id, number, _datetime(check_in, tz), _datetime(check_out, tz),
+            arrival.isoformat(), departure.isoformat(), status, f'{full_price:.2f}',
+        )
+
+class _Line:
+    """File-like target that hands back what csv.writer writes instead of buffering it."""
+    def write(self, value):
+        return value
+
+def encode_csv(rows, lines_per_chunk=500):
+    writer = csv.writer(_Line())
+    chunk = [writer.writerow(EXPORT_COLUMNS)]
+    for row in rows:
+        chunk.append(writer.writerow(row))
+        if len(chunk) >= lines_per_chunk:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+
+def encode_ndjson(rows, lines_per_chunk=500):
+    dumps = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False).encode
+    chunk = []
+    for row in rows:
+        chunk.append(dumps(dict(zip(EXPORT_COLUMNS, row))) + '\n')
+        if len(chunk) >= lines_per_chunk:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+
+ENCODERS = {
+    'csv': ('text/csv; charset=utf-8', encode_csv),
+    'ndjson': ('application/x-ndjson', encode_ndjson),
+}
@@ -0,0 +1,46 @@
+import datetime
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from bookings.archive import archivable, archive_batch, table_size
+from bookings.models import Booking
+
+def _size(size):
+    return 'unknown size' if size is None else f'{size / 2 ** 20:.1f} MiB'
+
+class Command(BaseCommand):
+    help = "Move bookings checked out long ago from the bookings table to the archive, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than', type=int, default=getattr(settings, 'BOOKING_ARCHIVE_AFTER_DAYS', 365),
+            help="Archive bookings checked out more than this many days ago (default BOOKING_ARCHIVE_AFTER_DAYS).",
+        )
+        parser.add_argument('--batch-size', type=int, default=5000, help="Bookings moved per transaction.")
+        parser.add_argument('--dry-run', action='store_true', help="Only report how many bookings would be moved.")
+
+    def handle(self, *args, **options):
+        before = timezone.now() - datetime.timedelta(days=options['older_than'])
+        if options['dry_run']:
+            self.stdout.write(f"{archivable(before).count()} bookings would be archived.")
+            return
+
+        rows_before, size_before = Booking.objects.count(), table_size(Booking)
+        moved = 0
+        last = 0
+        start = time.perf_counter()
+        while True:
+            ids = archive_batch(before, last, options['batch_size'])
+            if not ids:
+                break
+            moved += len(ids)
+            last = ids[-1]
+        elapsed = time.perf_counter() - start
+        rate = moved / elapsed if elapsed else 0
+        rows_after, size_after = Booking.objects.count(), table_size(Booking)
+        self.stdout.write(self.style.SUCCESS(f"Archived {moved} bookings in {elapsed:.2f}s ({rate:.0f} rows/s)."))
+        self.stdout.write(
+            f"Bookings table: {rows_before} rows ({_size(size_before)}) before, {rows_after} rows ({_size(size_after)}) after."
+        )
@@ -0,0 +1,45 @@
+import functools
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from bookings.export import ENCODERS, export_rows, filter_export
+from bookings.archive import history
+from bookings.serializers import ExportFilterSerializer
+
+class Command(BaseCommand):
+    help = "Stream the booking history as CSV or NDJSON to a file or stdout."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(ENCODERS), default='csv', help="Output format.")
+        parser.add_argument('--output', help="File to write; defaults to stdout.")
+        parser.add_argument('--chunk-size', type=int, default=2000, help="Rows fetched from the database cursor at a time.")
+        for field in ExportFilterSerializer().fields:
+            parser.add_argument(f"--{field.replace('_', '-')}", help="YYYY-MM-DD, inclusive.")
+
+    def handle(self, *args, **options):
+        filters = ExportFilterSerializer(data={
+            field: options[field] for field in ExportFilterSerializer().fields if options[field]
+        })
+        if not filters.is_valid():
+            raise CommandError(filters.errors)
+        queryset = filter_export(history(), **filters.validated_data)
+        rows = 0
+
+        def counted():
+            nonlocal rows
+            for row in export_rows(queryset, chunk_size=options['chunk_size']):
+                rows += 1
+                yield row
+
+        start = time.perf_counter()
+        encode = ENCODERS[options['format']][1]
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+                output.writelines(encode(counted()))
+        else:
+            write = functools.partial(self.stdout.write, ending='')
+            for chunk in encode(counted()):
+                write(chunk)
+        elapsed = time.perf_counter() - start
+        rate = rows / elapsed if elapsed else 0
+        self.stderr.write(f"Exported {rows} bookings in {elapsed:.2f}s ({rate:.0f} rows/s).")
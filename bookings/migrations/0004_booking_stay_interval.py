@@ -0,0 +1,95 @@
+# Generated by Django 5.2.5 on 2026-10-18 19:12
+
+import datetime
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_stays(apps, schema_editor):
+    Booking = apps.get_model('bookings', 'Booking')
+    for booking in Booking.objects.all().iterator():
+        booking.arrival = django.utils.timezone.localdate(booking.check_in)
+        if booking.check_out:
+            booking.departure = max(django.utils.timezone.localdate(booking.check_out), booking.arrival)
+        elif booking.status == 'CHECKED_OUT':
+            booking.departure = booking.arrival
+        booking.save(update_fields=['arrival', 'departure'])
+
+
+def separate_stays(apps, schema_editor):
+    # Legacy stays of a room may overlap, e.g. two checked-in stays that both stay open. Each stay now
+    # ends where the room's next one begins; a checked-in stay followed by another is checked out when
+    # that one checked in, and charged the room's price for its nights, as a checkout would.
+    Booking = apps.get_model('bookings', 'Booking')
+    stays = Booking.objects.select_related('room').order_by('room_id', 'arrival', 'check_in', 'pk')
+    earlier = None
+    for stay in stays.iterator():
+        if stay.departure <= stay.arrival:
+            # An empty stay overlaps nothing.
+            continue
+        if earlier is not None and earlier.room_id == stay.room_id and earlier.departure > stay.arrival:
+            fields = ['departure']
+            if earlier.status == 'CHECKED_IN':
+                earlier.status = 'CHECKED_OUT'
+                earlier.check_out = stay.check_in
+                earlier.full_price = earlier.room.price * max((earlier.check_out - earlier.check_in).days, 1)
+                fields += ['status', 'check_out', 'full_price']
+            earlier.departure = stay.arrival
+            earlier.save(update_fields=fields)
+        earlier = stay
+
+
+def add_exclusion_constraint(apps, schema_editor):
+    # Postgres can reject overlapping stays itself; other backends rely on the checks in the views.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    schema_editor.execute(
+        'ALTER TABLE bookings_booking ADD CONSTRAINT booking_no_overlapping_stays '
+        'EXCLUDE USING gist (room_id WITH =, daterange(arrival, departure) WITH &&)'
+    )
+
+
+def drop_exclusion_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('ALTER TABLE bookings_booking DROP CONSTRAINT IF EXISTS booking_no_overlapping_stays')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0003_booking_full_price_alter_booking_room'),
+        ('rooms', '0002_alter_room_is_available_alter_room_number_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='arrival',
+            field=models.DateField(default=django.utils.timezone.localdate, help_text='First night of the stay.'),
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='departure',
+            field=models.DateField(default=datetime.date(9999, 12, 31), help_text='Day the stay ends (exclusive).'),
+        ),
+        migrations.AlterField(
+            model_name='booking',
+            name='status',
+            field=models.CharField(choices=[('RESERVED', 'Reserved'), ('CHECKED_IN', 'Checked In'), ('CHECKED_OUT', 'Checked Out')], default='CHECKED_IN', help_text='Booking status.', max_length=20),
+        ),
+        migrations.RunPython(backfill_stays, migrations.RunPython.noop),
+        migrations.RunPython(separate_stays, migrations.RunPython.noop),
+        migrations.RunPython(add_exclusion_constraint, drop_exclusion_constraint),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['departure', 'arrival', 'room'], name='booking_stay_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['room', 'departure', 'arrival'], name='booking_room_stay_idx'),
+        ),
+    ]
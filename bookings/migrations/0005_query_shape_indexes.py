@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-18 19:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0004_booking_stay_interval'),
+        ('rooms', '0003_query_shape_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['user', 'status'], name='booking_user_status_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'CHECKED_IN')), fields=('room',), name='booking_one_checked_in_per_room'),
+        ),
+    ]
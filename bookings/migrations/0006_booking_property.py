@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-18 20:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0005_query_shape_indexes'),
+        ('rooms', '0004_property'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='booking',
+            name='booking_stay_idx',
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='property',
+            field=models.ForeignKey(db_index=False, default=1, help_text='Property of the booked room.', on_delete=django.db.models.deletion.PROTECT, related_name='bookings', to='rooms.property'),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['property', 'departure', 'arrival', 'room'], name='booking_stay_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['property', 'check_in'], name='booking_property_check_in_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-18 20:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0006_booking_property'),
+        ('rooms', '0004_property'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedBooking',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('check_in', models.DateTimeField()),
+                ('check_out', models.DateTimeField(blank=True, null=True)),
+                ('arrival', models.DateField()),
+                ('departure', models.DateField()),
+                ('status', models.CharField(choices=[('RESERVED', 'Reserved'), ('CHECKED_IN', 'Checked In'), ('CHECKED_OUT', 'Checked Out')], max_length=20)),
+                ('full_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('archived_at', models.DateTimeField(help_text='When the booking was moved to the archive.')),
+                ('property', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='archived_bookings', to='rooms.property')),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_bookings', to='rooms.room')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_bookings', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'id'], name='archived_booking_user_idx'), models.Index(fields=['property', 'check_in'], name='archived_booking_check_in_idx')],
+            },
+        ),
+    ]
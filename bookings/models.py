@@ -1,18 +1,196 @@
-from django.db import models
+import datetime
+
+from django.db import connections, models
+from django.db.models import Case, ExpressionWrapper, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
-from rooms.models import Room
+from django.utils import timezone
+from rates.calendar import price_calendar
+from rooms.models import Property, Room
+
+# Departure used for stays that have no planned end yet (walk-in check-ins).
+OPEN_DEPARTURE = datetime.date.max
+
+class StayNights(models.Func):
+    """Whole nights between ``since`` and ``until`` (minimum one), computed by the database.
+
+    Matches ``(until - since).days or 1`` in Python.
+    """
+    arity = 2
+    output_field = models.IntegerField()
+    templates = {
+        'postgresql': 'GREATEST(EXTRACT(DAY FROM (%(until)s - %(since)s))::integer, 1)',
+        'sqlite': 'MAX(CAST(ROUND((julianday(%(until)s) - julianday(%(since)s)) * 86400000) AS INTEGER) / 86400000, 1)',
+    }
+
+    def as_sql(self, compiler, connection, **extra_context):
+        (until, until_params), (since, since_params) = (compiler.compile(e) for e in self.get_source_expressions())
+        return self.templates[connection.vendor] % {'until': until, 'since': since}, [*until_params, *since_params]
+
+class BookingQuerySet(models.QuerySet):
+    def in_property(self, property_id):
+        return self.filter(property_id=property_id)
+
+    def overlapping(self, start, end):
+        """Bookings whose stay shares at least one night with [start, end)."""
+        return self.filter(departure__gt=start, arrival__lt=end)
+
+    def settle(self, at):
+        """Check out every stay in the queryset with a single UPDATE; the database prices each stay."""
+        today = timezone.localdate(at)
+        price = Subquery(Room.objects.filter(pk=OuterRef('room_id')).values('price')[:1])
+        nights = StayNights(Value(at, output_field=models.DateTimeField()), F('check_in'))
+        # Departure becomes today, but an overstay ends where the room's next stay begins: stays must
+        # not overlap (booking_no_overlapping_stays on PostgreSQL). checkout() does the same in SQL.
+        next_arrival = self.model.objects.filter(
+            room_id=OuterRef('room_id'), arrival__gte=OuterRef('departure'), arrival__lt=today, departure__gt=F('arrival'),
+        ).order_by('arrival').values('arrival')[:1]
+        return self.update(
+            status='CHECKED_OUT',
+            check_out=at,
+            departure=Case(When(arrival__gt=today, then=F('arrival')), default=Coalesce(Subquery(next_arrival), Value(today))),
+            full_price=ExpressionWrapper(price * nights, output_field=models.DecimalField(max_digits=10, decimal_places=2)),
+        )
+
+    def reprice(self, bookings):
+        """Price settled bookings from their property's rate calendar, saving the ones whose price changes.
+
+        ``settle`` prices every night at the room's own price; without rates that is already the answer.
+        Returns the bookings.
+        """
+        changed = []
+        for booking in bookings:
+            calendar = price_calendar(booking.property_id)
+            if not calendar.rates:
+                continue
+            nights = max((booking.check_out - booking.check_in).days, 1)
+            price = calendar.stay_price(booking.room_id, timezone.localdate(booking.check_in), nights)
+            if price is not None and price != booking.full_price:
+                booking.full_price = price
+                changed.append(booking)
+        if changed:
+            self.bulk_update(changed, ['full_price'])
+        return bookings
+
+    def checkout(self, user_id, property_id, room_numbers, at):
+        """Check out the user's open stays in the property's ``room_numbers`` in one UPDATE ... RETURNING round trip.
+
+        Stays are then repriced from the rate calendar. Returns the updated bookings; rooms are left for the
+        caller to release.
+        """
+        if not room_numbers:
+            return []
+        connection = connections[self.db]
+        if not connection.features.can_return_columns_from_insert:
+            ids = list(self.filter(
+                user_id=user_id, property_id=property_id, room__number__in=room_numbers, status='CHECKED_IN',
+            ).values_list('pk', flat=True))
+            self.filter(pk__in=ids, status='CHECKED_IN').settle(at)
+            return self.reprice(list(self.filter(pk__in=ids)))
+        qn = connection.ops.quote_name
+        booking, room = qn(self.model._meta.db_table), qn(Room._meta.db_table)
+        columns = ', '.join(qn(field.column) for field in self.model._meta.concrete_fields)
+        nights = StayNights.templates[connection.vendor] % {'until': '%s', 'since': f'{booking}.check_in'}
+        placeholders = ', '.join(['%s'] * len(room_numbers))
+        today = timezone.localdate(at)
+        sql = (
+            f'UPDATE {booking} SET status = %s, check_out = %s, '
+            f'departure = CASE WHEN arrival > %s THEN arrival ELSE COALESCE(('
+            f'SELECT MIN(later.arrival) FROM {booking} later WHERE later.room_id = {booking}.room_id '
+            f'AND later.arrival >= {booking}.departure AND later.arrival < %s AND later.departure > later.arrival'
+            f'), %s) END, '
+            f'full_price = (SELECT price FROM {room} WHERE {room}.id = {booking}.room_id) * {nights} '
+            f'WHERE user_id = %s AND status = %s AND property_id = %s '
+            f'AND room_id IN (SELECT id FROM {room} WHERE property_id = %s AND number IN ({placeholders})) '
+            f'RETURNING {columns}'
+        )
+        params = ['CHECKED_OUT', at, today, today, today, at, user_id, 'CHECKED_IN', property_id, property_id, *room_numbers]
+        return self.reprice(list(self.raw(sql, params)))
 
 class Booking(models.Model):
     STATUS_CHOICES = (
+        ('RESERVED', 'Reserved'),
         ('CHECKED_IN', 'Checked In'),
         ('CHECKED_OUT', 'Checked Out'),
     )
     user = models.ForeignKey(User, on_delete=models.CASCADE, help_text="User who made the booking.")
+    # The room's property, copied so tenant-scoped queries never join rooms. Filled in by save();
+    # bulk_create callers set it themselves. Indexed through the composite indexes below.
+    property = models.ForeignKey(
+        Property, on_delete=models.PROTECT, db_index=False, related_name='bookings', help_text="Property of the booked room.",
+    )
     room = models.ForeignKey(Room, on_delete=models.CASCADE, help_text="Booked room.")
     check_in = models.DateTimeField(auto_now_add=True, help_text="Check-in date and time.")
     check_out = models.DateTimeField(null=True, blank=True, help_text="Check-out date and time.")
+    arrival = models.DateField(default=timezone.localdate, help_text="First night of the stay.")
+    departure = models.DateField(default=OPEN_DEPARTURE, help_text="Day the stay ends (exclusive).")
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='CHECKED_IN', help_text="Booking status.")
     full_price = models.DecimalField(max_digits=10, decimal_places=2, default=0.00, help_text="Total price for the booking.")
 
+    objects = BookingQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Range scan for "which of the property's rooms are busy in [start, end)": only its stays ending
+            # after start are read.
+            models.Index(fields=['property', 'departure', 'arrival', 'room'], name='booking_stay_idx'),
+            # One property's bookings checked in during a period (exports, history) are one index range.
+            models.Index(fields=['property', 'check_in'], name='booking_property_check_in_idx'),
+            # Per-room conflict checks for a single stay.
+            models.Index(fields=['room', 'departure', 'arrival'], name='booking_room_stay_idx'),
+            # A guest's bookings by status: checkout, the reservation list and the booking list.
+            models.Index(fields=['user', 'status'], name='booking_user_status_idx'),
+        ]
+        constraints = [
+            # A room holds at most one guest at a time. The partial unique index also serves
+            # lookups of a room's current stay.
+            models.UniqueConstraint(
+                fields=['room'], condition=models.Q(status='CHECKED_IN'), name='booking_one_checked_in_per_room',
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.property_id is None:
+            self.property_id = self.room.property_id
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        # Never query from __str__ (admin lists, logs): fall back to ids when the relations were not loaded.
+        room = self.room.number if Booking.room.is_cached(self) else f"#{self.room_id}"
+        user = self.user.username if Booking.user.is_cached(self) else f"user #{self.user_id}"
+        return f"Booking {self.id} for Room {room} by {user}"
+
+class ArchivedBookingQuerySet(models.QuerySet):
+    def in_property(self, property_id):
+        return self.filter(property_id=property_id)
+
+class ArchivedBooking(models.Model):
+    """A checked-out booking moved out of the bookings table by ``archive_bookings``; never written again.
+
+    Same columns and ids as Booking, so reads can cover both tables (see bookings.archive.history).
+    """
+    id = models.BigIntegerField(primary_key=True)
+    # Indexed through archived_booking_user_idx.
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False, related_name='archived_bookings')
+    property = models.ForeignKey(Property, on_delete=models.PROTECT, db_index=False, related_name='archived_bookings')
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name='archived_bookings')
+    check_in = models.DateTimeField()
+    check_out = models.DateTimeField(null=True, blank=True)
+    arrival = models.DateField()
+    departure = models.DateField()
+    status = models.CharField(max_length=20, choices=Booking.STATUS_CHOICES)
+    full_price = models.DecimalField(max_digits=10, decimal_places=2)
+    archived_at = models.DateTimeField(help_text="When the booking was moved to the archive.")
+
+    objects = ArchivedBookingQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # A guest's booking history, paged by id.
+            models.Index(fields=['user', 'id'], name='archived_booking_user_idx'),
+            # Exports and rollup rebuilds over a period of one property.
+            models.Index(fields=['property', 'check_in'], name='archived_booking_check_in_idx'),
+        ]
+
     def __str__(self):
-        return f"Booking {self.id} for Room {self.room.number} by {self.user.username}"
\ No newline at end of file
+        return f"Archived booking {self.id}"
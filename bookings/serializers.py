@@ -1,17 +1,19 @@
 from rest_framework import serializers
-from bookings.models import Booking
+from bookings.models import Booking, OPEN_DEPARTURE
 from bookings.exceptions import validate_booking, PastDateError, InvalidDateRangeError, RoomNotAvailableError
 from django.utils import timezone
 from rooms.models import Room
+from rooms.tenancy import property_id
+from pmsapi.serializers import SparseFieldsMixin, TimedRepresentationMixin
 
-class BookingSerializer(serializers.ModelSerializer):
+class BookingSerializer(TimedRepresentationMixin, SparseFieldsMixin, serializers.ModelSerializer):
     full_price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
     room_number = serializers.CharField(write_only=True, required=True, help_text="Room number to be booked.")
 
     class Meta:
         model = Booking
-        fields = ('id', 'user', 'room','room_number', 'check_in', 'check_out', 'status', 'full_price')
-        read_only_fields = ('user', 'check_in', 'status', 'full_price')
+        fields = ('id', 'user', 'room','room_number', 'check_in', 'check_out', 'arrival', 'departure', 'status', 'full_price')
+        read_only_fields = ('user', 'check_in', 'arrival', 'departure', 'status', 'full_price')
         extra_kwargs = {
             'room': {'required': False},
             'check_out': {'required': False}
@@ -21,21 +23,93 @@ class BookingSerializer(serializers.ModelSerializer):
         room_number = data.get('room_number')
         if not room_number:
             raise RoomNotAvailableError("Room number is required.")
-        try:         
-            room = Room.objects.get(number=room_number)
-            if not room.is_available:
-                raise RoomNotAvailableError(f"Room {room_number} is not available.")
-        except Room.DoesNotExist:
+        rooms = Room.objects.in_property(property_id(self.context.get('request')))
+        return self.validate_stay(data, rooms.filter(number=room_number).first())
+
+    def validate_stay(self, data, room):
+        """Checks on the requested stay once ``room`` (None if the number is unknown) has been loaded."""
+        room_number = data.get('room_number')
+        if room is None:
             raise RoomNotAvailableError(f"Room {room_number} does not exist.")
-        
-        data['room'] = room    
+        if not room.is_available:
+            raise RoomNotAvailableError(f"Room {room_number} is not available.")
+        data['room'] = room
         check_in = timezone.now()  # Mimic auto_now_add for validation
         check_out = data.get('check_out')
         validate_booking(data.get('room'), check_in, check_out, instance=self.instance)
+        data['departure'] = timezone.localdate(check_out) if check_out else OPEN_DEPARTURE
+        return data
+
+    def create(self, validated_data):
+        validated_data['user_id'] = self.context['request'].user.id
+        validated_data.pop('room_number', None)
+        return super().create(validated_data)
+
+class ReservationSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
+    room_number = serializers.CharField(write_only=True, required=True, help_text="Room number to be reserved.")
+
+    class Meta:
+        model = Booking
+        fields = ('id', 'user', 'room', 'room_number', 'arrival', 'departure', 'status')
+        read_only_fields = ('user', 'room', 'status')
+        extra_kwargs = {
+            'arrival': {'required': True},
+            'departure': {'required': True}
+        }
+
+    def validate(self, data):
+        if data['arrival'] < timezone.localdate():
+            raise PastDateError("Arrival date cannot be in the past.")
+        if not (data['arrival'] < data['departure']):
+            raise InvalidDateRangeError("Departure date must be after arrival date.")
+        try:
+            data['room'] = Room.objects.in_property(property_id(self.context.get('request'))).get(number=data['room_number'])
+        except Room.DoesNotExist:
+            raise RoomNotAvailableError(f"Room {data['room_number']} does not exist.")
         return data
 
     def create(self, validated_data):
-        validated_data['user'] = self.context['request'].user
-        room_number = validated_data.pop('room_number', None)
-        validated_data['room'] = Room.objects.get(number=room_number)
-        return super().create(validated_data)
\ No newline at end of file
+        validated_data.pop('room_number', None)
+        return super().create(validated_data)
+
+class StayRangeSerializer(serializers.Serializer):
+    start = serializers.DateField(help_text="First night of the stay.")
+    end = serializers.DateField(help_text="Day the stay ends (exclusive).")
+
+    def validate(self, data):
+        if not (data['start'] < data['end']):
+            raise InvalidDateRangeError("End date must be after start date.")
+        return data
+
+
+class RoomBatchSerializer(serializers.Serializer):
+    room_numbers = serializers.ListField(
+        child=serializers.CharField(), allow_empty=False, max_length=500, help_text="Room numbers in the batch."
+    )
+
+    def validate_room_numbers(self, value):
+        if len(set(value)) != len(value):
+            raise serializers.ValidationError("Room numbers must be unique.")
+        return value
+
+class CheckinBatchSerializer(RoomBatchSerializer):
+    check_out = serializers.DateTimeField(required=False, help_text="Planned check-out for every room in the batch.")
+
+    def validate(self, data):
+        check_out = data.get('check_out')
+        if check_out and not (timezone.now() < check_out):
+            raise InvalidDateRangeError()
+        return data
+
+class ExportFilterSerializer(serializers.Serializer):
+    check_in_from = serializers.DateField(required=False, help_text="Only bookings checked in on or after this day.")
+    check_in_to = serializers.DateField(required=False, help_text="Only bookings checked in on or before this day.")
+    check_out_from = serializers.DateField(required=False, help_text="Only bookings checked out on or after this day.")
+    check_out_to = serializers.DateField(required=False, help_text="Only bookings checked out on or before this day.")
+
+    def validate(self, data):
+        for field in ('check_in', 'check_out'):
+            start, end = data.get(f'{field}_from'), data.get(f'{field}_to')
+            if start and end and start > end:
+                raise InvalidDateRangeError(f"{field}_to must not be before {field}_from.")
+        return data
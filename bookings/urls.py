@@ -1,9 +1,16 @@
 # bookings/urls.py
 from django.urls import path
-from bookings.views import CheckinView, BookingDetailView, CheckOutView
+from bookings.views import (
+    CheckinView, BookingDetailView, CheckOutView, ReservationListCreateView, CheckinBatchView, CheckOutBatchView,
+    BookingExportView,
+)
 
 urlpatterns = [
     path('', CheckinView.as_view(), name='booking-list-create'),
     path('<int:pk>/', BookingDetailView.as_view(), name='booking-detail'),
+    path('batch/', CheckinBatchView.as_view(), name='booking-batch-checkin'),
     path('checkout/', CheckOutView.as_view(), name='booking-checkout'),
+    path('checkout/batch/', CheckOutBatchView.as_view(), name='booking-batch-checkout'),
+    path('reservations/', ReservationListCreateView.as_view(), name='reservation-list-create'),
+    path('export/<str:fmt>/', BookingExportView.as_view(), name='booking-export'),
 ]
\ No newline at end of file
@@ -1,69 +1,262 @@
 from rest_framework.generics import ListCreateAPIView, RetrieveUpdateDestroyAPIView
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from bookings.models import Booking
-from bookings.serializers import BookingSerializer
+from bookings.models import Booking, OPEN_DEPARTURE
+from bookings.serializers import (
+    BookingSerializer, ReservationSerializer, RoomBatchSerializer, CheckinBatchSerializer, ExportFilterSerializer
+)
+from bookings.export import ENCODERS, export_rows, filter_export
+from bookings.exceptions import BatchItemsError, RoomConflictError
+from bookings.availability import room_conflicts
+from bookings.archive import history
+from pmsapi.fastread import FastReadMixin
+from rooms.models import Room
+from rooms.tenancy import property_id
+from jobs.queue import enqueue
+from django.db import IntegrityError, transaction
 from django.utils import timezone
-from django.http import Http404
-from math import ceil
+from django.http import Http404, StreamingHttpResponse
 
-class CheckinView(ListCreateAPIView):
+def check_in_guest(user_id, room, check_out, departure):
+    """Check the user into a validated room, taking over their own reservation for it if there is one.
+
+    Shared by the sync and async check-in endpoints; raises RoomConflictError if the room is taken.
+    """
+    arrival = timezone.localdate()
+    try:
+        with transaction.atomic():
+            # Conditional UPDATE: only one concurrent request can flip the room.
+            if not Room.objects.claim(room.pk):
+                raise RoomConflictError(f"Room {room.number} was taken by another booking.")
+            room.is_available = False
+            conflicts = list(room_conflicts(room, arrival, departure).order_by('arrival'))
+            own = [b for b in conflicts if b.user_id == user_id and b.status == 'RESERVED']
+            if len(own) != len(conflicts):
+                raise RoomConflictError(f"Room {room.number} is reserved for part of the requested stay.")
+            if not own:
+                booking = Booking.objects.create(user_id=user_id, room=room, check_out=check_out, departure=departure)
+            else:
+                # The guest is arriving on their own reservation: check it in instead of adding a booking.
+                booking = own[0]
+                booking.status = 'CHECKED_IN'
+                booking.check_in = timezone.now()
+                booking.arrival = arrival
+                if check_out:
+                    booking.check_out = check_out
+                    booking.departure = departure
+                booking.save(update_fields=['status', 'check_in', 'check_out', 'arrival', 'departure'])
+            enqueue('booking.checked_in', {'bookings': [booking.pk]})
+            return booking
+    except IntegrityError:
+        raise RoomConflictError(f"Room {room.number} is reserved for part of the requested stay.")
+
+def check_out_guest(user_id, property_id, room_number):
+    """Settle the user's open stay in the property's room and free it. Returns the booking, or None if there is no such stay."""
+    with transaction.atomic():
+        # One UPDATE ... RETURNING settles the stay at the room's price; rates are applied from the calendar.
+        bookings = Booking.objects.checkout(user_id, property_id, [room_number], timezone.now())
+        if not bookings:
+            return None
+        Room.objects.release(bookings[0].room_id)
+        # Rollups and any other follow-up work run in the job workers, after the response.
+        enqueue('booking.checked_out', {'bookings': [bookings[0].pk]})
+    return bookings[0]
+
+class CheckinView(FastReadMixin, ListCreateAPIView):
     serializer_class = BookingSerializer
     permission_classes = [IsAuthenticated]
+    # Listing reads the bookings table and the archive.
+    query_budget = {'GET': 3, 'POST': 6}
 
     def get_queryset(self):
-        return Booking.objects.filter(user=self.request.user).select_related('user', 'room')
+        return history().in_property(property_id(self.request)).filter(user_id=self.request.user.id).select_related('user', 'room')
 
     def perform_create(self, serializer):
-        booking = serializer.save()
-        booking.room.is_available = False
-        booking.room.save()
+        data = serializer.validated_data
+        serializer.instance = check_in_guest(self.request.user.id, data['room'], data.get('check_out'), data['departure'])
 
-class BookingDetailView(RetrieveUpdateDestroyAPIView):
+class BookingDetailView(FastReadMixin, RetrieveUpdateDestroyAPIView):
     serializer_class = BookingSerializer
     permission_classes = [IsAuthenticated]
+    # Moving a checked-in stay claims the new room, checks its calendar and releases the old one.
+    # An archived booking is looked up in the archive after the bookings table.
+    query_budget = {'GET': 3, 'PUT': 8, 'PATCH': 8, 'DELETE': 5}
 
     def get_queryset(self):
-        return Booking.objects.filter(user=self.request.user).select_related('user', 'room')
+        # Archived bookings can be read but never changed.
+        bookings = history() if self.request.method == 'GET' else Booking.objects.all()
+        return bookings.in_property(property_id(self.request)).filter(user_id=self.request.user.id).select_related('user', 'room')
 
     def perform_update(self, serializer):
-        old_booking = self.get_object()
-        booking = serializer.save()
-        if old_booking.room != booking.room:
-            old_booking.room.is_available = True
-            old_booking.room.save()
-            booking.room.is_available = False
-            booking.room.save()
+        old_room = serializer.instance.room
+        room = serializer.validated_data['room']
+        try:
+            with transaction.atomic():
+                if old_room.pk != room.pk:
+                    if not Room.objects.claim(room.pk):
+                        raise RoomConflictError(f"Room {room.number} was taken by another booking.")
+                    stay = room_conflicts(room, serializer.instance.arrival, serializer.validated_data['departure'])
+                    if stay.exclude(pk=serializer.instance.pk).exists():
+                        raise RoomConflictError(f"Room {room.number} is reserved for part of the requested stay.")
+                    Room.objects.release(old_room.pk)
+                    room.is_available = False
+                serializer.save()
+        except IntegrityError:
+            raise RoomConflictError(f"Room {room.number} was taken by another booking.")
 
     def delete(self, request, *args, **kwargs):
         try:
             instance = self.get_object()
-            instance.room.is_available = True
-            instance.room.save()
-            self.perform_destroy(instance)
+            with transaction.atomic():
+                if instance.status == 'CHECKED_IN':
+                    Room.objects.release(instance.room_id)
+                self.perform_destroy(instance)
             return Response(status=status.HTTP_204_NO_CONTENT)
         except Http404:
             return Response({"detail": "Booking not found."}, status=status.HTTP_404_NOT_FOUND)
 
 class CheckOutView(APIView):
     permission_classes = [IsAuthenticated]
+    # Includes rebuilding a stale rate calendar (rates and rooms) and saving the repriced stay.
+    query_budget = 8
 
     def post(self, request):
-        try:
-            room_number = request.data.get('room_number')
-            booking = Booking.objects.select_related('room').get(user=request.user, room__number=room_number, status='CHECKED_IN')
-        except Booking.DoesNotExist:
+        booking = check_out_guest(request.user.id, property_id(request), request.data.get('room_number'))
+        if booking is None:
             return Response({"detail": "Booking not found."}, status=status.HTTP_404_NOT_FOUND)
-        
-        booking.check_out = timezone.now()
-        booking.status = 'CHECKED_OUT'
-        # Calculate full_price: room.price * number of nights (minimum 1)
-        nights = (booking.check_out - booking.check_in).days or 1
-        booking.full_price = booking.room.price * nights
-        booking.room.is_available = True
-        booking.room.save()
-        booking.save()
         serializer = BookingSerializer(booking, context={'request': request})
-        return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+class CheckinBatchView(APIView):
+    """Check a group into many rooms at once with a fixed number of queries."""
+    permission_classes = [IsAuthenticated]
+    query_budget = 7
+
+    def post(self, request):
+        serializer = CheckinBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        numbers = serializer.validated_data['room_numbers']
+        check_out = serializer.validated_data.get('check_out')
+        arrival = timezone.localdate()
+        departure = timezone.localdate(check_out) if check_out else OPEN_DEPARTURE
+
+        rooms = {room.number: room for room in Room.objects.in_property(property_id(request)).filter(number__in=numbers)}
+        errors = {}
+        for number in numbers:
+            if number not in rooms:
+                errors[number] = f"Room {number} does not exist."
+            elif not rooms[number].is_available:
+                errors[number] = f"Room {number} is not available."
+        if errors:
+            raise BatchItemsError({'room_numbers': errors})
+
+        by_id = {room.pk: room for room in rooms.values()}
+        try:
+            with transaction.atomic():
+                if Room.objects.claim_many(list(by_id)) != len(by_id):
+                    raise RoomConflictError("Some rooms were taken by another booking.")
+                reservations = {}
+                for booking in Booking.objects.overlapping(arrival, departure).filter(room__in=list(by_id)).order_by('arrival'):
+                    own = booking.user_id == request.user.id and booking.status == 'RESERVED'
+                    if own and booking.room_id not in reservations:
+                        reservations[booking.room_id] = booking
+                    else:
+                        errors[by_id[booking.room_id].number] = f"Room {by_id[booking.room_id].number} is reserved for part of the requested stay."
+                if errors:
+                    raise BatchItemsError({'room_numbers': errors})
+
+                now = timezone.now()
+                for reservation in reservations.values():
+                    reservation.status = 'CHECKED_IN'
+                    reservation.check_in = now
+                    reservation.arrival = arrival
+                    if check_out:
+                        reservation.check_out = check_out
+                        reservation.departure = departure
+                Booking.objects.bulk_update(reservations.values(), ['status', 'check_in', 'check_out', 'arrival', 'departure'])
+                bookings = Booking.objects.bulk_create(
+                    Booking(
+                        user_id=request.user.id, property_id=room.property_id, room=room, check_out=check_out,
+                        arrival=arrival, departure=departure,
+                    )
+                    for room in by_id.values() if room.pk not in reservations
+                )
+                enqueue('booking.checked_in', {'bookings': [booking.pk for booking in bookings + list(reservations.values())]})
+        except IntegrityError:
+            raise RoomConflictError("Some rooms are reserved for part of the requested stay.")
+
+        order = {number: i for i, number in enumerate(numbers)}
+        bookings = sorted(bookings + list(reservations.values()), key=lambda b: order[by_id[b.room_id].number])
+        serializer = BookingSerializer(bookings, many=True, context={'request': request})
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+class CheckOutBatchView(APIView):
+    """Check a group out of many rooms at once with a fixed number of queries."""
+    permission_classes = [IsAuthenticated]
+    # As CheckOutView, with the rooms looked up first.
+    query_budget = 9
+
+    def post(self, request):
+        serializer = RoomBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        numbers = serializer.validated_data['room_numbers']
+
+        with transaction.atomic():
+            rooms = dict(Room.objects.in_property(property_id(request)).filter(number__in=numbers).values_list('id', 'number'))
+            bookings = Booking.objects.checkout(request.user.id, property_id(request), numbers, timezone.now())
+            found = {rooms[booking.room_id] for booking in bookings}
+            errors = {number: "Booking not found." for number in numbers if number not in found}
+            if errors:
+                raise BatchItemsError({'room_numbers': errors})
+            Room.objects.release_many([booking.room_id for booking in bookings])
+            enqueue('booking.checked_out', {'bookings': [booking.pk for booking in bookings]})
+
+        order = {number: i for i, number in enumerate(numbers)}
+        bookings.sort(key=lambda b: order[rooms[b.room_id]])
+        serializer = BookingSerializer(bookings, many=True, context={'request': request})
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+class ReservationListCreateView(ListCreateAPIView):
+    serializer_class = ReservationSerializer
+    permission_classes = [IsAuthenticated]
+    query_budget = {'GET': 2, 'POST': 4}
+
+    def get_queryset(self):
+        return Booking.objects.in_property(property_id(self.request)).filter(user_id=self.request.user.id, status='RESERVED')
+
+    def perform_create(self, serializer):
+        room = serializer.validated_data['room']
+        arrival = serializer.validated_data['arrival']
+        departure = serializer.validated_data['departure']
+        try:
+            with transaction.atomic():
+                # Insert before checking: the write serialises competing reservations for the room,
+                # and on Postgres the exclusion constraint rejects the loser outright.
+                booking = serializer.save(user_id=self.request.user.id, status='RESERVED')
+                if room_conflicts(room, arrival, departure).exclude(pk=booking.pk).exists():
+                    raise RoomConflictError(f"Room {room.number} is already booked for part of the requested stay.")
+        except IntegrityError:
+            raise RoomConflictError(f"Room {room.number} is already booked for part of the requested stay.")
+
+class BookingExportView(APIView):
+    """Stream the property's bookings as CSV or NDJSON for reconciliation (staff only)."""
+    permission_classes = [IsAdminUser]
+    # The export query itself runs while the body streams, after the budget is checked.
+    query_budget = 1
+
+    def perform_content_negotiation(self, request, force=False):
+        # The body is not rendered by DRF, so an Accept of text/csv must not end in 406; errors still render as JSON.
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, fmt):
+        if fmt not in ENCODERS:
+            raise Http404
+        filters = ExportFilterSerializer(data=request.query_params)
+        filters.is_valid(raise_exception=True)
+        content_type, encode = ENCODERS[fmt]
+        rows = export_rows(filter_export(history().in_property(property_id(request)), **filters.validated_data))
+        response = StreamingHttpResponse(encode(rows), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="bookings.{fmt}"'
+        return response
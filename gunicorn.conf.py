@@ -0,0 +1,33 @@
+# gunicorn.conf.py
+# Production defaults for `gunicorn -c gunicorn.conf.py pmsapi.wsgi:application`; every value can be
+# overridden from the environment (or on the command line, which wins over this file).
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+
+# Requests mostly wait on Postgres, so the classic (2 x cores) + 1 processes, each with a few threads.
+# Every thread holds its own persistent connection: keep workers * threads below max_connections.
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+
+# Import Django once in the master and fork the workers from it: faster boot, shared memory pages.
+preload_app = True
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+# Recycle workers now and then so slow leaks cannot accumulate; the jitter avoids restarting them all at once.
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+
+
+def post_fork(server, worker):
+    # A connection opened while preloading must not be shared by the forked workers.
+    from django.db import connections
+
+    connections.close_all()
@@ -0,0 +1,44 @@
+import multiprocessing
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from jobs.queue import run_pending, work
+
+class Command(BaseCommand):
+    help = "Run queued background jobs with a pool of worker threads or processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help="Number of workers.")
+        parser.add_argument('--processes', action='store_true', help="Run each worker in its own process instead of a thread.")
+        parser.add_argument(
+            '--poll-interval', type=float, default=getattr(settings, 'JOBS_POLL_INTERVAL', 1),
+            help="Seconds an idle worker waits before looking for due jobs again (default JOBS_POLL_INTERVAL).",
+        )
+        parser.add_argument('--once', action='store_true', help="Run the jobs that are due now and exit.")
+
+    def handle(self, *args, **options):
+        if options['once']:
+            self.stdout.write(f"Ran {run_pending()} jobs.")
+            return
+
+        if options['processes']:
+            # Forked workers must open their own connections.
+            connections.close_all()
+            stop, start = multiprocessing.Event(), multiprocessing.Process
+        else:
+            stop, start = threading.Event(), threading.Thread
+        workers = [start(target=work, args=(stop, options['poll_interval'])) for _ in range(options['workers'])]
+        for worker in workers:
+            worker.start()
+        kind = 'processes' if options['processes'] else 'threads'
+        self.stdout.write(f"Running {len(workers)} worker {kind}; press Ctrl-C to stop.")
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            stop.set()
+            for worker in workers:
+                worker.join()
+        self.stdout.write("Workers stopped.")
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-18 20:41
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event', models.CharField(help_text='Event the job was enqueued for, e.g. booking.checked_out.', max_length=100)),
+                ('handler', models.CharField(help_text='Dotted path of the registered handler.', max_length=200)),
+                ('payload', models.JSONField(default=dict, help_text='Arguments for the handler.')),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('FAILED', 'Failed')], default='PENDING', help_text='Failed jobs are kept but not retried.', max_length=10)),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Earliest time the job may run; retries move it forward.')),
+                ('attempts', models.PositiveIntegerField(default=0, help_text='Runs started so far.')),
+                ('locked_by', models.CharField(blank=True, help_text='Worker holding the job.', max_length=32)),
+                ('locked_until', models.DateTimeField(blank=True, help_text="When the worker's lease expires.", null=True)),
+                ('last_error', models.TextField(blank=True, help_text='Error of the last failed run.')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('status', 'PENDING')), fields=['run_at', 'id'], name='job_due_idx')],
+            },
+        ),
+    ]
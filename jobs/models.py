@@ -0,0 +1,30 @@
+from django.db import models
+from django.utils import timezone
+
+class Job(models.Model):
+    """One handler run for one event, written in the transaction that raised the event (see jobs.queue)."""
+    PENDING = 'PENDING'
+    FAILED = 'FAILED'
+    STATUS_CHOICES = (
+        (PENDING, 'Pending'),
+        (FAILED, 'Failed'),
+    )
+    event = models.CharField(max_length=100, help_text="Event the job was enqueued for, e.g. booking.checked_out.")
+    handler = models.CharField(max_length=200, help_text="Dotted path of the registered handler.")
+    payload = models.JSONField(default=dict, help_text="Arguments for the handler.")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING, help_text="Failed jobs are kept but not retried.")
+    run_at = models.DateTimeField(default=timezone.now, help_text="Earliest time the job may run; retries move it forward.")
+    attempts = models.PositiveIntegerField(default=0, help_text="Runs started so far.")
+    locked_by = models.CharField(max_length=32, blank=True, help_text="Worker holding the job.")
+    locked_until = models.DateTimeField(null=True, blank=True, help_text="When the worker's lease expires.")
+    last_error = models.TextField(blank=True, help_text="Error of the last failed run.")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Workers pick the oldest due job; finished jobs are deleted, failed ones are left out.
+            models.Index(fields=['run_at', 'id'], condition=models.Q(status='PENDING'), name='job_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"Job {self.id} {self.event} -> {self.handler}"
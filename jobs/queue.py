@@ -0,0 +1,128 @@
+"""Database-backed job queue for side effects that must not slow down the request that causes them.
+
+Apps register handlers for events in their ``tasks`` module::
+
+    @handles('booking.checked_out')
+    def record(payload): ...
+
+``enqueue(event, payload)`` writes one Job row per handler in the caller's transaction (an outbox):
+the jobs exist exactly when the change that raised the event commits. ``run_workers`` processes them.
+
+A worker claims a due job with a lease. On Postgres the claim uses SELECT ... FOR UPDATE SKIP LOCKED,
+so workers never wait for each other; SQLite has no row locks, and a conditional UPDATE decides which
+worker gets the job. The handler runs in a transaction that also deletes the job, so its database
+writes commit once, together with the job's completion. A failed run is retried after a delay that
+doubles with each attempt, until JOBS_MAX_ATTEMPTS; then the job is kept as FAILED.
+"""
+import datetime
+import logging
+import traceback
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from jobs.models import Job
+
+logger = logging.getLogger(__name__)
+
+_handlers = defaultdict(dict)
+
+class LeaseLost(Exception):
+    """The job's lease expired and another worker claimed it; this run's writes are rolled back."""
+
+def handles(event):
+    """Register the decorated ``handler(payload)`` for ``event``."""
+    def register(handler):
+        _handlers[event][f'{handler.__module__}.{handler.__qualname__}'] = handler
+        return handler
+    return register
+
+def enqueue(event, payload):
+    """Queue a job for each handler of ``event``, in the current transaction. Returns the jobs."""
+    handlers = _handlers.get(event)
+    if not handlers:
+        return []
+    return Job.objects.bulk_create(Job(event=event, handler=name, payload=payload) for name in handlers)
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+def retry_delay(attempts):
+    """Seconds to wait before the next run of a job that has failed ``attempts`` times."""
+    return _setting('JOBS_RETRY_DELAY', 30) * 2 ** (attempts - 1)
+
+def claim(worker):
+    """Lease the oldest due job to ``worker`` and return it, or None if no job is due."""
+    now = timezone.now()
+    due = Job.objects.filter(status=Job.PENDING, run_at__lte=now).filter(Q(locked_until__isnull=True) | Q(locked_until__lt=now))
+    lease = datetime.timedelta(seconds=_setting('JOBS_LEASE', 300))
+    candidates = due.order_by('run_at', 'pk').values_list('pk', flat=True)
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            pk = candidates.select_for_update(skip_locked=True).first()
+            if pk is None or not due.filter(pk=pk).update(locked_by=worker, locked_until=now + lease, attempts=F('attempts') + 1):
+                return None
+    else:
+        # Without row locks two workers can pick the same job; the conditional UPDATE gives it to one of them.
+        # Each statement commits on its own, so a reader never has to upgrade to SQLite's write lock mid-transaction.
+        for pk in candidates[:10]:
+            if due.filter(pk=pk).update(locked_by=worker, locked_until=now + lease, attempts=F('attempts') + 1):
+                break
+        else:
+            return None
+    return Job.objects.get(pk=pk)
+
+def run(job):
+    """Run a claimed job. Returns True if it succeeded."""
+    handler = _handlers.get(job.event, {}).get(job.handler)
+    try:
+        if handler is None:
+            raise LookupError(f"No handler {job.handler} is registered for {job.event}.")
+        with transaction.atomic():
+            handler(job.payload)
+            if not Job.objects.filter(pk=job.pk, locked_by=job.locked_by).delete()[0]:
+                raise LeaseLost()
+    except LeaseLost:
+        logger.warning("Job %s outlived its lease and was rolled back.", job.pk)
+        return False
+    except Exception:
+        logger.exception("Job %s (%s) failed on attempt %s.", job.pk, job.handler, job.attempts)
+        failed = job.attempts >= _setting('JOBS_MAX_ATTEMPTS', 5)
+        Job.objects.filter(pk=job.pk, locked_by=job.locked_by).update(
+            status=Job.FAILED if failed else Job.PENDING,
+            run_at=timezone.now() + datetime.timedelta(seconds=retry_delay(job.attempts)),
+            locked_by='',
+            locked_until=None,
+            last_error=traceback.format_exc(),
+        )
+        return False
+    return True
+
+def run_pending(worker=None, limit=None):
+    """Run due jobs until none is left (or ``limit`` have run). Returns how many ran."""
+    worker = worker or uuid.uuid4().hex
+    ran = 0
+    while limit is None or ran < limit:
+        job = claim(worker)
+        if job is None:
+            break
+        run(job)
+        ran += 1
+    return ran
+
+def work(stop, poll_interval):
+    """Worker loop: run due jobs, and poll every ``poll_interval`` seconds when there are none, until ``stop`` is set."""
+    worker = uuid.uuid4().hex
+    try:
+        while not stop.is_set():
+            if not run_pending(worker, limit=100):
+                stop.wait(poll_interval)
+    except KeyboardInterrupt:
+        # Ctrl-C reaches worker processes too; the command stops the others.
+        pass
+    finally:
+        # Threads leave their own connection behind otherwise.
+        connections.close_all()
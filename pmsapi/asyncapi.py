@@ -0,0 +1,87 @@
+"""Native async endpoints with the same request parsing, auth, errors and JSON output as the DRF views.
+
+DRF's APIView is synchronous, and under ASGI Django runs it in a single worker thread. Views built
+with ``async_api_view`` run on the event loop instead and only leave it for transactional writes.
+"""
+import functools
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, status
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+from rest_framework.utils.urls import replace_query_param
+from authentication.jwt import JWTAuthentication
+from pmsapi.fastread import RowEncoder
+from pmsapi.renderers import FastJSONRenderer
+
+def json_response(data, status=status.HTTP_200_OK, headers=None):
+    return HttpResponse(FastJSONRenderer().render(data), status=status, content_type='application/json', headers=headers)
+
+def _error_response(exc, authenticator, request):
+    headers = {}
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        headers['WWW-Authenticate'] = authenticator.authenticate_header(request)
+    data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+    return json_response(data, status=exc.status_code, headers=headers)
+
+def async_api_view(*methods, permission=None):
+    """Turn an ``async def view(request, ...)`` into an authenticated JSON endpoint.
+
+    The view receives a DRF ``Request`` (``data``, ``query_params``, ``user``) and may raise
+    APIException or Http404. ``permission`` is an optional ``user -> bool`` check on top of authentication.
+    """
+    authenticator = JWTAuthentication()
+
+    def decorator(view):
+        @csrf_exempt
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            drf_request = Request(request, parsers=[JSONParser()])
+            try:
+                if request.method not in methods:
+                    raise exceptions.MethodNotAllowed(request.method)
+                result = await authenticator.aauthenticate(request)
+                if result is None:
+                    raise exceptions.NotAuthenticated()
+                drf_request.user, drf_request.auth = result
+                if permission and not permission(drf_request.user):
+                    raise exceptions.PermissionDenied()
+                return await view(drf_request, *args, **kwargs)
+            except Http404:
+                return _error_response(exceptions.NotFound(), authenticator, request)
+            except exceptions.APIException as exc:
+                return _error_response(exc, authenticator, request)
+        return wrapper
+    return decorator
+
+async def keyset_page(request, queryset, serializer_class):
+    """One page of ``queryset`` in primary-key order, fetched with async iteration.
+
+    Same response shape as KeysetPagination; the next link carries the last id seen (``?after=``).
+    Rows are read with ``.values()`` and a RowEncoder when the serializer allows it.
+    """
+    default = settings.REST_FRAMEWORK.get('PAGE_SIZE') or 50
+    try:
+        page_size = min(int(request.query_params.get('page_size', default)), 500)
+        after = int(request.query_params.get('after', 0))
+    except ValueError:
+        raise exceptions.ValidationError({'detail': "page_size and after must be integers."})
+    page_size = max(page_size, 1)
+    context = {'request': request}
+    encoder = RowEncoder.for_serializer(serializer_class(context=context))
+    queryset = queryset.filter(pk__gt=after).order_by('pk')
+    if encoder is not None:
+        queryset = queryset.values(*encoder.columns)
+    rows = [row async for row in queryset[:page_size + 1]]
+    next_url = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1][encoder.columns[0]] if encoder is not None else rows[-1].pk
+        next_url = replace_query_param(request.build_absolute_uri(), 'after', last)
+    return {
+        'next': next_url,
+        'previous': None,
+        'results': encoder.encode_many(rows) if encoder is not None else serializer_class(rows, many=True, context=context).data,
+    }
@@ -0,0 +1,112 @@
+import abc
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import APIException
+
+def read_rows(stream, fmt):
+    """Yield ``(line_number, row)`` from a CSV or JSONL stream, one row at a time.
+
+    Empty CSV cells are dropped so that missing values fall back to the serializer defaults.
+    A JSONL line that does not decode yields the error message instead of a row.
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, {key: value for key, value in row.items() if key is not None and value not in ('', None)}
+        return
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_number, str(e)
+            continue
+        yield line_number, row if isinstance(row, dict) else 'Expected a JSON object.'
+
+def chunked(iterable, size):
+    """Split an iterable into lists of at most ``size`` items without materialising it."""
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+class ImportCommand(BaseCommand, abc.ABC):
+    """Base for commands that stream rows from a CSV/JSONL file (or stdin) into the database in batches.
+
+    Rows are validated with ``serializer_class``; subclasses write each batch of validated data in
+    ``write_batch`` and return ``(created, updated)``.
+    """
+    serializer_class = None
+    stealth_options = ('stdin',)
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or JSONL file to import; '-' reads from stdin.")
+        parser.add_argument(
+            '--format', choices=('csv', 'jsonl'),
+            help="Input format. Defaults to jsonl for .jsonl/.ndjson files and csv otherwise.",
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows validated and written per batch.")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        self.setup(options)
+        try:
+            if path == '-':
+                self.run(options.get('stdin', sys.stdin), fmt, options['batch_size'])
+            else:
+                if not os.path.exists(path):
+                    raise CommandError(f"File not found: {path}")
+                with open(path, newline='', encoding='utf-8') as stream:
+                    self.run(stream, fmt, options['batch_size'])
+        finally:
+            self.teardown()
+
+    def run(self, stream, fmt, batch_size):
+        created = updated = skipped = rows = 0
+        # One serializer validates every row, as ListSerializer does, so its fields are only built once.
+        serializer = self.serializer_class()
+        start = time.perf_counter()
+        for batch in chunked(read_rows(stream, fmt), batch_size):
+            rows += len(batch)
+            valid = []
+            for line_number, row in batch:
+                if isinstance(row, str):
+                    errors = row
+                else:
+                    try:
+                        valid.append(serializer.run_validation(row))
+                        continue
+                    except APIException as e:
+                        # Includes API errors raised by validators (e.g. PasswordValidationError).
+                        errors = e.detail
+                skipped += 1
+                self.stderr.write(f"Line {line_number}: {json.dumps(errors, default=str)}")
+            if valid:
+                batch_created, batch_updated = self.write_batch(valid)
+                created += batch_created
+                updated += batch_updated
+        elapsed = time.perf_counter() - start
+        rate = rows / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Read {rows} rows in {elapsed:.2f}s ({rate:.0f} rows/s): "
+            f"{created} created, {updated} updated, {rows - created - updated - skipped} unchanged, {skipped} invalid."
+        ))
+
+    def setup(self, options):
+        """Hook called before the first batch."""
+
+    def teardown(self):
+        """Hook called after the last batch, even on error."""
+
+    @abc.abstractmethod
+    def write_batch(self, validated):
+        """Write one batch of validated rows; returns ``(created, updated)``."""
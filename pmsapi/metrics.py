@@ -0,0 +1,203 @@
+"""Per-endpoint request metrics: wall time, DB queries and time, serializer time and response size.
+
+``MetricsMiddleware`` keeps the numbers for the current request in a context variable (so queries run
+in sync_to_async threads are counted too), adds a ``Server-Timing`` header and aggregates them per URL
+name into in-memory histograms. ``metrics_view`` exposes those in the Prometheus text format.
+Histograms are per process: with several gunicorn workers each one is scraped separately.
+"""
+import bisect
+import contextlib
+import contextvars
+import hmac
+import logging
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+
+logger = logging.getLogger(__name__)
+
+SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERIES = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+MAX_CAPTURED_QUERIES = 100
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+class Histogram:
+    """Prometheus-style cumulative histogram with a single ``view`` label."""
+
+    def __init__(self, name, help, buckets):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, view, value):
+        with self._lock:
+            series = self._series.get(view)
+            if series is None:
+                series = self._series[view] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted((view, list(counts), total) for view, (counts, total) in self._series.items())
+        for view, counts, total in series:
+            label = _escape(view)
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{view="{label}",le="{bound}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'{self.name}_bucket{{view="{label}",le="+Inf"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{view="{label}"}} {total:.6f}')
+            lines.append(f'{self.name}_count{{view="{label}"}} {cumulative}')
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+REQUEST_DURATION = Histogram('pms_request_duration_seconds', 'Wall time spent handling the request.', SECONDS)
+DB_QUERIES = Histogram('pms_request_db_queries', 'Database queries issued per request.', QUERIES)
+DB_DURATION = Histogram('pms_request_db_duration_seconds', 'Time spent in database queries per request.', SECONDS)
+SERIALIZER_DURATION = Histogram('pms_request_serializer_duration_seconds', 'Time spent building response data in serializers.', SECONDS)
+RESPONSE_SIZE = Histogram('pms_response_size_bytes', 'Response body size (streamed responses are not included).', BYTES)
+HISTOGRAMS = (REQUEST_DURATION, DB_QUERIES, DB_DURATION, SERIALIZER_DURATION, RESPONSE_SIZE)
+
+class RequestMetrics:
+    __slots__ = ('queries', 'db_time', 'serializer_time', 'serializing', 'sql')
+
+    def __init__(self, capture_sql=False):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializing = False
+        self.sql = [] if capture_sql else None
+
+def current():
+    """Metrics of the request being handled, or None outside a request."""
+    return _current.get()
+
+@contextlib.contextmanager
+def paused():
+    """Leave the queries run inside the block out of the current request's metrics (and query budget)."""
+    token = _current.set(None)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+def _record_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - start
+        stats.queries += 1
+        stats.db_time += elapsed
+        if stats.sql is not None and len(stats.sql) < MAX_CAPTURED_QUERIES:
+            stats.sql.append((elapsed, sql))
+
+def _install(connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+def _install_on_thread():
+    for connection in connections.all():
+        _install(connection)
+
+# Connections made from now on are wrapped when they connect; the middleware covers older ones.
+connection_created.connect(_install)
+
+class MetricsMiddleware:
+    """Record the metrics of every request under its URL name and report them in ``Server-Timing``."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, 'METRICS_SLOW_REQUEST_MS', 0)
+        self._thread_ready = threading.local()
+        self._async_ready = False
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not getattr(self._thread_ready, 'value', False):
+            _install_on_thread()
+            self._thread_ready.value = True
+        stats = RequestMetrics(capture_sql=bool(self.slow_ms))
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, stats, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        if not self._async_ready:
+            # The ORM runs in sync_to_async's thread, whose connection may predate this module.
+            await sync_to_async(_install_on_thread)()
+            self._async_ready = True
+        stats = RequestMetrics(capture_sql=bool(self.slow_ms))
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, stats, time.perf_counter() - start)
+
+    def _finish(self, request, response, stats, elapsed):
+        match = request.resolver_match
+        view = match.view_name if match else 'unmatched'
+        if view == 'metrics':
+            return response
+        response.headers['Server-Timing'] = (
+            f'total;dur={elapsed * 1000:.1f}, db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries", '
+            f'serialize;dur={stats.serializer_time * 1000:.1f}'
+        )
+        REQUEST_DURATION.observe(view, elapsed)
+        DB_QUERIES.observe(view, stats.queries)
+        DB_DURATION.observe(view, stats.db_time)
+        SERIALIZER_DURATION.observe(view, stats.serializer_time)
+        if not response.streaming:
+            RESPONSE_SIZE.observe(view, len(response.content))
+        if self.slow_ms and elapsed * 1000 >= self.slow_ms:
+            logger.warning(
+                'Slow request: %s %s (%s) took %.1f ms, %d queries in %.1f ms\n%s',
+                request.method, request.get_full_path(), view, elapsed * 1000, stats.queries, stats.db_time * 1000,
+                '\n'.join(f'  {ms * 1000:.1f} ms  {sql}' for ms, sql in stats.sql),
+            )
+        return response
+
+def render():
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    return '\n'.join(lines) + '\n'
+
+def metrics_view(request):
+    """Prometheus scrape endpoint. Requires ``Authorization: Bearer <METRICS_TOKEN>`` when that setting is set."""
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponseForbidden()
+    return HttpResponse(render(), content_type='text/plain; version=0.0.4; charset=utf-8')
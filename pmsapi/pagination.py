@@ -0,0 +1,7 @@
+from rest_framework.pagination import CursorPagination
+
+class KeysetPagination(CursorPagination):
+    """Cursor pagination on the primary key: every page is an index range scan and no COUNT(*) is issued."""
+    ordering = 'id'
+    page_size_query_param = 'page_size'
+    max_page_size = 500
@@ -0,0 +1,113 @@
+"""Per-view query budgets and an N+1 guard, checked on every request.
+
+A view declares the most queries a request may issue, either as an int or per method::
+
+    class RoomDetailView(RetrieveUpdateDestroyAPIView):
+        query_budget = {'GET': 2, 'PUT': 4}
+
+or with ``@query_budget(...)`` on a function view. ``QueryBudgetMiddleware`` checks the queries that
+``MetricsMiddleware`` recorded, leaving out transaction control so budgets hold on every backend and
+inside test transactions. It also flags any statement repeated more than ``QUERY_BUDGET_MAX_REPEATS``
+times, the usual shape of a lazy load in a loop. Violations are logged, or raised as ``QueryBudgetExceeded`` when
+``QUERY_BUDGET_STRICT`` is set (as in the test suite). Streamed bodies are produced after the
+middleware returns and are not counted.
+"""
+import collections
+import logging
+import re
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from pmsapi import metrics
+
+logger = logging.getLogger(__name__)
+
+_PLACEHOLDERS = re.compile(r'%s(?:\s*,\s*%s)+')
+_TRANSACTION_STATEMENTS = ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE SAVEPOINT')
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+def query_budget(budget):
+    """Declare the query budget of a view function or class (an int, or a dict keyed by HTTP method)."""
+    def decorator(view):
+        view.query_budget = budget
+        return view
+    return decorator
+
+def budget_for(func, method):
+    """Budget of the resolved view ``func`` for ``method``, or None if it has none."""
+    budget = getattr(getattr(func, 'view_class', func), 'query_budget', None)
+    if isinstance(budget, dict):
+        return budget.get(method)
+    return budget
+
+def shape(sql):
+    """The statement with its variable-length IN lists collapsed, to compare queries run in a loop."""
+    return _PLACEHOLDERS.sub('%s, ...', sql)
+
+def counted(statements):
+    """The statements that count towards a budget: everything but transaction control."""
+    return [sql for sql in statements if not sql.startswith(_TRANSACTION_STATEMENTS)]
+
+def check(view, method, budget, stats):
+    """Problems with the queries recorded in ``stats``, as a list of messages."""
+    statements = counted(sql for _, sql in stats.sql)
+    problems = []
+    used = stats.queries - (len(stats.sql) - len(statements))
+    if budget is not None and used > budget:
+        problems.append(f'{method} {view} ran {used} queries, over its budget of {budget}')
+    max_repeats = getattr(settings, 'QUERY_BUDGET_MAX_REPEATS', 2)
+    if len(statements) <= max_repeats:
+        return problems
+    for sql, count in collections.Counter(shape(sql) for sql in statements).most_common():
+        if count <= max_repeats:
+            break
+        problems.append(f'{method} {view} ran the same query {count} times (N+1?): {sql}')
+    return problems
+
+class QueryBudgetMiddleware:
+    """Must come after ``MetricsMiddleware``, whose query counts it checks."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        names = list(settings.MIDDLEWARE)
+        if 'pmsapi.metrics.MetricsMiddleware' not in names[:names.index('pmsapi.querybudget.QueryBudgetMiddleware')]:
+            raise ImproperlyConfigured('QueryBudgetMiddleware must be listed after pmsapi.metrics.MetricsMiddleware.')
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = self._start()
+        response = self.get_response(request)
+        self._check(request, stats)
+        return response
+
+    async def __acall__(self, request):
+        stats = self._start()
+        response = await self.get_response(request)
+        self._check(request, stats)
+        return response
+
+    def _start(self):
+        stats = metrics.current()
+        if stats.sql is None:
+            stats.sql = []
+        return stats
+
+    def _check(self, request, stats):
+        match = request.resolver_match
+        if match is None:
+            return
+        problems = check(match.view_name, request.method, budget_for(match.func, request.method), stats)
+        if not problems:
+            return
+        if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+            raise QueryBudgetExceeded('\n'.join(problems))
+        for problem in problems:
+            logger.warning(problem)
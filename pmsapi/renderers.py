@@ -0,0 +1,36 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # Optional: without it responses are rendered by the standard library, as before.
+    orjson = None
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer, byte for byte, but encoded by orjson when it is installed.
+
+    orjson writes compact, UTF-8 JSON exactly like ``json.dumps`` does for strings, ints, bools, None,
+    lists and dicts. Anything else it refuses (indented output, non-default JSON settings, values it
+    cannot encode) goes through JSONRenderer. orjson may format floats differently, so only use it for
+    responses without float values.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None or self.ensure_ascii or not self.compact or not self.strict
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        encoder = self.encoder_class()
+
+        def default(obj):
+            value = encoder.default(obj)
+            if isinstance(value, float):  # e.g. a bare Decimal
+                raise TypeError('float')
+            return value
+
+        try:
+            ret = orjson.dumps(data, default=default)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same escaping of the JavaScript line terminators as JSONRenderer.
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
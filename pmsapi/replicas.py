@@ -0,0 +1,200 @@
+"""Read replicas: safe requests read from a replica, everything else from the primary.
+
+``DATABASE_REPLICAS`` names the replica aliases in ``DATABASES`` (see settings). ``ReplicaRouter`` sends
+reads to a replica only while ``ReplicaMiddleware`` handles a GET, HEAD or OPTIONS request; writes,
+reads inside a transaction, management commands and jobs always use the primary.
+
+After a user's write request their reads stay on the primary for ``DB_REPLICA_PIN_SECONDS`` (a cache
+entry per user, so shared between workers when the cache is), so a check-in followed by a listing shows
+the new booking. A replica more than ``DB_REPLICA_MAX_LAG`` seconds behind, or unreachable, is skipped
+until it catches up; each process measures the lag at most every ``DB_REPLICA_LAG_CHECK_INTERVAL``
+seconds, outside the request's metrics and query budget.
+
+With ``DB_ENGINE=sqlite`` replicas are plain files, refreshed from the primary by
+``copy_sqlite_replica``: a local stand-in for streaming replication.
+"""
+import contextlib
+import contextvars
+import logging
+import os
+import random
+import sqlite3
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.settings import api_settings
+from pmsapi import metrics
+
+logger = logging.getLogger(__name__)
+
+_reads = contextvars.ContextVar('replica_reads', default=None)
+_health = {}
+
+def replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', ())
+
+def _pin_key(user_id):
+    return f'db:pinned:{user_id}'
+
+def _user_id(request):
+    token = getattr(request, 'auth', None)
+    return token.get(api_settings.USER_ID_CLAIM) if token is not None else None
+
+def _pin_seconds():
+    return getattr(settings, 'DB_REPLICA_PIN_SECONDS', 5)
+
+def pin(user_id):
+    """Keep the user's reads on the primary until the replicas have caught up with their writes."""
+    cache.set(_pin_key(user_id), True, _pin_seconds())
+
+async def apin(user_id):
+    await cache.aset(_pin_key(user_id), True, _pin_seconds())
+
+class _Reads:
+    """Routing state of one safe request. The pin is looked up once the request is authenticated."""
+    __slots__ = ('request', 'pinned')
+
+    def __init__(self, request):
+        self.request = request
+        self.pinned = None
+
+    def on_primary(self):
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return True
+        if self.pinned is None:
+            user_id = _user_id(self.request)
+            if user_id is None:
+                # Not authenticated yet. The token's user lookup stays on the primary, so a user who has
+                # just registered is found.
+                return True
+            self.pinned = cache.get(_pin_key(user_id)) is not None
+        return self.pinned
+
+@contextlib.contextmanager
+def use_primary():
+    """Read from the primary inside the block, e.g. to fill a cache shared with requests that read later writes."""
+    token = _reads.set(None)
+    try:
+        yield
+    finally:
+        _reads.reset(token)
+
+def replica_lag(alias):
+    """Seconds replica ``alias`` is behind the primary.
+
+    SQLite replicas are copies: once the primary has changed since the copy, the replica is as far
+    behind as the copy is old. Other backends are assumed to keep up.
+    """
+    connection = connections[alias]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            # An idle primary sends no new transactions, so an old replay timestamp only means lag
+            # while received WAL is still waiting to be replayed.
+            cursor.execute(
+                "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+            )
+            return float(cursor.fetchone()[0] or 0)
+    if connection.vendor == 'sqlite':
+        copied = os.path.getmtime(connection.settings_dict['NAME'])
+        if os.path.getmtime(connections[DEFAULT_DB_ALIAS].settings_dict['NAME']) > copied:
+            return max(0.0, time.time() - copied)
+    return 0.0
+
+def _usable(alias):
+    try:
+        with metrics.paused():
+            lag = replica_lag(alias)
+    except (DatabaseError, OSError):
+        logger.warning("Replica %s is unreachable; reading from the primary.", alias, exc_info=True)
+        return False
+    if lag > getattr(settings, 'DB_REPLICA_MAX_LAG', 2):
+        logger.warning("Replica %s is %.1f s behind; reading from the primary.", alias, lag)
+        return False
+    return True
+
+def usable_replicas():
+    """The replicas within DB_REPLICA_MAX_LAG of the primary, as of the last check."""
+    interval = getattr(settings, 'DB_REPLICA_LAG_CHECK_INTERVAL', 1)
+    now = time.monotonic()
+    usable = []
+    for alias in replicas():
+        checked = _health.get(alias)
+        if checked is None or now - checked[0] >= interval:
+            checked = _health[alias] = (now, _usable(alias))
+        if checked[1]:
+            usable.append(alias)
+    return usable
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        reads = _reads.get()
+        if reads is None or reads.on_primary():
+            return DEFAULT_DB_ALIAS
+        usable = usable_replicas()
+        return random.choice(usable) if usable else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Explicit, or Django would save an instance back to the replica it was read from.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        databases = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        return False if db in replicas() else None
+
+class ReplicaMiddleware:
+    """Let safe requests read from the replicas, and pin users who write to the primary."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not replicas():
+            return self.get_response(request)
+        token = _reads.set(_Reads(request) if request.method in SAFE_METHODS else None)
+        try:
+            response = self.get_response(request)
+        finally:
+            _reads.reset(token)
+        if request.method not in SAFE_METHODS and _user_id(request) is not None:
+            pin(_user_id(request))
+        return response
+
+    async def __acall__(self, request):
+        if not replicas():
+            return await self.get_response(request)
+        token = _reads.set(_Reads(request) if request.method in SAFE_METHODS else None)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _reads.reset(token)
+        if request.method not in SAFE_METHODS and _user_id(request) is not None:
+            await apin(_user_id(request))
+        return response
+
+def copy_sqlite_replica(alias):
+    """Refresh SQLite replica ``alias`` with a copy of the primary."""
+    primary = connections[DEFAULT_DB_ALIAS]
+    primary.ensure_connection()
+    target = sqlite3.connect(connections[alias].settings_dict['NAME'])
+    try:
+        primary.connection.backup(target)
+    finally:
+        target.close()
+    _health.pop(alias, None)
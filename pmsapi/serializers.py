@@ -0,0 +1,33 @@
+import time
+
+from rest_framework.permissions import SAFE_METHODS
+from pmsapi import metrics
+
+class SparseFieldsMixin:
+    """Let read requests select a subset of fields with ``?fields=a,b``."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return
+        fields = request.query_params.get('fields')
+        if fields:
+            keep = {name.strip() for name in fields.split(',')}
+            for name in set(self.fields) - keep:
+                self.fields.pop(name)
+
+class TimedRepresentationMixin:
+    """Count the time spent turning instances into response data as the request's serializer time."""
+
+    def to_representation(self, instance):
+        stats = metrics.current()
+        if stats is None or stats.serializing:
+            return super().to_representation(instance)
+        stats.serializing = True
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            stats.serializer_time += time.perf_counter() - start
+            stats.serializing = False
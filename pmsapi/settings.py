@@ -47,17 +47,22 @@ INSTALLED_APPS = [
     'authentication',
     'rooms',
     'bookings',
+    'analytics',
+    'jobs',
+    'rates',
 ]
 
 REST_FRAMEWORK = {
     # Use Django's standard `django.contrib.auth` permissions,
     # or allow read-only access for unauthenticated users.
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.jwt.JWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_PAGINATION_CLASS': 'pmsapi.pagination.KeysetPagination',
+    'PAGE_SIZE': int(os.getenv('API_PAGE_SIZE', 50)),
 }
 
 SIMPLE_JWT = {
@@ -70,7 +75,14 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),  
 }
 
+# Trust validated access-token claims instead of loading the User row on every request.
+# Revoked tokens and deactivated users are still rejected through a cache lookup.
+JWT_STATELESS_AUTH = os.getenv('JWT_STATELESS_AUTH', 'False') == 'True'
+
 MIDDLEWARE = [
+    'pmsapi.metrics.MetricsMiddleware',
+    'pmsapi.querybudget.QueryBudgetMiddleware',
+    'pmsapi.replicas.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -111,17 +123,110 @@ DATABASES = {
 }
 '''
 # Database
-DATABASES = {
+# DB_ENGINE=sqlite runs against BASE_DIR/db.sqlite3 (or SQLITE_PATH) as a local stand-in for Postgres.
+if os.getenv('DB_ENGINE', 'postgresql') == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            # IMMEDIATE takes the write lock at BEGIN, so concurrent writers wait for each other instead
+            # of failing with "database is locked" when a read-then-write transaction upgrades its lock.
+            'OPTIONS': {'timeout': 20, 'transaction_mode': 'IMMEDIATE'},
+            # A file rather than Django's shared-cache in-memory default, which rejects concurrent
+            # writers with table locks: the tests check that concurrent check-ins have one winner.
+            'TEST': {'NAME': os.getenv('SQLITE_TEST_PATH', BASE_DIR / 'test_db.sqlite3')},
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('POSTGRES_DB'),
+            'USER': os.getenv('POSTGRES_USER'),
+            'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
+            'HOST': os.getenv('POSTGRES_HOST'),
+            'PORT': os.getenv('POSTGRES_PORT'),
+        }
+    }
+
+# Connection reuse. By default each worker thread keeps its connection for DB_CONN_MAX_AGE seconds and
+# checks it is still alive before reusing it. DB_POOL=True (Postgres with psycopg 3) shares a pool per
+# worker process instead; Django requires CONN_MAX_AGE=0 with a pool.
+DB_POOL = os.getenv('DB_POOL', 'False') == 'True' and DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql'
+DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+DATABASES['default']['CONN_MAX_AGE'] = 0 if DB_POOL else int(os.getenv('DB_CONN_MAX_AGE', 60))
+if DB_POOL:
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+            'timeout': int(os.getenv('DB_POOL_TIMEOUT', 10)),
+        },
+    }
+
+# Read replicas (pmsapi/replicas.py). DB_REPLICAS lists replica hosts, which share the primary's other
+# settings, or with DB_ENGINE=sqlite replica files refreshed by pmsapi.replicas.copy_sqlite_replica.
+# GET requests read from a replica unless the user wrote in the last DB_REPLICA_PIN_SECONDS; keep that
+# above DB_REPLICA_MAX_LAG, the lag beyond which a replica is skipped (checked every
+# DB_REPLICA_LAG_CHECK_INTERVAL seconds per process).
+DATABASE_REPLICAS = []
+for number, location in enumerate(filter(None, os.getenv('DB_REPLICAS', '').split(',')), 1):
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'NAME' if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3' else 'HOST': location,
+        # Tests read the replicas through the test database.
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+DATABASE_ROUTERS = ['pmsapi.replicas.ReplicaRouter']
+DB_REPLICA_PIN_SECONDS = int(os.getenv('DB_REPLICA_PIN_SECONDS', 5))
+DB_REPLICA_MAX_LAG = float(os.getenv('DB_REPLICA_MAX_LAG', 2))
+DB_REPLICA_LAG_CHECK_INTERVAL = float(os.getenv('DB_REPLICA_LAG_CHECK_INTERVAL', 1))
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Local memory by default; point CACHE_BACKEND/CACHE_LOCATION at Redis or Memcached to share it between workers.
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': os.getenv('POSTGRES_DB'),
-        'USER': os.getenv('POSTGRES_USER'),
-        'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
-        'HOST': os.getenv('POSTGRES_HOST'),
-        'PORT': os.getenv('POSTGRES_PORT'),
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'pmsapi'),
     }
 }
 
+AVAILABLE_ROOMS_CACHE_TIMEOUT = int(os.getenv('AVAILABLE_ROOMS_CACHE_TIMEOUT', 300))
+
+# Nights each process keeps precomputed stay prices for (rates.calendar), after and before today.
+# Stays outside the window are still priced, night by night.
+RATE_CALENDAR_DAYS = int(os.getenv('RATE_CALENDAR_DAYS', 731))
+RATE_CALENDAR_PAST_DAYS = int(os.getenv('RATE_CALENDAR_PAST_DAYS', 366))
+
+# Room-status push feed (/api/async/rooms/events/). The in-process broker needs no extra service; use
+# rooms.events.CacheBroker with a shared cache when rooms are changed by other processes than the ASGI one.
+ROOM_EVENTS_BROKER = os.getenv('ROOM_EVENTS_BROKER', 'rooms.events.InProcessBroker')
+ROOM_EVENTS_BUFFER = int(os.getenv('ROOM_EVENTS_BUFFER', 1000))
+ROOM_EVENTS_KEEPALIVE = int(os.getenv('ROOM_EVENTS_KEEPALIVE', 15))
+
+# Request metrics (/metrics, Server-Timing). Requests slower than METRICS_SLOW_REQUEST_MS are logged
+# with their SQL on the pmsapi.metrics logger; 0 disables the log and the SQL capture.
+METRICS_SLOW_REQUEST_MS = int(os.getenv('METRICS_SLOW_REQUEST_MS', 0))
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+# Views declare query_budget (see pmsapi/querybudget.py). Over-budget and repeated queries are logged,
+# or raised when QUERY_BUDGET_STRICT is set (the test suite always sets it).
+QUERY_BUDGET_STRICT = os.getenv('QUERY_BUDGET_STRICT', 'False') == 'True'
+QUERY_BUDGET_MAX_REPEATS = int(os.getenv('QUERY_BUDGET_MAX_REPEATS', 2))
+
+# archive_bookings moves bookings checked out more than this many days ago out of the bookings table.
+BOOKING_ARCHIVE_AFTER_DAYS = int(os.getenv('BOOKING_ARCHIVE_AFTER_DAYS', 365))
+
+# Background jobs (jobs/queue.py, run by `manage.py run_workers`). A failed job is retried after
+# JOBS_RETRY_DELAY seconds, doubled on every attempt, up to JOBS_MAX_ATTEMPTS runs. A worker that has not
+# finished a job within JOBS_LEASE seconds loses it to the next worker.
+JOBS_MAX_ATTEMPTS = int(os.getenv('JOBS_MAX_ATTEMPTS', 5))
+JOBS_RETRY_DELAY = int(os.getenv('JOBS_RETRY_DELAY', 30))
+JOBS_LEASE = int(os.getenv('JOBS_LEASE', 300))
+JOBS_POLL_INTERVAL = float(os.getenv('JOBS_POLL_INTERVAL', 1))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -142,6 +247,34 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# https://docs.djangoproject.com/en/5.2/topics/auth/passwords/
+# PASSWORD_HASHER_PROFILE picks the hasher for new passwords; the others stay listed so existing
+# hashes keep verifying and are upgraded to the preferred one on the next successful login.
+# The argon2 profile needs the argon2-cffi package.
+PASSWORD_HASHER_PROFILES = {
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'scrypt': 'authentication.hashers.TunedScryptPasswordHasher',
+    'argon2': 'authentication.hashers.TunedArgon2PasswordHasher',
+}
+PASSWORD_HASHER_PROFILE = os.getenv('PASSWORD_HASHER_PROFILE', 'pbkdf2')
+PASSWORD_HASHERS = [PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE]] + [
+    hasher for profile, hasher in PASSWORD_HASHER_PROFILES.items() if profile != PASSWORD_HASHER_PROFILE
+] + ['django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher']
+
+PASSWORD_SCRYPT_N = int(os.getenv('PASSWORD_SCRYPT_N', 2 ** 14))
+PASSWORD_SCRYPT_R = int(os.getenv('PASSWORD_SCRYPT_R', 8))
+PASSWORD_SCRYPT_P = int(os.getenv('PASSWORD_SCRYPT_P', 1))
+PASSWORD_ARGON2_TIME_COST = int(os.getenv('PASSWORD_ARGON2_TIME_COST', 2))
+PASSWORD_ARGON2_MEMORY_COST = int(os.getenv('PASSWORD_ARGON2_MEMORY_COST', 65536))
+PASSWORD_ARGON2_PARALLELISM = int(os.getenv('PASSWORD_ARGON2_PARALLELISM', 2))
+
+# Failed logins allowed per username / per client IP within LOGIN_ATTEMPT_WINDOW seconds.
+LOGIN_ATTEMPT_LIMIT = int(os.getenv('LOGIN_ATTEMPT_LIMIT', 5))
+LOGIN_IP_ATTEMPT_LIMIT = int(os.getenv('LOGIN_IP_ATTEMPT_LIMIT', 50))
+LOGIN_ATTEMPT_WINDOW = int(os.getenv('LOGIN_ATTEMPT_WINDOW', 300))
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
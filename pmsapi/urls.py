@@ -17,6 +17,7 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path,include
 from rest_framework_simplejwt.views import TokenRefreshView
+from pmsapi.metrics import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -25,4 +26,9 @@ urlpatterns = [
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/rooms/', include('rooms.urls')),
     path('api/bookings/', include('bookings.urls')),
+    path('api/reports/', include('analytics.urls')),
+    path('api/rates/', include('rates.urls')),
+    path('api/async/rooms/', include('rooms.async_urls')),
+    path('api/async/bookings/', include('bookings.async_urls')),
+    path('metrics', metrics_view, name='metrics'),
 ]
@@ -0,0 +1,39 @@
+"""Generation counters in the shared cache, for caches that are dropped by moving on to a new key.
+
+Readers put ``version(key)`` into their cache keys (or compare it with the one they built from);
+writers call ``invalidate(key)``, after which no reader finds the old entries again.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+def version(key):
+    """Current generation stored under ``key``."""
+    value = cache.get(key)
+    if value is None:
+        # Seeded from the clock so a cache restart never reuses a generation handed out before it.
+        cache.add(key, time.time_ns(), None)
+        value = cache.get(key)
+    return value
+
+async def aversion(key):
+    value = await cache.aget(key)
+    if value is None:
+        await cache.aadd(key, time.time_ns(), None)
+        value = await cache.aget(key)
+    return value
+
+def bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+def invalidate(key):
+    """Bump the generation now, and again once the surrounding transaction commits.
+
+    The second bump stops a concurrent reader from caching pre-commit rows under the new generation.
+    """
+    bump(key)
+    transaction.on_commit(lambda: bump(key))
@@ -0,0 +1,120 @@
+"""Stay prices from a per-process calendar of nightly prices.
+
+A property's calendar covers ``RATE_CALENDAR_PAST_DAYS`` before today to ``RATE_CALENDAR_DAYS`` after
+it. Rooms with the same room type and base price share a plan; for each plan that is priced, the
+calendar materialises every night's price from the rates (slice assignments per rate and weekday, no
+per-night lookups) and keeps their running totals in cents, so a stay of any length inside the window
+costs two array reads. Nights outside the window are priced from the same rules on the fly.
+
+Each process keeps one calendar per property and rebuilds it when the property's rates version (in
+the shared cache, bumped by rate and room writes, see signals) changes, or the day does. Building
+loads the property's rates; the room-to-plan map is only loaded once something needs it.
+"""
+import datetime
+from array import array
+from decimal import Decimal
+from itertools import accumulate
+
+from django.conf import settings
+from django.utils import timezone
+from pmsapi import versions
+from pmsapi.replicas import use_primary
+from rates.models import ALL_WEEKDAYS, Rate
+from rooms.models import Room
+
+_calendars = {}
+
+def _version_key(property_id):
+    return f'rates:version:{property_id}'
+
+def rates_version(property_id):
+    """Current generation of the property's rates and room prices."""
+    return versions.version(_version_key(property_id))
+
+def invalidate_rates(property_id):
+    """Rebuild the property's calendars, now and once the surrounding transaction commits."""
+    versions.invalidate(_version_key(property_id))
+
+def _cents(price):
+    return int(Decimal(price) * 100)
+
+class PriceCalendar:
+    """Nightly prices of one property's rooms, as of one rates version and day."""
+
+    def __init__(self, property_id, version, today, rates):
+        self.property_id = property_id
+        self.version = version
+        self.built_on = today
+        self.start = today - datetime.timedelta(days=getattr(settings, 'RATE_CALENDAR_PAST_DAYS', 366))
+        self.days = (today - self.start).days + getattr(settings, 'RATE_CALENDAR_DAYS', 731)
+        # (room_type_id, start, end, weekdays, cents), lowest precedence first: later rates overwrite earlier ones.
+        self.rates = rates
+        self._plans = None
+        self._totals = {}
+
+    @classmethod
+    def build(cls, property_id, version, today):
+        rows = Rate.objects.in_property(property_id).values_list('room_type_id', 'start', 'end', 'weekdays', 'price', 'priority', 'id')
+        rows = sorted(rows, key=lambda row: (row[5], row[0] is not None, row[6]))
+        return cls(property_id, version, today, [(room_type, start, end, weekdays, _cents(price)) for room_type, start, end, weekdays, price, _, _ in rows])
+
+    def plan(self, room_id):
+        """The room's ``(room_type_id, base price in cents)``, or None if it is not a room of the property."""
+        if self._plans is None:
+            rooms = Room.objects.in_property(self.property_id).values_list('id', 'room_type_id', 'price')
+            self._plans = {pk: (room_type, _cents(price)) for pk, room_type, price in rooms}
+        return self._plans.get(room_id)
+
+    def nightly(self, plan, first, nights):
+        """Prices in cents of ``nights`` nights from ``first`` for rooms on ``plan``."""
+        room_type, base = plan
+        prices = array('q', [base]) * nights
+        weekday = first.weekday()
+        for rate_type, start, end, weekdays, cents in self.rates:
+            if rate_type is not None and rate_type != room_type:
+                continue
+            lo = 0 if start is None else max(0, (start - first).days)
+            hi = nights if end is None else min(nights, (end - first).days)
+            if lo >= hi:
+                continue
+            if weekdays == ALL_WEEKDAYS:
+                prices[lo:hi] = array('q', [cents]) * (hi - lo)
+                continue
+            for day in range(7):
+                if weekdays >> day & 1:
+                    # First night in [lo, hi) falling on that weekday, then every seventh.
+                    night = lo + (day - weekday - lo) % 7
+                    prices[night:hi:7] = array('q', [cents]) * len(range(night, hi, 7))
+        return prices
+
+    def _running_totals(self, plan):
+        totals = self._totals.get(plan)
+        if totals is None:
+            totals = self._totals[plan] = array('q', accumulate(self.nightly(plan, self.start, self.days), initial=0))
+        return totals
+
+    def total(self, plan, first, nights):
+        """Price in cents of ``nights`` nights from ``first`` for rooms on ``plan``."""
+        i = (first - self.start).days
+        if 0 <= i and i + nights <= self.days:
+            totals = self._running_totals(plan)
+            return totals[i + nights] - totals[i]
+        return sum(self.nightly(plan, first, nights))
+
+    def stay_price(self, room_id, first, nights):
+        """Price of a stay in the room, or None if the room is not in the property."""
+        plan = self.plan(room_id)
+        if plan is None:
+            return None
+        return Decimal(self.total(plan, first, nights)) / 100
+
+def price_calendar(property_id):
+    """This process's calendar of the property, rebuilt when its rates change or the day turns."""
+    version = rates_version(property_id)
+    today = timezone.localdate()
+    calendar = _calendars.get(property_id)
+    if calendar is None or calendar.version != version or calendar.built_on != today:
+        # The calendar outlives the request: a lagging replica would cache rates older than its version.
+        with use_primary():
+            calendar = _calendars[property_id] = PriceCalendar.build(property_id, version, today)
+    return calendar
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.5 on 2026-10-18 21:02
+
+import django.core.validators
+import django.db.models.deletion
+import rooms.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('rooms', '0004_property'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomType',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.SlugField(help_text='Short code, unique within the property.', max_length=20)),
+                ('name', models.CharField(help_text='Room type name.', max_length=100)),
+                ('property', models.ForeignKey(db_index=False, default=rooms.models.default_property, help_text='Property the room type belongs to.', on_delete=django.db.models.deletion.PROTECT, related_name='room_types', to='rooms.property')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Rate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Rate name, e.g. season or promotion.', max_length=100)),
+                ('start', models.DateField(blank=True, help_text='First night the rate applies to; empty for no limit.', null=True)),
+                ('end', models.DateField(blank=True, help_text='Day the rate stops applying (exclusive); empty for no limit.', null=True)),
+                ('weekdays', models.PositiveSmallIntegerField(default=127, help_text='Nights of the week the rate applies to, as a bit mask with Monday as bit 0.', validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(127)])),
+                ('price', models.DecimalField(decimal_places=2, help_text='Price per night.', max_digits=10, validators=[django.core.validators.MinValueValidator(0)])),
+                ('priority', models.SmallIntegerField(default=0, help_text='Higher priorities win where rates overlap.')),
+                ('property', models.ForeignKey(db_index=False, default=rooms.models.default_property, help_text='Property the rate belongs to.', on_delete=django.db.models.deletion.PROTECT, related_name='rates', to='rooms.property')),
+                ('room_type', models.ForeignKey(blank=True, help_text='Room type the rate applies to; empty for every room of the property.', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='rates', to='rates.roomtype')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='roomtype',
+            constraint=models.UniqueConstraint(fields=('property', 'code'), name='roomtype_property_code_uniq'),
+        ),
+        migrations.AddIndex(
+            model_name='rate',
+            index=models.Index(fields=['property', 'id'], name='rate_property_idx'),
+        ),
+    ]
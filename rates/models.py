@@ -0,0 +1,64 @@
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import models
+from rooms.models import Property, default_property
+
+# Weekday bit mask with every night set; Monday is bit 0, as in date.weekday().
+ALL_WEEKDAYS = 0b1111111
+
+class RoomType(models.Model):
+    """A category of rooms (double, suite, ...) that rates can be set for."""
+    # Indexed through the unique constraint below.
+    property = models.ForeignKey(
+        Property, on_delete=models.PROTECT, default=default_property, db_index=False, related_name='room_types',
+        help_text="Property the room type belongs to.",
+    )
+    code = models.SlugField(max_length=20, help_text="Short code, unique within the property.")
+    name = models.CharField(max_length=100, help_text="Room type name.")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['property', 'code'], name='roomtype_property_code_uniq'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+class RateQuerySet(models.QuerySet):
+    def in_property(self, property_id):
+        return self.filter(property_id=property_id)
+
+class Rate(models.Model):
+    """Nightly price of a property's rooms, or of one room type's, on some dates and weekdays.
+
+    Where rates overlap the highest priority wins, then a room type's rate over a property-wide one, then
+    the newest rate. Nights no rate covers cost the room's own price.
+    """
+    # Indexed through rate_property_idx.
+    property = models.ForeignKey(
+        Property, on_delete=models.PROTECT, default=default_property, db_index=False, related_name='rates',
+        help_text="Property the rate belongs to.",
+    )
+    room_type = models.ForeignKey(
+        RoomType, on_delete=models.CASCADE, null=True, blank=True, related_name='rates',
+        help_text="Room type the rate applies to; empty for every room of the property.",
+    )
+    name = models.CharField(max_length=100, help_text="Rate name, e.g. season or promotion.")
+    start = models.DateField(null=True, blank=True, help_text="First night the rate applies to; empty for no limit.")
+    end = models.DateField(null=True, blank=True, help_text="Day the rate stops applying (exclusive); empty for no limit.")
+    weekdays = models.PositiveSmallIntegerField(
+        default=ALL_WEEKDAYS, validators=[MinValueValidator(1), MaxValueValidator(ALL_WEEKDAYS)],
+        help_text="Nights of the week the rate applies to, as a bit mask with Monday as bit 0.",
+    )
+    price = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0)], help_text="Price per night.")
+    priority = models.SmallIntegerField(default=0, help_text="Higher priorities win where rates overlap.")
+
+    objects = RateQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # The price calendar loads all of a property's rates; the API pages through them by id.
+            models.Index(fields=['property', 'id'], name='rate_property_idx'),
+        ]
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,61 @@
+from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
+from bookings.exceptions import InvalidDateRangeError
+from bookings.serializers import StayRangeSerializer
+from rates.models import Rate, RoomType
+from rooms.tenancy import property_id
+
+class WeekdaysField(serializers.Field):
+    """Weekdays as a list of numbers (Monday is 0), stored as a bit mask."""
+    default_error_messages = {'invalid': "Expected a non-empty list of weekdays from 0 (Monday) to 6 (Sunday)."}
+
+    def to_representation(self, value):
+        return [day for day in range(7) if value >> day & 1]
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list) or not data or any(type(day) is not int or not 0 <= day <= 6 for day in data):
+            self.fail('invalid')
+        return sum(1 << day for day in set(data))
+
+def validate_room_type(serializer, value):
+    """A room type must belong to the request's property."""
+    if value is not None and value.property_id != property_id(serializer.context.get('request')):
+        raise serializers.ValidationError("Room type does not exist.")
+    return value
+
+class RoomTypeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = RoomType
+        fields = ('id', 'code', 'name')
+
+    def validate_code(self, value):
+        # Codes are unique within the request's property.
+        room_types = RoomType.objects.filter(property_id=property_id(self.context.get('request')))
+        UniqueValidator(room_types, message='room type with this code already exists.')(value, self.fields['code'])
+        return value
+
+class RateSerializer(serializers.ModelSerializer):
+    weekdays = WeekdaysField(required=False, help_text="Nights of the week the rate applies to; every night by default.")
+
+    class Meta:
+        model = Rate
+        fields = ('id', 'name', 'room_type', 'start', 'end', 'weekdays', 'price', 'priority')
+
+    def validate_room_type(self, value):
+        return validate_room_type(self, value)
+
+    def validate(self, data):
+        start = data.get('start', getattr(self.instance, 'start', None))
+        end = data.get('end', getattr(self.instance, 'end', None))
+        if start is not None and end is not None and not start < end:
+            raise InvalidDateRangeError("End date must be after start date.")
+        return data
+
+class QuoteRangeSerializer(StayRangeSerializer):
+    MAX_NIGHTS = 731
+
+    def validate(self, data):
+        data = super().validate(data)
+        if (data['end'] - data['start']).days > self.MAX_NIGHTS:
+            raise serializers.ValidationError(f"Quotes cover at most {self.MAX_NIGHTS} nights.")
+        return data
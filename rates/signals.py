@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rates.calendar import invalidate_rates
+from rates.models import Rate, RoomType
+from rooms.models import Room
+
+@receiver(post_save, sender=Rate)
+@receiver(post_delete, sender=Rate)
+@receiver(post_delete, sender=RoomType)
+@receiver(post_save, sender=Room)
+@receiver(post_delete, sender=Room)
+def prices_changed(sender, instance, **kwargs):
+    # Deleting a room type moves its rooms to no type with an UPDATE that sends no signal of its own.
+    invalidate_rates(instance.property_id)
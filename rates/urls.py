@@ -0,0 +1,8 @@
+from django.urls import path
+from rates.views import RateDetailView, RateListCreateView, RoomTypeListCreateView
+
+urlpatterns = [
+    path('', RateListCreateView.as_view(), name='rate-list-create'),
+    path('<int:pk>/', RateDetailView.as_view(), name='rate-detail'),
+    path('room-types/', RoomTypeListCreateView.as_view(), name='room-type-list-create'),
+]
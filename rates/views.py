@@ -0,0 +1,38 @@
+from rest_framework.generics import ListCreateAPIView, RetrieveUpdateDestroyAPIView
+from rest_framework.permissions import IsAdminUser
+from rates.models import Rate, RoomType
+from rates.serializers import RateSerializer, RoomTypeSerializer
+from rooms.tenancy import property_id
+
+class RoomTypeListCreateView(ListCreateAPIView):
+    """The property's room types; staff only."""
+    serializer_class = RoomTypeSerializer
+    permission_classes = [IsAdminUser]
+    query_budget = {'GET': 2, 'POST': 3}
+
+    def get_queryset(self):
+        return RoomType.objects.filter(property_id=property_id(self.request))
+
+    def perform_create(self, serializer):
+        serializer.save(property_id=property_id(self.request))
+
+class RateListCreateView(ListCreateAPIView):
+    """The property's rates; staff only. Changes reach the price calendars through the rates version."""
+    serializer_class = RateSerializer
+    permission_classes = [IsAdminUser]
+    query_budget = {'GET': 2, 'POST': 3}
+
+    def get_queryset(self):
+        return Rate.objects.in_property(property_id(self.request))
+
+    def perform_create(self, serializer):
+        serializer.save(property_id=property_id(self.request))
+
+class RateDetailView(RetrieveUpdateDestroyAPIView):
+    serializer_class = RateSerializer
+    permission_classes = [IsAdminUser]
+    # PATCH without a room type skips its lookup.
+    query_budget = {'GET': 2, 'PUT': 4, 'PATCH': 3, 'DELETE': 3}
+
+    def get_queryset(self):
+        return Rate.objects.in_property(property_id(self.request))
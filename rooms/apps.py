@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class RoomsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'rooms'
+
+    def ready(self):
+        from rooms import signals  # noqa: F401
@@ -0,0 +1,8 @@
+from django.urls import path
+from rooms.async_views import room_list, room_available_list, room_events
+
+urlpatterns = [
+    path('', room_list, name='async-room-list'),
+    path('available/', room_available_list, name='async-room-available-list'),
+    path('events/', room_events, name='async-room-events'),
+]
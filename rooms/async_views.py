@@ -0,0 +1,90 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.exceptions import NotFound, ValidationError
+from pmsapi.asyncapi import async_api_view, json_response, keyset_page
+from pmsapi.replicas import use_primary
+from rooms.models import Room
+from rooms.serializers import RoomSerializer
+from rooms.cache import aavailable_rooms_cache_entry, available_rooms_timeout
+from rooms.events import RESET, get_broker
+from rooms.tenancy import property_id
+from bookings.availability import free_rooms
+from bookings.serializers import StayRangeSerializer
+
+@async_api_view('GET')
+async def room_list(request):
+    return json_response(await keyset_page(request, Room.objects.in_property(property_id(request)), RoomSerializer))
+
+@async_api_view('GET')
+async def room_available_list(request):
+    """Async counterpart of RoomAvailableListView, sharing its cache and ETags."""
+    if 'start' in request.query_params or 'end' in request.query_params:
+        stay = StayRangeSerializer(data=request.query_params)
+        stay.is_valid(raise_exception=True)
+        queryset = free_rooms(stay.validated_data['start'], stay.validated_data['end'], property_id(request))
+        return json_response(await keyset_page(request, queryset, RoomSerializer))
+    key, etag = await aavailable_rooms_cache_entry(request)
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        return json_response(None, status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+    data = await cache.aget(key)
+    if data is None:
+        with use_primary():
+            data = await keyset_page(request, Room.objects.in_property(property_id(request)).filter(is_available=True), RoomSerializer)
+        await cache.aset(key, data, available_rooms_timeout())
+    return json_response(data, headers={'ETag': etag})
+
+def _sse(event, seq, data):
+    return f'id: {seq}\nevent: {event}\ndata: {json.dumps(data, separators=(",", ":"))}\n\n'
+
+async def _room_event_stream(broker, after, prop):
+    # The broker may sit on a shared cache, so its synchronous calls run off the event loop.
+    since = sync_to_async(broker.since, thread_sensitive=False)
+    last_seq = sync_to_async(broker.last_seq, thread_sensitive=False)
+    keepalive = getattr(settings, 'ROOM_EVENTS_KEEPALIVE', 15)
+    if after is None:
+        after = await last_seq()
+        yield _sse('ready', after, {})
+    while True:
+        events = await since(after)
+        if events == RESET:
+            after = await last_seq()
+            yield _sse(RESET, after, {})
+        elif events:
+            for seq, payload in events:
+                # Other properties' rooms are not sent.
+                if payload['property'] == prop:
+                    yield _sse('room', seq, payload)
+            after = events[-1][0]
+        else:
+            yield ': keepalive\n\n'
+        await broker.wait(after, keepalive)
+
+@async_api_view('GET')
+async def room_events(request):
+    """Server-sent events with the state of each room as it changes.
+
+    Only rooms of the request's property are sent. A new client gets a ``ready`` event carrying the current
+    sequence number, then fetches the listing once.
+    Reconnecting clients send ``Last-Event-ID`` (or ``?since=``) and receive what they missed, or a ``reset``
+    event if it is no longer buffered, after which they should refetch the listing.
+    """
+    if not isinstance(request._request, ASGIRequest):
+        # Under WSGI Django would consume the endless stream into a list, holding a thread forever.
+        raise NotFound("Room events are only served by the ASGI service.")
+    last_id = request.headers.get('Last-Event-ID') or request.query_params.get('since')
+    try:
+        after = int(last_id) if last_id else None
+    except ValueError:
+        raise ValidationError({'since': "Must be an event id."})
+    response = StreamingHttpResponse(_room_event_stream(get_broker(), after, property_id(request)), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream.
+    response['X-Accel-Buffering'] = 'no'
+    return response
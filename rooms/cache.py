@@ -0,0 +1,33 @@
+import hashlib
+
+from django.conf import settings
+from pmsapi import versions
+
+VERSION_KEY = 'rooms:available:version'
+
+def available_rooms_version():
+    """Current generation of the available-rooms listing; bumped on every room write."""
+    return versions.version(VERSION_KEY)
+
+async def aavailable_rooms_version():
+    return await versions.aversion(VERSION_KEY)
+
+def invalidate_available_rooms():
+    """Drop cached listings, now and once the surrounding transaction commits."""
+    versions.invalidate(VERSION_KEY)
+
+def available_rooms_cache_entry(request):
+    """Cache key and ETag for one rendering (property, page, page size, fields, host) of the listing."""
+    return _cache_entry(request, available_rooms_version())
+
+async def aavailable_rooms_cache_entry(request):
+    return _cache_entry(request, await aavailable_rooms_version())
+
+def _cache_entry(request, version):
+    from rooms.tenancy import property_id
+
+    digest = hashlib.md5(f'{property_id(request)}:{request.build_absolute_uri()}'.encode()).hexdigest()[:16]
+    return f'rooms:available:{version}:{digest}', f'"{version}-{digest}"'
+
+def available_rooms_timeout():
+    return getattr(settings, 'AVAILABLE_ROOMS_CACHE_TIMEOUT', 300)
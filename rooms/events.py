@@ -0,0 +1,167 @@
+"""Room-status feed: every committed change to a room is published as a numbered event.
+
+Subscribers (the SSE endpoint) resume from the last sequence number they saw. The default broker
+lives in the process; ``CacheBroker`` shares events between processes through the configured cache.
+"""
+import asyncio
+import collections
+import functools
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+RESET = 'reset'
+
+def _initial_seq():
+    # Sequence numbers keep growing across restarts, so an id from an earlier process is simply "too old".
+    return time.time_ns() // 1000
+
+class InProcessBroker:
+    """Ring buffer of recent events plus wake-ups for subscribers on any event loop in this process."""
+
+    def __init__(self, buffer_size=None):
+        self._events = collections.deque(maxlen=buffer_size or getattr(settings, 'ROOM_EVENTS_BUFFER', 1000))
+        self._seq = _initial_seq()
+        self._lock = threading.Lock()
+        self._waiters = set()
+
+    def last_seq(self):
+        return self._seq
+
+    def publish(self, payloads):
+        with self._lock:
+            for payload in payloads:
+                self._seq += 1
+                self._events.append((self._seq, payload))
+            waiters = list(self._waiters)
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+
+    def since(self, after):
+        """Events after ``after``, or ``RESET`` if some of them have already been dropped."""
+        with self._lock:
+            if after > self._seq or (self._events and after < self._events[0][0] - 1) or (not self._events and after < self._seq):
+                return RESET
+            return [(seq, payload) for seq, payload in self._events if seq > after]
+
+    async def wait(self, after, timeout):
+        event = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), event)
+        with self._lock:
+            self._waiters.add(waiter)
+        try:
+            if self._seq == after:
+                await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+class CacheBroker:
+    """Events kept in the shared cache so WSGI workers can publish to SSE clients held by the ASGI service.
+
+    Subscribers poll the sequence counter every ``ROOM_EVENTS_POLL_INTERVAL`` seconds.
+    """
+    SEQ_KEY = 'rooms:events:seq'
+
+    def __init__(self, buffer_size=None):
+        self.buffer_size = buffer_size or getattr(settings, 'ROOM_EVENTS_BUFFER', 1000)
+        self.interval = getattr(settings, 'ROOM_EVENTS_POLL_INTERVAL', 0.5)
+        self.timeout = getattr(settings, 'ROOM_EVENTS_TIMEOUT', 3600)
+
+    def _key(self, seq):
+        return f'rooms:events:{seq}'
+
+    def last_seq(self):
+        seq = cache.get(self.SEQ_KEY)
+        if seq is None:
+            cache.add(self.SEQ_KEY, _initial_seq(), None)
+            seq = cache.get(self.SEQ_KEY)
+        return seq
+
+    def publish(self, payloads):
+        self.last_seq()
+        for payload in payloads:
+            cache.set(self._key(cache.incr(self.SEQ_KEY)), payload, self.timeout)
+
+    def since(self, after):
+        last = self.last_seq()
+        if after > last or last - after > self.buffer_size:
+            return RESET
+        seqs = range(after + 1, last + 1)
+        found = cache.get_many([self._key(seq) for seq in seqs])
+        events = []
+        for seq in seqs:
+            if self._key(seq) not in found:
+                # A gap before a later event means it expired or was evicted. Missing newest events
+                # are still being written by a publisher and are picked up on the next call.
+                if any(self._key(later) in found for later in range(seq + 1, last + 1)):
+                    return RESET
+                break
+            events.append((seq, found[self._key(seq)]))
+        return events
+
+    async def wait(self, after, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            await asyncio.sleep(self.interval)
+            if time.monotonic() >= deadline or await cache.aget(self.SEQ_KEY) != after:
+                return
+
+@functools.cache
+def get_broker():
+    return import_string(getattr(settings, 'ROOM_EVENTS_BROKER', 'rooms.events.InProcessBroker'))()
+
+def publish_room_states(pks, deleted=None):
+    """Publish the current state of the rooms, or the deletion of those in ``deleted`` (room id -> property id).
+
+    Every event names its property. A room that is gone but not in ``deleted`` was deleted by another
+    transaction, which announces it itself.
+    """
+    from rooms.models import Room
+
+    deleted = deleted or {}
+    rooms = {
+        room['id']: room for room in Room.objects.filter(pk__in=pks).values('id', 'property', 'number', 'price', 'is_available')
+    }
+    get_broker().publish([
+        {**rooms[pk], 'price': f"{rooms[pk]['price']:.2f}"} if pk in rooms else {'id': pk, 'property': deleted[pk], 'deleted': True}
+        for pk in sorted(pks) if pk in rooms or pk in deleted
+    ])
+
+def rooms_changed(pks, deleted=None):
+    """Announce changed rooms once the surrounding transaction commits (nothing is sent on rollback).
+
+    Deleted rooms are passed in ``deleted`` as room id -> property id, since their rows are gone by then.
+    Changes made in the same transaction are published together, with one query.
+    """
+    pks = set(pks) | set(deleted or ())
+    if not pks:
+        return
+    connection = transaction.get_connection()
+    pending = getattr(connection, 'pending_room_events', None)
+    if (
+        connection.in_atomic_block and pending is not None and not pending.published
+        and any(func is pending for _, func, _ in connection.run_on_commit)
+    ):
+        pending.pks |= pks
+        pending.deleted.update(deleted or {})
+        return
+    pending = _PendingRoomEvents(pks, dict(deleted or {}))
+    connection.pending_room_events = pending
+    transaction.on_commit(pending)
+
+class _PendingRoomEvents:
+    def __init__(self, pks, deleted):
+        self.pks = pks
+        self.deleted = deleted
+        self.published = False
+
+    def __call__(self):
+        self.published = True
+        publish_room_states(self.pks, self.deleted)
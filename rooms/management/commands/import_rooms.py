@@ -0,0 +1,49 @@
+from django.core.management.base import CommandError
+from rates.calendar import invalidate_rates
+from rooms.cache import invalidate_available_rooms
+from rooms.models import DEFAULT_PROPERTY_ID, Property, Room
+from rooms.serializers import RoomSerializer
+from pmsapi.importing import ImportCommand
+
+class RoomImportSerializer(RoomSerializer):
+    """RoomSerializer rules without the per-row uniqueness query; existing numbers are looked up per batch."""
+    class Meta(RoomSerializer.Meta):
+        fields = ('number', 'price', 'is_available')
+        extra_kwargs = {
+            **RoomSerializer.Meta.extra_kwargs,
+            'number': {'required': True, 'validators': []},
+        }
+
+    def validate_number(self, value):
+        return value
+
+class Command(ImportCommand):
+    help = "Bulk-create rooms from a CSV or JSONL file (columns: number, price, is_available)."
+    serializer_class = RoomImportSerializer
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--update', action='store_true', help="Update price and availability of rooms that already exist.")
+        parser.add_argument('--property', help="Code of the property to import into (default: the default property).")
+
+    def setup(self, options):
+        self.update = options['update']
+        self.property_id = DEFAULT_PROPERTY_ID
+        if options['property']:
+            self.property_id = Property.objects.filter(code=options['property']).values_list('pk', flat=True).first()
+            if self.property_id is None:
+                raise CommandError(f"Unknown property {options['property']!r}.")
+
+    def write_batch(self, validated):
+        # Later rows win when a number repeats within the batch.
+        rooms = {data['number']: Room(property_id=self.property_id, **data) for data in validated}
+        existing = set(Room.objects.in_property(self.property_id).filter(number__in=list(rooms)).values_list('number', flat=True))
+        if self.update:
+            Room.objects.bulk_create(
+                rooms.values(), update_conflicts=True, unique_fields=['property', 'number'], update_fields=['price', 'is_available'],
+            )
+        else:
+            Room.objects.bulk_create([room for number, room in rooms.items() if number not in existing], ignore_conflicts=True)
+        invalidate_available_rooms()
+        invalidate_rates(self.property_id)
+        return len(rooms) - len(existing), len(existing) if self.update else 0
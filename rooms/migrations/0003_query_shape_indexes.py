@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-18 19:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rooms', '0002_alter_room_is_available_alter_room_number_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['id'], name='room_available_idx'),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.5 on 2026-10-18 20:24
+
+import django.db.models.deletion
+import rooms.models
+from django.conf import settings
+from django.core.management.color import no_style
+from django.db import migrations, models
+
+
+def create_default_property(apps, schema_editor):
+    # Every existing room (and through it, booking) belongs to the default property.
+    Property = apps.get_model('rooms', 'Property')
+    Property.objects.using(schema_editor.connection.alias).create(
+        pk=rooms.models.DEFAULT_PROPERTY_ID, code='main', name='Main',
+    )
+    # The row was inserted with an explicit id; move the sequence past it where there is one.
+    for sql in schema_editor.connection.ops.sequence_reset_sql(no_style(), [Property]):
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rooms', '0003_query_shape_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Property',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.SlugField(help_text='Short code clients select the property with at login.', max_length=20, unique=True)),
+                ('name', models.CharField(help_text='Hotel name.', max_length=100)),
+            ],
+            options={
+                'verbose_name_plural': 'properties',
+            },
+        ),
+        migrations.RunPython(create_default_property, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='room',
+            name='room_available_idx',
+        ),
+        migrations.AlterField(
+            model_name='room',
+            name='number',
+            field=models.CharField(help_text='Room number, unique within the property.', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='members',
+            field=models.ManyToManyField(blank=True, help_text='Users who may work in this property besides staff.', related_name='properties', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='room',
+            name='property',
+            field=models.ForeignKey(db_index=False, default=rooms.models.default_property, help_text='Property the room belongs to.', on_delete=django.db.models.deletion.PROTECT, related_name='rooms', to='rooms.property'),
+        ),
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(fields=['property', 'id'], name='room_property_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['property', 'id'], name='room_available_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='room',
+            constraint=models.UniqueConstraint(fields=('property', 'number'), name='room_property_number_uniq'),
+        ),
+    ]
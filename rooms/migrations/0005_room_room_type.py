@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-18 21:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rates', '0001_initial'),
+        ('rooms', '0004_property'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='room',
+            name='room_type',
+            field=models.ForeignKey(blank=True, help_text='Room type whose rates apply to the room; without one only property-wide rates do.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='rooms', to='rates.roomtype'),
+        ),
+    ]
@@ -1,10 +1,74 @@
 from django.db import models
 
 # Create your models here.
+from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
+from rooms.cache import invalidate_available_rooms
+from rooms.events import rooms_changed
+
+# Created by the migration that introduced properties; single-hotel deployments never need another.
+DEFAULT_PROPERTY_ID = 1
+
+class Property(models.Model):
+    """One hotel. Rooms, their bookings and the reports are scoped to a property."""
+    code = models.SlugField(max_length=20, unique=True, help_text="Short code clients select the property with at login.")
+    name = models.CharField(max_length=100, help_text="Hotel name.")
+    members = models.ManyToManyField(
+        User, blank=True, related_name='properties', help_text="Users who may work in this property besides staff.",
+    )
+
+    class Meta:
+        verbose_name_plural = 'properties'
+
+    def __str__(self):
+        return self.name
+
+def default_property():
+    return DEFAULT_PROPERTY_ID
+
+class RoomQuerySet(models.QuerySet):
+    def in_property(self, property_id):
+        return self.filter(property_id=property_id)
+
+    def claim(self, pk):
+        """Mark an available room as taken in one conditional UPDATE. Returns True if this call won the room."""
+        claimed = self.filter(pk=pk, is_available=True).update(is_available=False) == 1
+        if claimed:
+            invalidate_available_rooms()
+            rooms_changed([pk])
+        return claimed
+
+    def release(self, pk):
+        """Mark a room as available again."""
+        released = self.filter(pk=pk, is_available=False).update(is_available=True) == 1
+        if released:
+            invalidate_available_rooms()
+            rooms_changed([pk])
+        return released
+
+    def claim_many(self, pks):
+        """Claim several available rooms with one UPDATE. Returns how many were claimed."""
+        claimed = self.filter(pk__in=pks, is_available=True).update(is_available=False)
+        if claimed:
+            invalidate_available_rooms()
+            rooms_changed(pks)
+        return claimed
+
+    def release_many(self, pks):
+        """Mark several rooms as available again with one UPDATE."""
+        released = self.filter(pk__in=pks, is_available=False).update(is_available=True)
+        if released:
+            invalidate_available_rooms()
+            rooms_changed(pks)
+        return released
 
 class Room(models.Model):
-    number = models.CharField(max_length=10, unique=True, help_text="Room number.")
+    # Indexed through the composite indexes and constraints below, which all start with it.
+    property = models.ForeignKey(
+        Property, on_delete=models.PROTECT, default=default_property, db_index=False, related_name='rooms',
+        help_text="Property the room belongs to.",
+    )
+    number = models.CharField(max_length=10, help_text="Room number, unique within the property.")
     price = models.DecimalField(
         max_digits=10,
         decimal_places=2,
@@ -12,6 +76,23 @@ class Room(models.Model):
         help_text="Price per night."
     )
     is_available = models.BooleanField(default=True, help_text="Room availability status.")
+    room_type = models.ForeignKey(
+        'rates.RoomType', on_delete=models.SET_NULL, null=True, blank=True, related_name='rooms',
+        help_text="Room type whose rates apply to the room; without one only property-wide rates do.",
+    )
+
+    objects = RoomQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Room listings page through one property's rooms by id.
+            models.Index(fields=['property', 'id'], name='room_property_idx'),
+            # The available-rooms listing pages through a property's free rooms by id.
+            models.Index(fields=['property', 'id'], condition=models.Q(is_available=True), name='room_available_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['property', 'number'], name='room_property_number_uniq'),
+        ]
 
     def __str__(self):
-        return self.number
\ No newline at end of file
+        return self.number
@@ -1,12 +1,25 @@
 from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
+from rates.serializers import validate_room_type
 from rooms.models import Room
+from rooms.tenancy import property_id
+from pmsapi.serializers import SparseFieldsMixin, TimedRepresentationMixin
 
-class RoomSerializer(serializers.ModelSerializer):
+class RoomSerializer(TimedRepresentationMixin, SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Room
-        fields = ('id', 'number', 'price', 'is_available')
+        fields = ('id', 'number', 'price', 'is_available', 'room_type')
         extra_kwargs = {
             'number': {'required': True},
             'price': {'required': True},
             'is_available': {'required': True}
-        }
\ No newline at end of file
+        }
+
+    def validate_number(self, value):
+        # Numbers are unique within the request's property; same single query and message as a unique field.
+        rooms = Room.objects.in_property(property_id(self.context.get('request')))
+        UniqueValidator(rooms, message='room with this number already exists.')(value, self.fields['number'])
+        return value
+
+    def validate_room_type(self, value):
+        return validate_room_type(self, value)
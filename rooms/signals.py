@@ -0,0 +1,15 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rooms.cache import invalidate_available_rooms
+from rooms.events import rooms_changed
+from rooms.models import Room
+
+@receiver(post_save, sender=Room)
+def room_changed(sender, instance, **kwargs):
+    invalidate_available_rooms()
+    rooms_changed([instance.pk])
+
+@receiver(post_delete, sender=Room)
+def room_deleted(sender, instance, **kwargs):
+    invalidate_available_rooms()
+    rooms_changed([], deleted={instance.pk: instance.property_id})
@@ -0,0 +1,16 @@
+"""The property a request works in.
+
+Access tokens carry it in the ``property`` claim, resolved at login (see LoginView). Tokens without
+the claim, issued before logins resolved one, work in the default property until they expire.
+Resolving it takes no query.
+"""
+from rooms.models import DEFAULT_PROPERTY_ID
+
+PROPERTY_CLAIM = 'property'
+
+def property_id(request):
+    token = getattr(request, 'auth', None) if request is not None else None
+    if token is None:
+        # No token: management commands and other code without a client work in the default property.
+        return DEFAULT_PROPERTY_ID
+    return token.get(PROPERTY_CLAIM, DEFAULT_PROPERTY_ID)
@@ -1,8 +1,9 @@
 from django.urls import path
-from rooms.views import RoomListCreateView, RoomDetailView, RoomAvailableListView
+from rooms.views import RoomListCreateView, RoomDetailView, RoomAvailableListView, RoomQuoteView
 
 urlpatterns = [
     path('', RoomListCreateView.as_view(), name='room-list-create'),
     path('<int:pk>/', RoomDetailView.as_view(), name='room-detail'),
     path('available/', RoomAvailableListView.as_view(), name='room-available-list'),
+    path('<int:pk>/quote/', RoomQuoteView.as_view(), name='room-quote'),
 ]
\ No newline at end of file
@@ -1,24 +1,87 @@
 from django.shortcuts import render
 
 # Create your views here.
+from django.core.cache import cache
+from django.http import Http404
+from django.utils.http import parse_etags
+from rest_framework import status
 from rest_framework.generics import ListCreateAPIView, RetrieveUpdateDestroyAPIView, ListAPIView
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from pmsapi.fastread import FastReadMixin
+from pmsapi.replicas import use_primary
+from rates.calendar import price_calendar
+from rates.serializers import QuoteRangeSerializer
 from rooms.models import Room
 from rooms.serializers import RoomSerializer
+from rooms.cache import available_rooms_cache_entry, available_rooms_timeout
+from rooms.tenancy import property_id
+from bookings.availability import free_rooms
+from bookings.serializers import StayRangeSerializer
 
-class RoomListCreateView(ListCreateAPIView):
-    queryset = Room.objects.all()
+class RoomListCreateView(FastReadMixin, ListCreateAPIView):
     serializer_class = RoomSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = {'GET': 2, 'POST': 4}
 
-class RoomDetailView(RetrieveUpdateDestroyAPIView):
-    queryset = Room.objects.all()
+    def get_queryset(self):
+        return Room.objects.in_property(property_id(self.request))
+
+    def perform_create(self, serializer):
+        serializer.save(property_id=property_id(self.request))
+
+class RoomDetailView(FastReadMixin, RetrieveUpdateDestroyAPIView):
     serializer_class = RoomSerializer
     permission_classes = [IsAuthenticated]
+    # DELETE cascades to the room's bookings, archived bookings and rollups.
+    query_budget = {'GET': 2, 'PUT': 5, 'PATCH': 5, 'DELETE': 7}
+
+    def get_queryset(self):
+        return Room.objects.in_property(property_id(self.request))
 
-class RoomAvailableListView(ListAPIView):
+class RoomAvailableListView(FastReadMixin, ListAPIView):
     serializer_class = RoomSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = 2
 
     def get_queryset(self):
-        return Room.objects.filter(is_available=True)
+        if self.is_date_range():
+            stay = StayRangeSerializer(data=self.request.query_params)
+            stay.is_valid(raise_exception=True)
+            return free_rooms(stay.validated_data['start'], stay.validated_data['end'], property_id(self.request))
+        return Room.objects.in_property(property_id(self.request)).filter(is_available=True)
+
+    def is_date_range(self):
+        return 'start' in self.request.query_params or 'end' in self.request.query_params
+
+    def list(self, request, *args, **kwargs):
+        # Date-range answers depend on bookings, not just rooms, so only the "free now" listing is cached.
+        if self.is_date_range():
+            return super().list(request, *args, **kwargs)
+        key, etag = available_rooms_cache_entry(request)
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        data = cache.get(key)
+        if data is None:
+            # The entry outlives this request: a lagging replica would cache rows older than its version.
+            with use_primary():
+                data = super().list(request, *args, **kwargs).data
+            cache.set(key, data, available_rooms_timeout())
+        return Response(data, headers={'ETag': etag})
+
+class RoomQuoteView(APIView):
+    """Price of a stay in the room from ``start`` to ``end``, read from the rate calendar in constant time."""
+    permission_classes = [IsAuthenticated]
+    # A stale calendar reloads the property's rates and rooms.
+    query_budget = 3
+
+    def get(self, request, pk):
+        stay = QuoteRangeSerializer(data=request.query_params)
+        stay.is_valid(raise_exception=True)
+        start, end = stay.validated_data['start'], stay.validated_data['end']
+        nights = (end - start).days
+        total = price_calendar(property_id(request)).stay_price(pk, start, nights)
+        if total is None:
+            raise Http404
+        return Response({'room': pk, 'start': start, 'end': end, 'nights': nights, 'total': f'{total:.2f}'})
@@ -0,0 +1,23 @@
+import pytest
+from django.core.cache import cache
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Keep cached listings from leaking between tests."""
+    cache.clear()
+    yield
+    cache.clear()
+
+@pytest.fixture(autouse=True)
+def strict_query_budgets(settings):
+    """Fail any request that goes over its view's query budget or repeats a query (N+1)."""
+    settings.QUERY_BUDGET_STRICT = True
+
+@pytest.fixture(autouse=True)
+def default_property(request):
+    """Recreate the migrations' default property after a transactional test has flushed it."""
+    if request.node.get_closest_marker('django_db') is None:
+        return
+    request.getfixturevalue('_django_db_helper')
+    from rooms.models import DEFAULT_PROPERTY_ID, Property
+    Property.objects.get_or_create(pk=DEFAULT_PROPERTY_ID, defaults={'code': 'main', 'name': 'Main'})
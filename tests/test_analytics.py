@@ -0,0 +1,76 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+from rest_framework_simplejwt.tokens import AccessToken
+from rooms.models import Room
+from bookings.models import Booking
+from analytics.models import DailyStat, RoomDailyStat
+from analytics.rollups import stay_nights
+from jobs.queue import run_pending
+from django.utils import timezone
+from django.core.management import call_command
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+def rollups():
+    return (
+        sorted(DailyStat.objects.values_list('day', 'nights_sold', 'revenue')),
+        sorted(RoomDailyStat.objects.values_list('day', 'room_id', 'nights_sold', 'revenue')),
+    )
+
+@pytest.mark.django_db
+def test_stay_nights_spreads_revenue():
+    now = timezone.now()
+    booking = Booking(check_in=now - timedelta(days=3, hours=1), check_out=now, full_price=Decimal('100.00'))
+    nights = list(stay_nights(booking))
+    assert [day for day, _ in nights] == [timezone.localdate(booking.check_in) + timedelta(days=i) for i in range(3)]
+    assert [revenue for _, revenue in nights] == [Decimal('33.33'), Decimal('33.33'), Decimal('33.34')]
+
+@pytest.mark.django_db
+def test_checkout_updates_rollups_and_reports():
+    """Checkouts feed the rollups incrementally, rebuild reproduces them, and reports read them."""
+    client = APIClient()
+    guest = User.objects.create_user(username='guest', email='guest@example.com', password='User1234!')
+    manager = User.objects.create_user(username='manager', email='manager@example.com', password='User1234!', is_staff=True)
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(guest)}')
+    room_a = Room.objects.create(number='101', price='100.00', is_available=False)
+    room_b = Room.objects.create(number='102', price='80.00', is_available=False)
+    check_in = timezone.now() - timedelta(days=2)
+    for room in (room_a, room_b):
+        booking = Booking.objects.create(user=guest, room=room)
+        Booking.objects.filter(pk=booking.pk).update(check_in=check_in)
+
+    assert client.post(reverse('booking-checkout'), {'room_number': '101'}, format='json').status_code == status.HTTP_200_OK
+    assert client.post(reverse('booking-batch-checkout'), {'room_numbers': ['102']}, format='json').status_code == status.HTTP_200_OK
+    # The rollups are updated by the jobs the checkouts queued.
+    assert rollups() == ([], [])
+    assert run_pending() == 2
+    first = timezone.localdate(check_in)
+    days, rooms = rollups()
+    assert days == [(first, 2, Decimal('180.00')), (first + timedelta(days=1), 2, Decimal('180.00'))]
+    assert len(rooms) == 4
+
+    call_command('rebuild_rollups', stdout=StringIO())
+    assert rollups() == (days, rooms)
+    call_command('rebuild_rollups', '--start', (first + timedelta(days=1)).isoformat(), stdout=StringIO())
+    assert rollups() == (days, rooms)
+
+    url = reverse('report-revenue')
+    params = {'start': first.isoformat(), 'end': (first + timedelta(days=3)).isoformat()}
+    assert client.get(url, params).status_code == status.HTTP_403_FORBIDDEN
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(manager)}')
+    response = client.get(url, params)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['totals'] == {'nights_sold': 4, 'revenue': '360.00', 'adr': '90.00', 'revpar': '60.00'}
+    assert [row['revenue'] for row in response.data['results']] == ['180.00', '180.00', '0.00']
+
+    response = client.get(reverse('report-occupancy'), {**params, 'group': 'room'})
+    assert response.data['results'] == [
+        {'room': room_a.pk, 'room_number': '101', 'nights_sold': 2, 'nights_available': 3, 'occupancy': '0.6667'},
+        {'room': room_b.pk, 'room_number': '102', 'nights_sold': 2, 'nights_available': 3, 'occupancy': '0.6667'},
+    ]
+    response = client.get(url, {'start': '2020-01-01', 'end': '2024-01-01'})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,105 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db.models import F
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from analytics.models import DailyStat, RoomDailyStat
+from analytics.rollups import rebuild
+from bookings.archive import archive_batch
+from bookings.models import ArchivedBooking, Booking
+from rooms.models import Room
+from tests.test_async import clients
+from tests.test_fastread import as_drf
+
+@pytest.fixture
+def stays():
+    """Five bookings for one guest: three checked out 400 days ago, one checked out yesterday and one open.
+
+    The recent checkout sits between the old ones, so hot and archived ids interleave.
+    """
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    rooms = Room.objects.bulk_create(Room(number=str(100 + i), price='100.00') for i in range(5))
+    long_ago, yesterday = timezone.now() - timedelta(days=400), timezone.now() - timedelta(days=1)
+    bookings = [
+        Booking.objects.create(user=user, room=room, status='CHECKED_OUT', check_out=check_out, full_price='200.00')
+        for room, check_out in zip(rooms, [long_ago, yesterday, long_ago, long_ago])
+    ]
+    bookings.append(Booking.objects.create(user=user, room=rooms[4]))
+    Booking.objects.filter(pk__in=[bookings[i].pk for i in (0, 2, 3)]).update(check_in=long_ago - timedelta(days=2))
+    return user, bookings
+
+@pytest.mark.django_db
+def test_archive_moves_old_checkouts_in_batches(stays):
+    user, bookings = stays
+    before = timezone.now() - timedelta(days=365)
+    check_in = Booking.objects.get(pk=bookings[0].pk).check_in
+    assert archive_batch(before, batch_size=2) == [bookings[0].pk, bookings[2].pk]
+    assert archive_batch(before, bookings[2].pk, batch_size=2) == [bookings[3].pk]
+    assert archive_batch(before, bookings[3].pk, batch_size=2) == []
+
+    assert sorted(Booking.objects.values_list('pk', flat=True)) == [bookings[1].pk, bookings[4].pk]
+    archived = ArchivedBooking.objects.get(pk=bookings[0].pk)
+    assert (archived.user_id, archived.room_id, archived.check_in, archived.status, str(archived.full_price)) == (
+        user.pk, bookings[0].room_id, check_in, 'CHECKED_OUT', '200.00',
+    )
+
+    # Ids are never handed out again, so the newest booking can be archived too.
+    Booking.objects.filter(pk=bookings[4].pk).update(status='CHECKED_OUT', check_out=before - timedelta(days=1), departure=F('arrival'))
+    assert archive_batch(before) == [bookings[4].pk]
+    assert Booking.objects.create(user=user, room_id=bookings[4].room_id).pk > bookings[4].pk
+
+@pytest.mark.django_db
+def test_reads_cover_the_archive(stays, monkeypatch):
+    user, bookings = stays
+    sync_client, async_client = clients(user)
+    list_url = reverse('booking-list-create')
+    expected = sync_client.get(list_url).json()['results']
+    detail = sync_client.get(reverse('booking-detail', args=[bookings[2].pk])).json()
+    User.objects.filter(pk=user.pk).update(is_staff=True)
+    export = b''.join(sync_client.get(reverse('booking-export', args=['ndjson'])).streaming_content)
+
+    archive_batch(timezone.now() - timedelta(days=365))
+    assert Booking.objects.count() == 2
+    assert sync_client.get(list_url).json()['results'] == expected
+    pages = [sync_client.get(list_url, {'page_size': 2}).json()]
+    while pages[-1]['next']:
+        pages.append(sync_client.get(pages[-1]['next']).json())
+    assert [booking for page in pages for booking in page['results']] == expected
+    assert async_client.get(reverse('async-booking-list-create')).json()['results'] == expected
+    assert sync_client.get(reverse('booking-detail', args=[bookings[2].pk])).json() == detail
+    assert b''.join(sync_client.get(reverse('booking-export', args=['ndjson'])).streaming_content) == export
+    # Archived bookings are never changed.
+    response = sync_client.patch(reverse('booking-detail', args=[bookings[2].pk]), {'room_number': '104'}, format='json')
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    as_drf(monkeypatch)
+    assert sync_client.get(list_url).json()['results'] == expected
+    assert sync_client.get(reverse('booking-detail', args=[bookings[2].pk])).json() == detail
+
+@pytest.mark.django_db
+def test_rollup_rebuild_includes_archived_bookings(stays):
+    def rollups():
+        return sorted(DailyStat.objects.values_list('day', 'revenue')), sorted(RoomDailyStat.objects.values_list('day', 'room_id', 'revenue'))
+
+    rebuild()
+    before = rollups()
+    archive_batch(timezone.now() - timedelta(days=365))
+    rebuild()
+    assert rollups() == before
+
+@pytest.mark.django_db
+def test_archive_command_reports_rate_and_table_size(stays):
+    out = StringIO()
+    call_command('archive_bookings', '--dry-run', stdout=out)
+    assert out.getvalue() == "3 bookings would be archived.\n"
+    out = StringIO()
+    call_command('archive_bookings', '--older-than', '365', '--batch-size', '2', stdout=out)
+    archived, table = out.getvalue().splitlines()
+    assert archived.startswith("Archived 3 bookings in ") and archived.endswith(" rows/s).")
+    assert table.startswith("Bookings table: 5 rows (") and " before, 2 rows (" in table
+    assert ArchivedBooking.objects.count() == 3
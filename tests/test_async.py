@@ -0,0 +1,89 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+from rest_framework_simplejwt.tokens import AccessToken
+from rooms.models import Room
+from bookings.models import Booking
+
+class KioskClient:
+    """AsyncClient driven from sync tests, sending the user's token with every request."""
+
+    def __init__(self, user):
+        self.client = AsyncClient()
+        self.token = f'Bearer {AccessToken.for_user(user)}'
+
+    def get(self, url, data=None, headers=None):
+        return async_to_sync(self.client.get)(url, data, headers={'Authorization': self.token, **(headers or {})})
+
+    def post(self, url, data):
+        return async_to_sync(self.client.post)(url, data, content_type='application/json', headers={'Authorization': self.token})
+
+def clients(user):
+    sync_client = APIClient()
+    sync_client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+    return sync_client, KioskClient(user)
+
+@pytest.mark.django_db
+def test_async_room_endpoints_match_sync():
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    sync_client, async_client = clients(user)
+    Room.objects.bulk_create(Room(number=str(100 + i), price='100.00', is_available=i % 2 == 0) for i in range(5))
+
+    sync_rooms = sync_client.get(reverse('room-list-create')).json()['results']
+    response = async_client.get(reverse('async-room-list'), {'page_size': 3})
+    assert response.status_code == status.HTTP_200_OK
+    page = response.json()
+    assert page['results'] == sync_rooms[:3]
+    assert async_client.get(page['next']).json()['results'] == sync_rooms[3:]
+
+    url = reverse('async-room-available-list')
+    response = async_client.get(url)
+    assert [room['number'] for room in response.json()['results']] == ['100', '102', '104']
+    assert async_client.get(url, headers={'If-None-Match': response['ETag']}).status_code == status.HTTP_304_NOT_MODIFIED
+    response = async_client.get(url, {'start': '2030-01-02', 'end': '2030-01-01'})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+@pytest.mark.django_db
+def test_async_checkin_and_checkout():
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    _, async_client = clients(user)
+    room = Room.objects.create(number='101', price='100.00')
+    url = reverse('async-booking-list-create')
+
+    response = async_client.post(url, {'room_number': '101'})
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()['status'] == 'CHECKED_IN'
+    assert Room.objects.get(pk=room.pk).is_available is False
+
+    response = async_client.post(url, {'room_number': '101'})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json() == ['Room 101 is not available.']
+    response = async_client.post(url, {})
+    assert 'room_number' in response.json()
+    assert [b['room'] for b in async_client.get(url).json()['results']] == [room.pk]
+
+    checkout = reverse('async-booking-checkout')
+    response = async_client.post(checkout, {'room_number': '101'})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['full_price'] == '100.00'
+    assert Booking.objects.get().status == 'CHECKED_OUT'
+    response = async_client.post(checkout, {'room_number': '101'})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+@pytest.mark.django_db
+def test_async_auth_and_methods(settings):
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    _, async_client = clients(user)
+    response = async_to_sync(AsyncClient().get)(reverse('async-room-list'))
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert response['WWW-Authenticate'].startswith('Bearer')
+    assert async_client.get(reverse('async-booking-checkout')).status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+    settings.JWT_STATELESS_AUTH = True
+    assert async_client.get(reverse('async-room-list')).status_code == status.HTTP_200_OK
+    User.objects.filter(pk=user.pk).update(is_active=False)
+    settings.JWT_STATELESS_AUTH = False
+    assert async_client.get(reverse('async-room-list')).status_code == status.HTTP_401_UNAUTHORIZED
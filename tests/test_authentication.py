@@ -3,8 +3,19 @@ from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 from django.contrib.auth.models import User
+from django.contrib.auth.password_validation import validate_password
 from rest_framework_simplejwt.tokens import AccessToken
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from authentication.jwt import LazyTokenUser, revoke_token
+from rooms.models import Room
+from unittest import mock
+from django.core.management import call_command
+import io
+import json
 import uuid
+import warnings
+from django.core.cache import CacheKeyWarning
 
 @pytest.mark.django_db
 def test_register_success():
@@ -29,6 +40,29 @@ def test_register_duplicate_email():
     assert 'email' in response.data
     assert response.data['email'] == "Email already exists."
 
+@pytest.mark.django_db
+def test_register_duplicate_email_ignores_case():
+    client = APIClient()
+    url = reverse('register')
+    email = f'{str(uuid.uuid4())[:10]}@example.com'
+    User.objects.create_user(username=str(uuid.uuid4())[:10], email=email, password='StrongPass1234!')
+    data = {'username': str(uuid.uuid4())[:10], 'email': email.upper(), 'password': 'StrongPass1234!'}
+    response = client.post(url, data, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data['email'] == "Email already exists."
+    assert User.objects.count() == 1
+
+@pytest.mark.django_db
+def test_register_validates_password_once():
+    client = APIClient()
+    url = reverse('register')
+    data = {'username': str(uuid.uuid4())[:10], 'email': f'{str(uuid.uuid4())[:10]}@example.com', 'password': 'password'}
+    with mock.patch('authentication.serializers.validate_password', wraps=validate_password) as validate:
+        response = client.post(url, data, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'This password is too common.' in response.data['password']
+    assert validate.call_count == 1
+
 @pytest.mark.django_db
 def test_login_success():
     client = APIClient()
@@ -52,4 +86,127 @@ def test_login_invalid_credentials():
     data = {'username': 'nonexistent', 'password': 'wrongpassword'}
     response = client.post(url, data, format='json')
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
-    assert response.data['detail'] == 'Invalid username or password.'
\ No newline at end of file
+    assert response.data['detail'] == 'Invalid username or password.'
+
+@pytest.mark.django_db
+def test_stateless_auth_skips_user_query(settings):
+    """With JWT_STATELESS_AUTH the booking list is served without loading the user."""
+    settings.JWT_STATELESS_AUTH = True
+    client = APIClient()
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+    Room.objects.create(number='101', price='100.00')
+
+    response = client.post(reverse('booking-list-create'), {'room_number': '101'}, format='json')
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data['user'] == user.id
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(reverse('booking-list-create'))
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['results'][0]['user'] == user.id
+    assert not any('FROM "auth_user"' in q['sql'] and 'JOIN' not in q['sql'] for q in ctx.captured_queries)
+
+@pytest.mark.django_db
+def test_lazy_token_user_hydrates_on_demand():
+    """Only attributes missing from the token load the user row, once."""
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    token_user = LazyTokenUser(AccessToken.for_user(user))
+    with CaptureQueriesContext(connection) as ctx:
+        assert token_user.id == user.id
+        assert token_user.is_authenticated
+    assert len(ctx.captured_queries) == 0
+    with CaptureQueriesContext(connection) as ctx:
+        assert token_user.email == 'user@example.com'
+        assert token_user.username == 'user'
+    assert len(ctx.captured_queries) == 1
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('stateless', [False, True])
+def test_revoked_tokens_rejected(settings, stateless):
+    """Revoked tokens and deactivated users are refused in both modes."""
+    settings.JWT_STATELESS_AUTH = stateless
+    client = APIClient()
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    token = AccessToken.for_user(user)
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    url = reverse('booking-list-create')
+    assert client.get(url).status_code == status.HTTP_200_OK
+
+    revoke_token(token)
+    assert client.get(url).status_code == status.HTTP_401_UNAUTHORIZED
+
+    other = User.objects.create_user(username='other', email='other@example.com', password='User1234!')
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(other)}')
+    assert client.get(url).status_code == status.HTTP_200_OK
+    other.is_active = False
+    other.save()
+    assert client.get(url).status_code == status.HTTP_401_UNAUTHORIZED
+
+@pytest.mark.django_db
+def test_login_attempt_limiter():
+    """Repeated failures lock the username out before any password is checked."""
+    client = APIClient()
+    url = reverse('login')
+    User.objects.create_user(username='user', email='user@example.com', password='StrongPass1234!')
+    for _ in range(5):
+        response = client.post(url, {'username': 'user', 'password': 'wrong'}, format='json')
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    with mock.patch('authentication.views.authenticate') as authenticate:
+        response = client.post(url, {'username': 'user', 'password': 'StrongPass1234!'}, format='json')
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert 'Retry-After' in response
+    authenticate.assert_not_called()
+
+    # Other accounts are unaffected
+    User.objects.create_user(username='other', email='other@example.com', password='StrongPass1234!')
+    response = client.post(url, {'username': 'other', 'password': 'StrongPass1234!'}, format='json')
+    assert response.status_code == status.HTTP_200_OK
+
+    # Any username makes a cache key memcached accepts.
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', CacheKeyWarning)
+        response = client.post(url, {'username': 'a name\twith spaces ' * 20, 'password': 'wrong'}, format='json')
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+@pytest.mark.django_db
+def test_login_rehashes_to_preferred_hasher(settings):
+    """Switching the hasher profile upgrades stored hashes on the next login."""
+    client = APIClient()
+    user = User.objects.create_user(username='user', email='user@example.com', password='StrongPass1234!')
+    assert user.password.startswith('pbkdf2_sha256$')
+
+    settings.PASSWORD_HASHERS = [
+        'authentication.hashers.TunedScryptPasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    ]
+    response = client.post(reverse('login'), {'username': 'user', 'password': 'StrongPass1234!'}, format='json')
+    assert response.status_code == status.HTTP_200_OK
+    user.refresh_from_db()
+    assert user.password.startswith('scrypt$')
+    response = client.post(reverse('login'), {'username': 'user', 'password': 'StrongPass1234!'}, format='json')
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('workers', ['1', '2'])
+def test_import_users_command(settings, workers):
+    settings.PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+    User.objects.create_user(username='existing', email='taken@example.com', password='StrongPass1234!')
+    rows = [
+        {'username': 'alice', 'email': 'alice@example.com', 'password': 'StrongPass1234!', 'is_staff': True},
+        {'username': 'bob', 'email': 'TAKEN@example.com', 'password': 'StrongPass1234!'},
+        {'username': 'carol', 'email': 'carol@example.com', 'password': 'password'},
+        {'username': 'existing', 'email': 'new@example.com', 'password': 'StrongPass1234!'},
+        {'username': 'dave', 'email': 'dave@example.com', 'password': 'StrongPass1234!'},
+    ]
+    stdin = io.StringIO(''.join(json.dumps(row) + '\n' for row in rows))
+    out, err = io.StringIO(), io.StringIO()
+    call_command('import_users', '-', '--format', 'jsonl', '--workers', workers, '--batch-size', '2', stdin=stdin, stdout=out, stderr=err)
+    assert '2 created, 0 updated, 2 unchanged, 1 invalid' in out.getvalue()
+    assert 'This password is too common.' in err.getvalue()
+    alice = User.objects.get(username='alice')
+    assert alice.is_staff and alice.check_password('StrongPass1234!')
+    assert User.objects.get(username='dave').check_password('StrongPass1234!')
+    assert not User.objects.filter(username__in=['bob', 'carol']).exists()
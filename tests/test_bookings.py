@@ -4,11 +4,21 @@ from rest_framework import status
 from rest_framework.test import APIClient
 from django.contrib.auth.models import User
 from rest_framework_simplejwt.tokens import AccessToken
-from rooms.models import Room
+from rooms.models import DEFAULT_PROPERTY_ID, Room
 from bookings.models import Booking
 from django.utils import timezone
-from datetime import timedelta
+from datetime import date, timedelta
+from decimal import Decimal
 from bookings.exceptions import InvalidDateRangeError, PastDateError, RoomNotAvailableError
+from bookings.availability import free_rooms
+from rates.calendar import price_calendar
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from io import StringIO
+from django.core.management import call_command
+import threading
 
 @pytest.mark.django_db
 def test_checkin_view():
@@ -30,7 +40,10 @@ def test_checkin_view():
 
     response = client.get(url)
     assert response.status_code == status.HTTP_200_OK
-    assert response.data[0]['room'] == room.id
+    assert response.data['results'][0]['room'] == room.id
+
+    response = client.get(url, {'fields': 'room,status'})
+    assert response.data['results'][0] == {'room': room.id, 'status': 'CHECKED_IN'}
 
 @pytest.mark.django_db
 def test_booking_detail():
@@ -118,4 +131,389 @@ def test_checkout_no_active_booking():
     data = {"room_number": "101"}
     response = client.post(url, data, format='json')
     assert response.status_code == status.HTTP_404_NOT_FOUND
-    assert response.data['detail'] == 'Booking not found.'
\ No newline at end of file
+    assert response.data['detail'] == 'Booking not found.'
+
+@pytest.mark.django_db
+def test_checkin_query_count():
+    """Check-in looks the room up once and claims it with a single UPDATE."""
+    client = APIClient()
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    access_token = str(AccessToken.for_user(user))
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {access_token}')
+    Room.objects.create(number='101', price='100.00')
+
+    url = reverse('booking-list-create')
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.post(url, {"room_number": "101"}, format='json')
+    assert response.status_code == status.HTTP_201_CREATED
+    statements = [q['sql'] for q in ctx.captured_queries if not q['sql'].startswith(('SAVEPOINT', 'RELEASE'))]
+    # auth user, room lookup, conditional claim, overlap check, booking insert
+    assert len(statements) == 5
+    assert sum('FROM "rooms_room"' in sql for sql in statements) == 1
+
+@pytest.mark.django_db
+def test_checkin_lost_race_returns_conflict():
+    """A room taken between validation and claim yields 409."""
+    client = APIClient()
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    access_token = str(AccessToken.for_user(user))
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {access_token}')
+    room = Room.objects.create(number='101', price='100.00')
+
+    original_claim = Room.objects.claim
+    def claim_after_rival(pk):
+        original_claim(pk)  # a concurrent request wins first
+        return original_claim(pk)
+
+    url = reverse('booking-list-create')
+    with mock.patch.object(Room.objects, 'claim', side_effect=claim_after_rival):
+        response = client.post(url, {"room_number": "101"}, format='json')
+    assert response.status_code == status.HTTP_409_CONFLICT
+    assert Booking.objects.filter(room=room).count() == 0
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_checkin_single_winner():
+    """Many threads checking in to one room produce exactly one booking."""
+    if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+        pytest.skip("Shared-cache in-memory SQLite rejects concurrent writers with table locks; DB_ENGINE=sqlite tests use a file.")
+    room = Room.objects.create(number='101', price='100.00')
+    users = [User.objects.create(username=f'guest{i}', email=f'guest{i}@example.com') for i in range(16)]
+    url = reverse('booking-list-create')
+    barrier = threading.Barrier(len(users))
+
+    def attempt(user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        barrier.wait()
+        try:
+            return client.post(url, {"room_number": "101"}, format='json').status_code
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=len(users)) as pool:
+        codes = list(pool.map(attempt, users))
+
+    assert codes.count(status.HTTP_201_CREATED) == 1
+    assert set(codes) <= {status.HTTP_201_CREATED, status.HTTP_400_BAD_REQUEST, status.HTTP_409_CONFLICT}
+    assert Booking.objects.filter(room=room).count() == 1
+    assert Room.objects.get(id=room.id).is_available is False
+
+
+@pytest.mark.django_db
+def test_reservation_create_and_conflict():
+    """Future reservations are accepted unless they overlap another stay on the room."""
+    client = APIClient()
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    access_token = str(AccessToken.for_user(user))
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {access_token}')
+    room = Room.objects.create(number='101', price='100.00')
+    today = timezone.localdate()
+
+    url = reverse('reservation-list-create')
+    data = {"room_number": "101", "arrival": (today + timedelta(days=10)).isoformat(), "departure": (today + timedelta(days=13)).isoformat()}
+    response = client.post(url, data, format='json')
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data['status'] == 'RESERVED'
+    assert Room.objects.get(id=room.id).is_available is True
+
+    # Overlaps the last night of the first reservation
+    data = {"room_number": "101", "arrival": (today + timedelta(days=12)).isoformat(), "departure": (today + timedelta(days=14)).isoformat()}
+    response = client.post(url, data, format='json')
+    assert response.status_code == status.HTTP_409_CONFLICT
+
+    # Back-to-back stays share no night
+    data = {"room_number": "101", "arrival": (today + timedelta(days=13)).isoformat(), "departure": (today + timedelta(days=14)).isoformat()}
+    response = client.post(url, data, format='json')
+    assert response.status_code == status.HTTP_201_CREATED
+
+    response = client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data['results']) == 2
+
+@pytest.mark.django_db
+def test_reservation_invalid_range():
+    """Reservations must end after they start and not start in the past."""
+    client = APIClient()
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    access_token = str(AccessToken.for_user(user))
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {access_token}')
+    Room.objects.create(number='101', price='100.00')
+    today = timezone.localdate()
+
+    url = reverse('reservation-list-create')
+    data = {"room_number": "101", "arrival": (today + timedelta(days=3)).isoformat(), "departure": (today + timedelta(days=3)).isoformat()}
+    response = client.post(url, data, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    data = {"room_number": "101", "arrival": (today - timedelta(days=1)).isoformat(), "departure": (today + timedelta(days=1)).isoformat()}
+    response = client.post(url, data, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+@pytest.mark.django_db
+def test_checkin_blocked_by_other_reservation():
+    """An open-ended walk-in cannot take a room someone else has reserved."""
+    client = APIClient()
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    other = User.objects.create(username='other', email='other@example.com')
+    access_token = str(AccessToken.for_user(user))
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {access_token}')
+    room = Room.objects.create(number='101', price='100.00')
+    today = timezone.localdate()
+    Booking.objects.create(user=other, room=room, status='RESERVED', arrival=today + timedelta(days=5), departure=today + timedelta(days=7))
+
+    url = reverse('booking-list-create')
+    response = client.post(url, {"room_number": "101"}, format='json')
+    assert response.status_code == status.HTTP_409_CONFLICT
+    assert Room.objects.get(id=room.id).is_available is True
+
+    # A stay that ends before the reservation starts is fine
+    check_out = timezone.now() + timedelta(days=2)
+    response = client.post(url, {"room_number": "101", "check_out": check_out.isoformat()}, format='json')
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data['departure'] == (today + timedelta(days=2)).isoformat()
+
+@pytest.mark.django_db
+def test_checkin_promotes_own_reservation():
+    """Checking in on your own reservation turns it into the stay."""
+    client = APIClient()
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    access_token = str(AccessToken.for_user(user))
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {access_token}')
+    room = Room.objects.create(number='101', price='100.00')
+    today = timezone.localdate()
+    reservation = Booking.objects.create(user=user, room=room, status='RESERVED', arrival=today, departure=today + timedelta(days=3))
+
+    response = client.post(reverse('booking-list-create'), {"room_number": "101"}, format='json')
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data['id'] == reservation.id
+    assert response.data['status'] == 'CHECKED_IN'
+    assert response.data['departure'] == (today + timedelta(days=3)).isoformat()
+    assert Booking.objects.count() == 1
+
+@pytest.mark.django_db
+def test_free_rooms_between_dates():
+    """free_rooms answers date-range availability in a single query."""
+    user = User.objects.create(username='user', email='user@example.com')
+    rooms = [Room.objects.create(number=str(100 + i), price='100.00') for i in range(4)]
+    d = date(2030, 1, 10)
+    Booking.objects.create(user=user, room=rooms[0], status='RESERVED', arrival=d, departure=d + timedelta(days=3))
+    Booking.objects.create(user=user, room=rooms[1], status='RESERVED', arrival=d - timedelta(days=5), departure=d)
+    Booking.objects.create(user=user, room=rooms[2], status='CHECKED_IN', arrival=d - timedelta(days=1))
+
+    with CaptureQueriesContext(connection) as ctx:
+        free = set(free_rooms(d, d + timedelta(days=2), DEFAULT_PROPERTY_ID).values_list('number', flat=True))
+    assert len(ctx.captured_queries) == 1
+    assert free == {'101', '103'}
+
+@pytest.mark.django_db
+def test_room_available_list_date_range():
+    """The available-rooms listing accepts a start/end stay range."""
+    client = APIClient()
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    access_token = str(AccessToken.for_user(user))
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {access_token}')
+    room = Room.objects.create(number='101', price='100.00')
+    Room.objects.create(number='102', price='150.00')
+    Booking.objects.create(user=user, room=room, status='RESERVED', arrival=date(2030, 1, 10), departure=date(2030, 1, 12))
+
+    url = reverse('room-available-list')
+    response = client.get(url, {'start': '2030-01-11', 'end': '2030-01-15'})
+    assert response.status_code == status.HTTP_200_OK
+    assert [r['number'] for r in response.data['results']] == ['102']
+    response = client.get(url, {'start': '2030-01-15', 'end': '2030-01-11'})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+@pytest.mark.django_db
+def test_batch_checkin_and_checkout():
+    """Group arrivals and departures are handled in one request each."""
+    client = APIClient()
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    access_token = str(AccessToken.for_user(user))
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {access_token}')
+    Room.objects.bulk_create(Room(number=str(100 + i), price='100.00') for i in range(5))
+    numbers = ['103', '100', '101']
+
+    response = client.post(reverse('booking-batch-checkin'), {"room_numbers": numbers}, format='json')
+    assert response.status_code == status.HTTP_201_CREATED
+    assert [b['status'] for b in response.data] == ['CHECKED_IN'] * 3
+    assert set(Room.objects.filter(is_available=False).values_list('number', flat=True)) == set(numbers)
+
+    response = client.post(reverse('booking-batch-checkout'), {"room_numbers": numbers}, format='json')
+    assert response.status_code == status.HTTP_200_OK
+    assert [b['status'] for b in response.data] == ['CHECKED_OUT'] * 3
+    assert [b['full_price'] for b in response.data] == ['100.00'] * 3
+    assert not Room.objects.filter(is_available=False).exists()
+
+@pytest.mark.django_db
+def test_batch_checkin_reports_per_item_errors():
+    """One bad room rejects the whole batch and names the offending items."""
+    client = APIClient()
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    access_token = str(AccessToken.for_user(user))
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {access_token}')
+    Room.objects.create(number='101', price='100.00')
+    Room.objects.create(number='102', price='100.00', is_available=False)
+
+    response = client.post(reverse('booking-batch-checkin'), {"room_numbers": ['101', '102', '999']}, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert set(response.data['room_numbers']) == {'102', '999'}
+    assert Booking.objects.count() == 0
+    assert Room.objects.get(number='101').is_available is True
+
+    response = client.post(reverse('booking-batch-checkout'), {"room_numbers": ['101']}, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data['room_numbers']['101'] == 'Booking not found.'
+
+@pytest.mark.django_db
+def test_batch_query_count_is_constant():
+    """Batch size does not change the number of queries."""
+    client = APIClient()
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    access_token = str(AccessToken.for_user(user))
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {access_token}')
+    Room.objects.bulk_create(Room(number=str(100 + i), price='100.00') for i in range(40))
+    # The first checkout would otherwise also load the property's rates.
+    price_calendar(DEFAULT_PROPERTY_ID)
+
+    counts = {}
+    for size, offset in ((3, 0), (30, 10)):
+        numbers = [str(100 + offset + i) for i in range(size)]
+        with CaptureQueriesContext(connection) as checkin:
+            client.post(reverse('booking-batch-checkin'), {"room_numbers": numbers}, format='json')
+        with CaptureQueriesContext(connection) as checkout:
+            client.post(reverse('booking-batch-checkout'), {"room_numbers": numbers}, format='json')
+        counts[size] = (len(checkin.captured_queries), len(checkout.captured_queries))
+    assert counts[3] == counts[30]
+
+
+@pytest.mark.django_db
+def test_checkout_prices_in_sql():
+    """Checkout is one UPDATE ... RETURNING plus the room release, and charges every night."""
+    client = APIClient()
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    access_token = str(AccessToken.for_user(user))
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {access_token}')
+    room = Room.objects.create(number='101', price='120.50', is_available=False)
+    booking = Booking.objects.create(user=user, room=room)
+    Booking.objects.filter(pk=booking.pk).update(check_in=timezone.now() - timedelta(days=3, hours=2))
+    # Without rates a current calendar adds no query.
+    price_calendar(DEFAULT_PROPERTY_ID)
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.post(reverse('booking-checkout'), {"room_number": "101"}, format='json')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['full_price'] == '361.50'
+    assert response.data['departure'] == timezone.localdate().isoformat()
+    statements = [q['sql'] for q in ctx.captured_queries if not q['sql'].startswith(('SAVEPOINT', 'RELEASE'))]
+    # auth user, settle with RETURNING, room release, the queued rollup job
+    assert len(statements) == 4
+    booking.refresh_from_db()
+    assert booking.status == 'CHECKED_OUT'
+    assert booking.full_price == Decimal('361.50')
+    assert Room.objects.get(id=room.id).is_available is True
+
+@pytest.mark.django_db
+def test_settle_matches_python_nights():
+    """StayNights agrees with (check_out - check_in).days or 1."""
+    user = User.objects.create(username='user', email='user@example.com')
+    room = Room.objects.create(number='101', price='100.00', is_available=False)
+    now = timezone.now()
+    for offset in (timedelta(hours=5), timedelta(days=1), timedelta(days=1, seconds=-1), timedelta(days=6, hours=23)):
+        booking = Booking.objects.create(user=user, room=room)
+        Booking.objects.filter(pk=booking.pk).update(check_in=now - offset)
+        assert Booking.objects.filter(pk=booking.pk).settle(now) == 1
+        booking.refresh_from_db()
+        assert booking.full_price == Decimal(room.price) * ((now - booking.check_in).days or 1)
+
+@pytest.mark.django_db
+def test_settle_overdue_command():
+    """The night audit settles overdue stays in batches and frees their rooms."""
+    user = User.objects.create(username='user', email='user@example.com')
+    today = timezone.localdate()
+    rooms = [Room.objects.create(number=str(100 + i), price='100.00', is_available=False) for i in range(4)]
+    for room in rooms[:3]:
+        Booking.objects.create(user=user, room=room, departure=today - timedelta(days=1))
+    Booking.objects.create(user=user, room=rooms[3])  # open-ended, not overdue
+
+    out = StringIO()
+    call_command('settle_overdue', '--dry-run', stdout=out)
+    assert out.getvalue().startswith('3 stays')
+    out = StringIO()
+    call_command('settle_overdue', '--batch-size', '2', stdout=out)
+    assert 'Settled 3 stays' in out.getvalue()
+    assert Booking.objects.filter(status='CHECKED_OUT', full_price=Decimal('100.00')).count() == 3
+    assert list(Room.objects.filter(is_available=False).values_list('number', flat=True)) == ['103']
+
+@pytest.mark.django_db
+def test_overstay_ends_where_the_next_stay_begins():
+    """Checking out an overstay never extends it into the room's next reservation."""
+    client = APIClient()
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+    guest = User.objects.create(username='guest', email='guest@example.com')
+    today = timezone.localdate()
+    rooms = [Room.objects.create(number=str(100 + i), price='100.00', is_available=False) for i in range(2)]
+    for room in rooms:
+        stay = Booking.objects.create(user=user, room=room, arrival=today - timedelta(days=3), departure=today - timedelta(days=2))
+        Booking.objects.filter(pk=stay.pk).update(check_in=timezone.now() - timedelta(days=3))
+        Booking.objects.create(
+            user=guest, room=room, status='RESERVED', arrival=today - timedelta(days=1), departure=today + timedelta(days=2),
+        )
+
+    response = client.post(reverse('booking-checkout'), {'room_number': '100'}, format='json')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['departure'] == (today - timedelta(days=1)).isoformat()
+    # Every night stayed is still charged.
+    assert response.data['full_price'] == '300.00'
+    call_command('settle_overdue', stdout=StringIO())
+    for room in rooms:
+        stay, reservation = Booking.objects.filter(room=room).order_by('arrival')
+        assert stay.status == 'CHECKED_OUT'
+        assert stay.departure == reservation.arrival
+        assert not Booking.objects.filter(room=room).exclude(pk=stay.pk).overlapping(stay.arrival, stay.departure).exists()
+
+@pytest.mark.django_db
+def test_booking_export():
+    """The export streams the same values as BookingSerializer, filtered by check-in/check-out day."""
+    from bookings.serializers import BookingSerializer
+    import csv
+    import json
+    client = APIClient()
+    staff = User.objects.create_user(username='finance', email='finance@example.com', password='User1234!', is_staff=True)
+    guest = User.objects.create_user(username='guest', email='guest@example.com', password='User1234!')
+    room = Room.objects.create(number='101', price='100.00', is_available=True)
+    now = timezone.now()
+    old = Booking.objects.create(
+        user=guest, room=room, status='CHECKED_OUT', check_out=now - timedelta(days=8), full_price='200.00',
+        arrival=timezone.localdate(now - timedelta(days=10)), departure=timezone.localdate(now - timedelta(days=8)),
+    )
+    Booking.objects.filter(pk=old.pk).update(check_in=now - timedelta(days=10))
+    current = Booking.objects.create(user=guest, room=room)
+    url = reverse('booking-export', kwargs={'fmt': 'ndjson'})
+
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(guest)}')
+    assert client.get(url).status_code == status.HTTP_403_FORBIDDEN
+
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(staff)}')
+    response = client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.streaming
+    rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+    assert [row['id'] for row in rows] == [old.pk, current.pk]
+    for row, booking in zip(rows, Booking.objects.order_by('pk')):
+        assert row.pop('room_number') == '101'
+        assert row == json.loads(json.dumps(BookingSerializer(booking).data))
+
+    yesterday = (now - timedelta(days=1)).date().isoformat()
+    response = client.get(reverse('booking-export', kwargs={'fmt': 'csv'}), {'check_in_from': yesterday}, HTTP_ACCEPT='text/csv')
+    assert response['Content-Type'].startswith('text/csv')
+    lines = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+    assert lines[0][:2] == ['id', 'user'] and [line[0] for line in lines[1:]] == [str(current.pk)]
+
+    response = client.get(url, {'check_out_from': yesterday, 'check_out_to': (now - timedelta(days=2)).date().isoformat()})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert client.get(reverse('booking-export', kwargs={'fmt': 'xml'})).status_code == status.HTTP_404_NOT_FOUND
+
+    out, err = StringIO(), StringIO()
+    call_command('export_bookings', '--format', 'csv', '--check-out-to', yesterday, stdout=out, stderr=err)
+    assert [line.split(',')[0] for line in out.getvalue().splitlines()] == ['id', str(old.pk)]
+    assert 'Exported 1 bookings' in err.getvalue()
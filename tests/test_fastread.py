@@ -0,0 +1,88 @@
+import datetime
+import decimal
+
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.renderers import JSONRenderer
+from bookings.models import Booking
+from bookings.serializers import BookingSerializer
+from pmsapi import renderers
+from pmsapi.fastread import FastReadMixin, RowEncoder
+from pmsapi.renderers import FastJSONRenderer
+from rooms.models import Room
+from tests.test_async import clients
+
+def as_drf(monkeypatch):
+    """Serve reads through the serializers and the standard JSON encoder, as before the fast path."""
+    monkeypatch.setattr(FastReadMixin, 'get_row_encoder', lambda view: None)
+    monkeypatch.setattr(RowEncoder, 'for_serializer', classmethod(lambda cls, serializer: None))
+    monkeypatch.setattr(renderers, 'orjson', None)
+
+@pytest.mark.django_db
+def test_fast_reads_are_byte_identical(monkeypatch, settings):
+    settings.TIME_ZONE = 'Europe/Berlin'  # Datetimes are converted to the current time zone.
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    sync_client, async_client = clients(user)
+    rooms = Room.objects.bulk_create([
+        Room(number='101', price='100.00'),
+        Room(number='ü "\\\x01', price='0.10', is_available=False),
+        Room(number='103', price='99999999.99'),
+    ])
+    at = timezone.make_aware(datetime.datetime(2031, 3, 30, 23, 59, 59, 123456), datetime.timezone.utc)
+    booking = Booking.objects.create(user=user, room=rooms[1], check_out=at)
+    Booking.objects.create(user=user, room=rooms[2], status='CHECKED_OUT', full_price='12.50')
+
+    requests = [
+        (sync_client, reverse('room-list-create'), {}),
+        (sync_client, reverse('room-list-create'), {'page_size': 2}),
+        (sync_client, reverse('room-list-create'), {'fields': 'number,price'}),
+        (sync_client, reverse('room-detail', args=[rooms[1].pk]), {}),
+        (sync_client, reverse('room-detail', args=[999]), {}),
+        (sync_client, reverse('room-available-list'), {'start': '2031-01-01', 'end': '2031-01-03'}),
+        (sync_client, reverse('booking-list-create'), {}),
+        (sync_client, reverse('booking-list-create'), {'fields': 'id,check_in,check_out,status'}),
+        (sync_client, reverse('booking-detail', args=[booking.pk]), {}),
+        (async_client, reverse('async-room-list'), {'page_size': 2}),
+        (async_client, reverse('async-booking-list-create'), {}),
+    ]
+    fast = [client.get(url, params) for client, url, params in requests]
+    assert [response.status_code for response in fast].count(status.HTTP_200_OK) == len(requests) - 1
+    as_drf(monkeypatch)
+    for (client, url, params), response in zip(requests, fast):
+        assert client.get(url, params).content == response.content, url
+
+def test_fast_renderer_falls_back_to_json_renderer():
+    for data in (
+        {'detail': serializers.ErrorDetail('Not found.', code='not_found')},
+        {'big': 2 ** 70, 'price': decimal.Decimal('1.50'), 'line': 'a\u2028b'},
+        [{'at': datetime.date(2031, 1, 1)}],
+        None,
+    ):
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+    assert FastJSONRenderer().render({'a': 1}, 'application/json; indent=2') == JSONRenderer().render({'a': 1}, 'application/json; indent=2')
+
+def test_serializers_the_encoder_cannot_reproduce_get_none():
+    class WithMethodField(BookingSerializer):
+        nights = serializers.SerializerMethodField()
+
+        class Meta(BookingSerializer.Meta):
+            fields = (*BookingSerializer.Meta.fields, 'nights')
+
+        def get_nights(self, booking):
+            return 1
+
+    class Dotted(serializers.ModelSerializer):
+        room_number = serializers.CharField(source='room.number')
+
+        class Meta:
+            model = Booking
+            fields = ('id', 'room_number')
+
+    assert RowEncoder.for_serializer(BookingSerializer()).columns == [
+        'id', 'user_id', 'room_id', 'check_in', 'check_out', 'arrival', 'departure', 'status', 'full_price',
+    ]
+    assert RowEncoder.for_serializer(WithMethodField()) is None
+    assert RowEncoder.for_serializer(Dotted()) is None
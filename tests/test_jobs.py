@@ -0,0 +1,123 @@
+import time
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from analytics.models import DailyStat
+from bookings.models import Booking
+from jobs.models import Job
+from jobs.queue import _handlers, claim, enqueue, run, run_pending
+from rooms.models import Room
+
+def register(monkeypatch, event, handler):
+    """Add ``handler`` to the handlers of ``event`` for one test."""
+    monkeypatch.setitem(_handlers, event, {**_handlers.get(event, {}), f'tests.{handler.__name__}': handler})
+
+@pytest.fixture
+def stay():
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+    room = Room.objects.create(number='101', price='100.00', is_available=False)
+    booking = Booking.objects.create(user=user, room=room)
+    Booking.objects.filter(pk=booking.pk).update(check_in=timezone.now() - timedelta(days=2))
+    return client, booking
+
+@pytest.mark.django_db
+def test_jobs_commit_with_the_change_that_queued_them(monkeypatch):
+    register(monkeypatch, 'test.event', lambda payload: None)
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():
+            enqueue('test.event', {'n': 1})
+            raise RuntimeError
+    assert not Job.objects.exists()
+    assert enqueue('test.unhandled', {}) == []
+
+    [job] = enqueue('test.event', {'n': 2})
+    assert (job.event, job.handler, job.payload, job.status) == ('test.event', 'tests.<lambda>', {'n': 2}, Job.PENDING)
+
+@pytest.mark.django_db
+def test_slow_jobs_do_not_delay_checkout(stay, monkeypatch):
+    client, booking = stay
+    ran = []
+
+    def slow(payload):
+        time.sleep(1)
+        ran.append(payload)
+    register(monkeypatch, 'booking.checked_out', slow)
+
+    start = time.perf_counter()
+    response = client.post(reverse('booking-checkout'), {'room_number': '101'}, format='json')
+    elapsed = time.perf_counter() - start
+    assert response.status_code == status.HTTP_200_OK
+    assert elapsed < 0.5
+    assert ran == [] and Job.objects.count() == 2
+
+    assert run_pending() == 2
+    assert ran == [{'bookings': [booking.pk]}]
+    assert DailyStat.objects.exists()
+    assert not Job.objects.exists()
+
+@pytest.mark.django_db
+def test_failed_jobs_are_retried_with_backoff(monkeypatch, settings):
+    settings.JOBS_MAX_ATTEMPTS = 3
+    settings.JOBS_RETRY_DELAY = 10
+
+    def broken(payload):
+        Room.objects.create(number='999', price='1.00')
+        raise ValueError("no such rate")
+    register(monkeypatch, 'test.event', broken)
+    [job] = enqueue('test.event', {})
+
+    delays = []
+    for attempt in (1, 2, 3):
+        start = timezone.now()
+        assert run_pending() == 1
+        job.refresh_from_db()
+        assert job.attempts == attempt and not job.locked_by
+        assert 'no such rate' in job.last_error
+        delays.append(round((job.run_at - start).total_seconds()))
+        # Not due again until the delay has passed.
+        assert run_pending() == 0
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+    assert delays == [10, 20, 40]
+    assert job.status == Job.FAILED
+    assert run_pending() == 0
+    # Each failed run's writes were rolled back.
+    assert not Room.objects.filter(number='999').exists()
+
+@pytest.mark.django_db
+def test_a_job_is_leased_to_one_worker(monkeypatch):
+    register(monkeypatch, 'test.event', lambda payload: Room.objects.create(number=payload['room'], price='1.00'))
+    enqueue('test.event', {'room': '201'})
+
+    first = claim('first')
+    assert first.locked_by == 'first' and first.attempts == 1
+    assert claim('second') is None
+
+    # The first worker stalls past its lease and the job goes to another worker.
+    Job.objects.filter(pk=first.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+    second = claim('second')
+    assert second.pk == first.pk and second.attempts == 2
+    assert run(first) is False
+    assert not Room.objects.filter(number='201').exists()
+    assert run(second) is True
+    assert Room.objects.filter(number='201').count() == 1
+    assert not Job.objects.exists()
+
+@pytest.mark.django_db
+def test_run_workers_once_drains_due_jobs(stay):
+    client, booking = stay
+    client.post(reverse('booking-checkout'), {'room_number': '101'}, format='json')
+    out = StringIO()
+    call_command('run_workers', '--once', stdout=out)
+    assert out.getvalue() == "Ran 1 jobs.\n"
+    assert DailyStat.objects.exists() and not Job.objects.exists()
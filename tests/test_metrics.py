@@ -0,0 +1,83 @@
+import logging
+import re
+
+import pytest
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from pmsapi import metrics
+from rooms.models import Room
+from test_async import KioskClient
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    for histogram in metrics.HISTOGRAMS:
+        histogram.clear()
+
+def auth_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+    return client
+
+def sample(body, name, view):
+    return float(re.search(rf'^{name}{{view="{view}"}} (\S+)$', body, re.M).group(1))
+
+@pytest.mark.django_db
+def test_request_metrics_are_recorded_per_view():
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    client = auth_client(user)
+    Room.objects.bulk_create(Room(number=str(100 + i), price='100.00') for i in range(3))
+
+    response = client.get(reverse('room-list-create'))
+    assert response.status_code == status.HTTP_200_OK
+    timing = response['Server-Timing']
+    assert re.fullmatch(r'total;dur=[\d.]+, db;dur=[\d.]+;desc="2 queries", serialize;dur=[\d.]+', timing)
+    client.get(reverse('room-list-create'))
+    client.get('/api/nowhere/')
+
+    response = client.get(reverse('metrics'))
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    assert 'Server-Timing' not in response
+    body = response.content.decode()
+    assert sample(body, 'pms_request_duration_seconds_count', 'room-list-create') == 2
+    assert sample(body, 'pms_request_db_queries_sum', 'room-list-create') == 4
+    assert sample(body, 'pms_request_serializer_duration_seconds_sum', 'room-list-create') > 0
+    assert sample(body, 'pms_response_size_bytes_count', 'room-list-create') == 2
+    assert 'pms_request_db_queries_bucket{view="room-list-create",le="2"} 2' in body
+    assert sample(body, 'pms_request_duration_seconds_count', 'unmatched') == 1
+    assert 'view="metrics"' not in body
+
+@pytest.mark.django_db
+def test_async_view_queries_are_counted():
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    Room.objects.create(number='101', price='100.00')
+
+    response = KioskClient(user).get(reverse('async-room-list'))
+    assert response.status_code == status.HTTP_200_OK
+    assert 'desc="2 queries"' in response['Server-Timing']
+
+@pytest.mark.django_db
+def test_slow_request_log_includes_sql(caplog):
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    with override_settings(METRICS_SLOW_REQUEST_MS=0):
+        with caplog.at_level(logging.WARNING, logger='pmsapi.metrics'):
+            auth_client(user).get(reverse('room-list-create'))
+    assert not caplog.records
+
+    with override_settings(METRICS_SLOW_REQUEST_MS=1e-9):
+        with caplog.at_level(logging.WARNING, logger='pmsapi.metrics'):
+            auth_client(user).get(reverse('room-list-create'))
+    [record] = caplog.records
+    message = record.getMessage()
+    assert 'Slow request: GET /api/rooms/ (room-list-create)' in message
+    assert 'FROM "rooms_room"' in message
+
+@pytest.mark.django_db
+def test_metrics_token():
+    with override_settings(METRICS_TOKEN='s3cret'):
+        client = APIClient()
+        assert client.get(reverse('metrics')).status_code == status.HTTP_403_FORBIDDEN
+        assert client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer s3cret').status_code == status.HTTP_200_OK
@@ -0,0 +1,160 @@
+import datetime
+import logging
+from importlib import import_module
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from bookings.archive import archive_batch
+from bookings.models import Booking
+from pmsapi import metrics
+from pmsapi.querybudget import QueryBudgetExceeded, budget_for, check, counted
+from rates.calendar import invalidate_rates
+from rates.models import Rate, RoomType
+from rooms.models import DEFAULT_PROPERTY_ID, Property, Room
+from rooms.views import RoomListCreateView
+
+ROUTE_MODULES = ('rooms.urls', 'bookings.urls', 'authentication.urls', 'rates.urls')
+
+def auth_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+    return client
+
+def spend(client, method, url, data=None, expected=status.HTTP_200_OK):
+    """Issue the request and check it used exactly its view's budget (so budgets cannot silently go stale)."""
+    with CaptureQueriesContext(connection) as ctx:
+        response = getattr(client, method.lower())(url, data, format='json')
+    assert response.status_code == expected, response.content
+    used = len(counted(query['sql'] for query in ctx.captured_queries))
+    assert used == budget_for(resolve(url).func, method), f'{method} {url} used {used} queries'
+    return response
+
+def test_every_route_declares_a_budget():
+    for module in ROUTE_MODULES:
+        for pattern in import_module(module).urlpatterns:
+            view = pattern.callback.view_class
+            for method in view.http_method_names:
+                if method in ('head', 'options') or not hasattr(view, method):
+                    continue
+                assert budget_for(pattern.callback, method.upper()) is not None, f'{pattern.name} {method.upper()}'
+
+# Budgets are checked with real commits, so the room events published on commit are counted.
+@pytest.mark.django_db(transaction=True)
+def test_room_route_budgets():
+    client = auth_client(User.objects.create_user(username='user', email='user@example.com', password='User1234!'))
+    rooms = Room.objects.bulk_create(Room(number=str(100 + i), price='100.00') for i in range(3))
+    Booking.objects.create(user=User.objects.get(), room=rooms[2], status='CHECKED_OUT')
+
+    spend(client, 'GET', reverse('room-list-create'))
+    spend(client, 'POST', reverse('room-list-create'), {'number': '200', 'price': '50.00', 'is_available': True}, status.HTTP_201_CREATED)
+    detail = reverse('room-detail', args=[rooms[0].pk])
+    spend(client, 'GET', detail)
+    spend(client, 'PUT', detail, {'number': '100', 'price': '60.00', 'is_available': True})
+    spend(client, 'PATCH', detail, {'number': '100', 'price': '70.00'})
+    spend(client, 'DELETE', reverse('room-detail', args=[rooms[2].pk]), expected=status.HTTP_204_NO_CONTENT)
+    spend(client, 'GET', reverse('room-available-list'))
+    spend(client, 'GET', reverse('room-available-list'), {'start': '2031-01-01', 'end': '2031-01-03'})
+    spend(client, 'GET', reverse('room-quote', args=[rooms[0].pk]), {'start': '2031-01-01', 'end': '2031-12-31'})
+
+@pytest.mark.django_db(transaction=True)
+def test_booking_route_budgets():
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!', is_staff=True)
+    client = auth_client(user)
+    Room.objects.bulk_create(Room(number=str(100 + i), price='100.00') for i in range(6))
+    # Checkouts are budgeted for a stale rate calendar that changes the price.
+    Rate.objects.create(name='Winter', price='90.00')
+
+    booking = spend(client, 'POST', reverse('booking-list-create'), {'room_number': '100'}, status.HTTP_201_CREATED).json()
+    spend(client, 'GET', reverse('booking-list-create'))
+    detail = reverse('booking-detail', args=[booking['id']])
+    spend(client, 'PUT', detail, {'room_number': '101'})
+    spend(client, 'PATCH', detail, {'room_number': '102'})
+    spend(client, 'POST', reverse('booking-checkout'), {'room_number': '102'})
+
+    arrival = timezone.localdate().isoformat()
+    departure = (timezone.localdate() + datetime.timedelta(days=2)).isoformat()
+    spend(client, 'POST', reverse('reservation-list-create'), {'room_number': '103', 'arrival': arrival, 'departure': departure}, status.HTTP_201_CREATED)
+    spend(client, 'GET', reverse('reservation-list-create'))
+    # One room is checked in on the guest's reservation and one gets a new booking.
+    spend(client, 'POST', reverse('booking-batch-checkin'), {'room_numbers': ['103', '104']}, status.HTTP_201_CREATED)
+    invalidate_rates(DEFAULT_PROPERTY_ID)
+    spend(client, 'POST', reverse('booking-batch-checkout'), {'room_numbers': ['103', '104']})
+
+    booking = spend(client, 'POST', reverse('booking-list-create'), {'room_number': '105'}, status.HTTP_201_CREATED).json()
+    spend(client, 'DELETE', reverse('booking-detail', args=[booking['id']]), expected=status.HTTP_204_NO_CONTENT)
+    spend(client, 'GET', reverse('booking-export', args=['csv']))
+    # Reading an archived booking misses the bookings table first.
+    archive_batch(timezone.now() + datetime.timedelta(days=1))
+    spend(client, 'GET', detail)
+
+@pytest.mark.django_db(transaction=True)
+def test_rate_route_budgets():
+    client = auth_client(User.objects.create_user(username='admin', email='admin@example.com', password='Admin1234!', is_staff=True))
+
+    room_type = spend(client, 'POST', reverse('room-type-list-create'), {'code': 'suite', 'name': 'Suite'}, status.HTTP_201_CREATED).json()
+    spend(client, 'GET', reverse('room-type-list-create'))
+    data = {'name': 'Summer', 'room_type': room_type['id'], 'start': '2031-06-01', 'end': '2031-09-01', 'price': '150.00'}
+    rate = spend(client, 'POST', reverse('rate-list-create'), data, status.HTTP_201_CREATED).json()
+    spend(client, 'GET', reverse('rate-list-create'))
+    detail = reverse('rate-detail', args=[rate['id']])
+    spend(client, 'GET', detail)
+    spend(client, 'PUT', detail, {**data, 'weekdays': [4, 5]})
+    spend(client, 'PATCH', detail, {'price': '160.00'})
+    spend(client, 'DELETE', detail, expected=status.HTTP_204_NO_CONTENT)
+    assert not Rate.objects.exists() and RoomType.objects.exists()
+
+@pytest.mark.django_db(transaction=True)
+def test_authentication_route_budgets(settings):
+    client = APIClient()
+    data = {'username': 'new', 'email': 'new@example.com', 'password': 'StrongPass1234!'}
+    spend(client, 'POST', reverse('register'), data, status.HTTP_201_CREATED)
+    Property.objects.get(pk=DEFAULT_PROPERTY_ID).members.add(User.objects.get(username='new'))
+    # A hasher change makes the login rewrite the stored hash.
+    settings.PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher', *settings.PASSWORD_HASHERS]
+    spend(client, 'POST', reverse('login'), {'username': 'new', 'password': 'StrongPass1234!', 'property': 'main'})
+
+@pytest.mark.django_db
+def test_over_budget_request_fails_in_strict_mode(monkeypatch, settings, caplog):
+    client = auth_client(User.objects.create_user(username='user', email='user@example.com', password='User1234!'))
+    monkeypatch.setattr(RoomListCreateView, 'query_budget', {'GET': 1})
+    with pytest.raises(QueryBudgetExceeded, match='GET room-list-create ran 2 queries, over its budget of 1'):
+        client.get(reverse('room-list-create'))
+
+    settings.QUERY_BUDGET_STRICT = False
+    with caplog.at_level(logging.WARNING, logger='pmsapi.querybudget'):
+        assert client.get(reverse('room-list-create')).status_code == status.HTTP_200_OK
+    assert 'over its budget of 1' in caplog.text
+
+def test_repeated_query_shapes_are_reported():
+    stats = metrics.RequestMetrics(capture_sql=True)
+    lazy_load = 'SELECT "rooms_room"."number" FROM "rooms_room" WHERE "rooms_room"."id" = %s'
+    stats.sql = [(0.001, sql) for sql in ['SAVEPOINT "s1"', lazy_load, lazy_load, 'SELECT 1 WHERE id IN (%s, %s)']]
+    stats.queries = len(stats.sql)
+    assert check('booking-list-create', 'GET', 3, stats) == []
+
+    # IN lists of any length are the same query.
+    stats.sql += [(0.001, lazy_load), (0.001, 'SELECT 1 WHERE id IN (%s, %s, %s)'), (0.001, 'SELECT 1 WHERE id IN (%s,%s)')]
+    stats.queries = len(stats.sql)
+    assert check('booking-list-create', 'GET', 5, stats) == [
+        'GET booking-list-create ran 6 queries, over its budget of 5',
+        f'GET booking-list-create ran the same query 3 times (N+1?): {lazy_load}',
+        'GET booking-list-create ran the same query 3 times (N+1?): SELECT 1 WHERE id IN (%s, ...)',
+    ]
+
+@pytest.mark.django_db
+def test_booking_str_does_not_query(django_assert_num_queries):
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    booking = Booking.objects.create(user=user, room=Room.objects.create(number='101', price='100.00'))
+    loaded = Booking.objects.select_related('room', 'user').get()
+    with django_assert_num_queries(0):
+        assert str(loaded) == f'Booking {booking.pk} for Room 101 by user'
+    booking = Booking.objects.get()
+    with django_assert_num_queries(0):
+        assert str(booking) == f'Booking {booking.pk} for Room #{booking.room_id} by user #{user.pk}'
@@ -0,0 +1,65 @@
+import datetime
+
+import pytest
+from django.db import IntegrityError, connection, transaction
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rooms.models import DEFAULT_PROPERTY_ID, Room
+from bookings.models import Booking
+
+def plan(queryset):
+    """EXPLAIN output for the queryset, with Postgres told to prefer indexes as it would on a full-size table."""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+    return queryset.explain()
+
+def scans_table(plan, table):
+    """True if the plan reads every row of ``table`` rather than going through an index."""
+    if connection.vendor == 'postgresql':
+        return f'Seq Scan on {table}' in plan
+    return any(line.endswith(f'SCAN {table}') for line in plan.splitlines())
+
+@pytest.fixture
+def hotel():
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    rooms = Room.objects.bulk_create(Room(number=str(100 + i), price='100.00') for i in range(20))
+    Booking.objects.create(user=user, room=rooms[0])
+    return user, rooms
+
+@pytest.mark.skipif(connection.vendor not in ('sqlite', 'postgresql'), reason="Plan format is backend specific.")
+@pytest.mark.django_db
+def test_hot_queries_use_indexes(hotel):
+    user, rooms = hotel
+    # CheckOutView: the guest's open stay in a given room.
+    checkout = plan(Booking.objects.filter(user_id=user.id, status='CHECKED_IN', room__number__in=['100']))
+    assert 'booking_one_checked_in_per_room' in checkout or 'booking_user_status_idx' in checkout
+    assert not scans_table(checkout, 'bookings_booking')
+
+    reservations = plan(Booking.objects.filter(user_id=user.id, status='RESERVED'))
+    assert 'booking_user_status_idx' in reservations
+
+    current_stay = plan(Booking.objects.filter(room_id=rooms[0].id, status='CHECKED_IN'))
+    assert 'booking_one_checked_in_per_room' in current_stay
+
+    available = plan(Room.objects.in_property(DEFAULT_PROPERTY_ID).filter(is_available=True).order_by('id')[:50])
+    assert 'room_available_idx' in available
+    assert not scans_table(available, 'rooms_room')
+
+    # One property's month of bookings is a single range of the property-leading index.
+    start, end = (datetime.datetime(2031, month, 1, tzinfo=datetime.timezone.utc) for month in (1, 2))
+    month = plan(Booking.objects.in_property(DEFAULT_PROPERTY_ID).filter(check_in__gte=start, check_in__lt=end))
+    assert 'booking_property_check_in_idx' in month
+    assert not scans_table(month, 'bookings_booking')
+
+@pytest.mark.django_db
+def test_one_checked_in_booking_per_room(hotel):
+    user, rooms = hotel
+    # Stays before the open checked-in one, so only the constraint under test can object.
+    today = timezone.localdate()
+    def days_ago(first, last):
+        return {'arrival': today - datetime.timedelta(days=first), 'departure': today - datetime.timedelta(days=last)}
+    with pytest.raises(IntegrityError), transaction.atomic():
+        Booking.objects.create(user=user, room=rooms[0], **days_ago(9, 7))
+    Booking.objects.create(user=user, room=rooms[0], status='CHECKED_OUT', **days_ago(6, 4))
+    Booking.objects.create(user=user, room=rooms[0], status='RESERVED', **days_ago(3, 1))
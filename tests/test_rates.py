@@ -0,0 +1,139 @@
+import datetime
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from bookings.models import Booking
+from rates.calendar import price_calendar
+from rates.models import Rate, RoomType
+from rooms.models import DEFAULT_PROPERTY_ID, Property, Room
+from tests.test_tenancy import property_client
+
+def auth_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+    return client
+
+def night_by_night(room, first, nights):
+    """Reference price: look up the winning rate of every night separately."""
+    rates = list(Rate.objects.filter(property_id=room.property_id))
+    total = Decimal(0)
+    for night in (first + datetime.timedelta(days=i) for i in range(nights)):
+        applicable = [
+            rate for rate in rates
+            if rate.room_type_id in (None, room.room_type_id)
+            and (rate.start is None or rate.start <= night) and (rate.end is None or night < rate.end)
+            and rate.weekdays >> night.weekday() & 1
+        ]
+        best = max(applicable, key=lambda rate: (rate.priority, rate.room_type_id is not None, rate.pk), default=None)
+        total += Decimal(best.price if best else room.price)
+    return total
+
+@pytest.fixture
+def rate_plan():
+    """A double (property-wide rates only) and a suite with a year-round rate, a summer season and weekend prices."""
+    today = timezone.localdate()
+    suite = RoomType.objects.create(code='suite', name='Suite')
+    double = Room.objects.create(number='101', price='100.00')
+    suite_room = Room.objects.create(number='201', price='180.00', room_type=suite)
+    summer = datetime.date(today.year, 6, 1)
+    Rate.objects.create(name='Suite', room_type=suite, price='200.00')
+    Rate.objects.create(name='Summer', start=summer, end=summer + datetime.timedelta(days=92), price='150.00')
+    # Friday and Saturday nights.
+    Rate.objects.create(name='Suite weekend', room_type=suite, weekdays=0b0110000, price='260.00', priority=1)
+    Rate.objects.create(name='Gala', start=today + datetime.timedelta(days=10), end=today + datetime.timedelta(days=12), price='400.00', priority=5)
+    return double, suite_room
+
+@pytest.mark.django_db
+def test_calendar_matches_night_by_night_pricing(rate_plan, settings):
+    settings.RATE_CALENDAR_DAYS = 60
+    settings.RATE_CALENDAR_PAST_DAYS = 30
+    today = timezone.localdate()
+    calendar = price_calendar(DEFAULT_PROPERTY_ID)
+    # Inside the window, across its edges, and far outside it.
+    stays = [(0, 1), (0, 14), (-30, 90), (-40, 20), (50, 30), (3, 365), (400, 9), (-800, 2)]
+    for room in rate_plan:
+        for offset, nights in stays:
+            first = today + datetime.timedelta(days=offset)
+            assert calendar.stay_price(room.pk, first, nights) == night_by_night(room, first, nights), (room.number, offset, nights)
+    assert calendar.stay_price(0, today, 1) is None
+
+@pytest.mark.django_db
+def test_quote_endpoint(rate_plan):
+    double, suite_room = rate_plan
+    client = auth_client(User.objects.create_user(username='user', email='user@example.com', password='User1234!'))
+    admin = auth_client(User.objects.create_user(username='admin', email='admin@example.com', password='Admin1234!', is_staff=True))
+    start = timezone.localdate() + datetime.timedelta(days=7)
+    end = start + datetime.timedelta(days=365)
+
+    response = client.get(reverse('room-quote', args=[suite_room.pk]), {'start': start, 'end': end})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        'room': suite_room.pk, 'start': start.isoformat(), 'end': end.isoformat(), 'nights': 365,
+        'total': str(night_by_night(suite_room, start, 365)),
+    }
+    # A current calendar answers from memory: only the token's user is loaded.
+    with CaptureQueriesContext(connection) as ctx:
+        client.get(reverse('room-quote', args=[double.pk]), {'start': start, 'end': end})
+    assert len(ctx.captured_queries) == 1
+
+    # Rate edits reach the next quote.
+    rate = Rate.objects.get(name='Suite')
+    assert admin.patch(reverse('rate-detail', args=[rate.pk]), {'price': '210.00'}, format='json').status_code == status.HTTP_200_OK
+    total = client.get(reverse('room-quote', args=[suite_room.pk]), {'start': start, 'end': end}).json()['total']
+    assert total == str(night_by_night(suite_room, start, 365))
+
+    assert client.get(reverse('room-quote', args=[suite_room.pk]), {'start': end, 'end': start}).status_code == status.HTTP_400_BAD_REQUEST
+    far = start + datetime.timedelta(days=732)
+    assert client.get(reverse('room-quote', args=[suite_room.pk]), {'start': start, 'end': far}).status_code == status.HTTP_400_BAD_REQUEST
+    lake = Property.objects.create(code='lake', name='Lake')
+    other = Room.objects.create(property=lake, number='101', price='90.00')
+    assert client.get(reverse('room-quote', args=[other.pk]), {'start': start, 'end': end}).status_code == status.HTTP_404_NOT_FOUND
+
+@pytest.mark.django_db
+def test_rates_api_is_staff_only_and_scoped_to_the_property(rate_plan):
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    assert auth_client(user).get(reverse('rate-list-create')).status_code == status.HTTP_403_FORBIDDEN
+    staff = User.objects.create_user(username='admin', email='admin@example.com', password='Admin1234!', is_staff=True)
+    lake = Property.objects.create(code='lake', name='Lake')
+    suite = RoomType.objects.get(code='suite')
+
+    lake_client = property_client(staff, lake)
+    response = lake_client.post(reverse('rate-list-create'), {'name': 'Suite', 'room_type': suite.pk, 'price': '90.00'}, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    response = lake_client.post(reverse('room-list-create'), {'number': '1', 'price': '90.00', 'is_available': True, 'room_type': suite.pk}, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    response = lake_client.post(reverse('rate-list-create'), {'name': 'Weekend', 'weekdays': [5, 6, 5], 'price': '120.00'}, format='json')
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()['weekdays'] == [5, 6]
+    assert [rate['name'] for rate in lake_client.get(reverse('rate-list-create')).json()['results']] == ['Weekend']
+    for data in ({'weekdays': []}, {'weekdays': [7]}, {'start': '2031-01-02', 'end': '2031-01-01'}):
+        response = lake_client.post(reverse('rate-list-create'), {'name': 'Bad', 'price': '1.00', **data}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST, data
+
+@pytest.mark.django_db
+def test_checkout_and_night_audit_charge_the_rates():
+    client = auth_client(User.objects.create_user(username='user', email='user@example.com', password='User1234!'))
+    user = User.objects.get()
+    today = timezone.localdate()
+    rooms = [Room.objects.create(number=str(100 + i), price='100.00', is_available=False) for i in range(3)]
+    # Three nights ending last night, the middle one at a higher rate.
+    Rate.objects.create(name='Festival', start=today - datetime.timedelta(days=2), end=today - datetime.timedelta(days=1), price='250.00')
+    check_in = timezone.now() - datetime.timedelta(days=3)
+    bookings = [Booking.objects.create(user=user, room=room, departure=today) for room in rooms]
+    Booking.objects.filter(pk__in=[b.pk for b in bookings]).update(check_in=check_in)
+
+    response = client.post(reverse('booking-checkout'), {'room_number': '100'}, format='json')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['full_price'] == '450.00'
+    call_command('settle_overdue', stdout=StringIO())
+    assert list(Booking.objects.order_by('pk').values_list('full_price', flat=True)) == [Decimal('450.00')] * 3
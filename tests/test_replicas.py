@@ -0,0 +1,105 @@
+import os
+import time
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from bookings.models import Booking
+from pmsapi.replicas import copy_sqlite_replica
+from rooms.models import Room
+from tests.test_async import clients
+
+def client_for(username):
+    user = User.objects.create_user(username=username, email=f'{username}@example.com', password='User1234!')
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+    return client
+
+def numbers(response):
+    assert response.status_code == status.HTTP_200_OK
+    return sorted(room['number'] for room in response.json()['results'])
+
+@pytest.fixture
+def replica(transactional_db, tmp_path, settings):
+    """A second SQLite file holding a copy of the primary, used as the only replica. Returns a guest's client."""
+    # Checked once the test database exists: the settings' NAME says nothing about the test database's.
+    if connection.vendor != 'sqlite' or connection.is_in_memory_db():
+        pytest.skip("Replicas are tested with two SQLite files.")
+    settings.DATABASE_REPLICAS = ['replica']
+    settings.DB_REPLICA_MAX_LAG = 60
+    settings.DB_REPLICA_LAG_CHECK_INTERVAL = 0
+    # A connection outside DATABASES (so for this thread only), which the test case's database guard allows.
+    primary = connections['default']
+    connections['replica'] = type(primary)({**primary.settings_dict, 'NAME': str(tmp_path / 'replica.sqlite3')}, 'replica')
+    guest = client_for('guest')
+    Room.objects.bulk_create(Room(number=str(101 + i), price='100.00') for i in range(3))
+    copy_sqlite_replica('replica')
+    yield guest
+    connections['replica'].close()
+    del connections['replica']
+
+@pytest.mark.django_db(transaction=True)
+def test_safe_requests_read_from_the_replica(replica):
+    Room.objects.create(number='104', price='100.00')
+    assert Room.objects.count() == 4
+
+    with CaptureQueriesContext(connections['replica']) as reads:
+        assert numbers(replica.get(reverse('room-list-create'))) == ['101', '102', '103']
+    assert reads.captured_queries
+    response = replica.post(reverse('room-list-create'), {'number': '105', 'price': '100.00', 'is_available': True}, format='json')
+    assert response.status_code == status.HTTP_201_CREATED
+    assert Room.objects.filter(number='105').exists()
+
+    copy_sqlite_replica('replica')
+    assert numbers(client_for('other').get(reverse('room-list-create'))) == ['101', '102', '103', '104', '105']
+
+@pytest.mark.django_db(transaction=True)
+def test_writers_read_their_writes_from_the_primary(replica, settings):
+    response = replica.post(reverse('booking-list-create'), {'room_number': '101'}, format='json')
+    assert response.status_code == status.HTTP_201_CREATED
+    booking = response.json()['id']
+    assert [b['id'] for b in replica.get(reverse('booking-list-create')).json()['results']] == [booking]
+    assert replica.get(reverse('booking-detail', args=[booking])).status_code == status.HTTP_200_OK
+    # Other guests still read from the replica, which has not seen the check-in yet.
+    room = Room.objects.get(number='101')
+    assert room.is_available is False
+    assert client_for('other').get(reverse('room-detail', args=[room.pk])).json()['is_available'] is True
+
+    # Once the pin has expired the guest reads from the replica again.
+    settings.DB_REPLICA_PIN_SECONDS = 0
+    replica.post(reverse('booking-checkout'), {'room_number': '101'}, format='json')
+    assert replica.get(reverse('booking-list-create')).json()['results'] == []
+    assert Booking.objects.filter(pk=booking, status='CHECKED_OUT').exists()
+
+@pytest.mark.django_db(transaction=True)
+def test_lagging_or_missing_replica_falls_back_to_the_primary(replica, settings, tmp_path):
+    Room.objects.create(number='104', price='100.00')
+    url = reverse('room-list-create')
+    assert numbers(replica.get(url)) == ['101', '102', '103']
+
+    # The primary changed after a copy made two minutes ago.
+    copied = time.time() - 120
+    os.utime(tmp_path / 'replica.sqlite3', (copied, copied))
+    assert numbers(replica.get(url)) == ['101', '102', '103', '104']
+    settings.DB_REPLICA_MAX_LAG = 300
+    assert numbers(replica.get(url)) == ['101', '102', '103']
+
+    connections['replica'].close()
+    os.remove(tmp_path / 'replica.sqlite3')
+    assert numbers(replica.get(url)) == ['101', '102', '103', '104']
+
+@pytest.mark.django_db(transaction=True)
+def test_available_rooms_cache_is_filled_from_the_primary(replica):
+    Room.objects.filter(number='101').update(is_available=False)
+    assert numbers(replica.get(reverse('room-available-list'))) == ['102', '103']
+
+@pytest.mark.django_db(transaction=True)
+def test_async_reads_use_the_replica(replica):
+    _, kiosk = clients(User.objects.get(username='guest'))
+    Room.objects.create(number='104', price='100.00')
+    assert numbers(kiosk.get(reverse('async-room-list'))) == ['101', '102', '103']
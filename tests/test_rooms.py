@@ -4,7 +4,12 @@ from rest_framework import status
 from rest_framework.test import APIClient
 from django.contrib.auth.models import User
 from rest_framework_simplejwt.tokens import AccessToken
-from rooms.models import Room
+from rooms.models import DEFAULT_PROPERTY_ID, Room
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.core.management import call_command
+from decimal import Decimal
+import io
 
 @pytest.mark.django_db
 def test_room_list_create():
@@ -28,7 +33,7 @@ def test_room_list_create():
     # List rooms
     response = client.get(url)
     assert response.status_code == status.HTTP_200_OK
-    assert response.data[0]['number'] == '101'
+    assert response.data['results'][0]['number'] == '101'
 
 @pytest.mark.django_db
 def test_room_detail():
@@ -74,4 +79,187 @@ def test_room_available_list():
     url = reverse('room-available-list')
     response = client.get(url)
     assert response.status_code == status.HTTP_200_OK
-    assert response.data[0]['number'] == '101'
\ No newline at end of file
+    assert response.data['results'][0]['number'] == '101'
+
+@pytest.mark.django_db
+def test_room_list_keyset_pagination_constant_queries():
+    """Every page costs the same queries no matter how deep it is."""
+    client = APIClient()
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    access_token = str(AccessToken.for_user(user))
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {access_token}')
+    Room.objects.bulk_create(Room(number=str(100 + i), price='100.00') for i in range(40))
+
+    url = reverse('room-list-create') + '?page_size=5'
+    numbers, query_counts = [], []
+    while url:
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert 'count' not in response.data
+        numbers += [room['number'] for room in response.data['results']]
+        query_counts.append(len(ctx.captured_queries))
+        url = response.data['next']
+    assert numbers == [str(100 + i) for i in range(40)]
+    assert len(set(query_counts)) == 1
+
+@pytest.mark.django_db
+def test_room_list_sparse_fields():
+    """?fields= trims list and detail responses."""
+    client = APIClient()
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    access_token = str(AccessToken.for_user(user))
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {access_token}')
+    room = Room.objects.create(number='101', price='100.00', is_available=True)
+
+    response = client.get(reverse('room-list-create'), {'fields': 'id,number'})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['results'][0] == {'id': room.id, 'number': '101'}
+    response = client.get(reverse('room-detail', kwargs={'pk': room.id}), {'fields': 'price'})
+    assert response.data == {'price': '100.00'}
+
+
+@pytest.mark.django_db
+def test_room_available_list_etag():
+    """Unchanged polls get 304 without touching the rooms table."""
+    client = APIClient()
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    access_token = str(AccessToken.for_user(user))
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {access_token}')
+    Room.objects.create(number='101', price='100.00', is_available=True)
+
+    url = reverse('room-available-list')
+    response = client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    etag = response['ETag']
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not any('rooms_room' in q['sql'] for q in ctx.captured_queries)
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert response['ETag'] == etag
+    assert not any('rooms_room' in q['sql'] for q in ctx.captured_queries)
+
+@pytest.mark.django_db
+def test_room_available_list_invalidation():
+    """Room edits, check-ins and checkouts invalidate the cached listing."""
+    client = APIClient()
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    access_token = str(AccessToken.for_user(user))
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {access_token}')
+    room = Room.objects.create(number='101', price='100.00', is_available=True)
+    url = reverse('room-available-list')
+
+    def available():
+        response = client.get(url)
+        return response['ETag'], {r['number']: r['price'] for r in response.data['results']}
+
+    etag, rooms = available()
+    assert rooms == {'101': '100.00'}
+
+    client.put(reverse('room-detail', kwargs={'pk': room.id}), {'number': '101', 'price': '120.00', 'is_available': True}, format='json')
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+    etag, rooms = available()
+    assert rooms == {'101': '120.00'}
+
+    client.post(reverse('booking-list-create'), {'room_number': '101'}, format='json')
+    etag, rooms = available()
+    assert rooms == {}
+
+    client.post(reverse('booking-checkout'), {'room_number': '101'}, format='json')
+    etag, rooms = available()
+    assert rooms == {'101': '120.00'}
+
+
+@pytest.mark.django_db
+def test_import_rooms_command(tmp_path):
+    """CSV rows are validated with the room rules and written in batches; --update upserts existing rooms."""
+    Room.objects.create(number='101', price='80.00', is_available=True)
+    path = tmp_path / 'rooms.csv'
+    path.write_text('number,price,is_available\n101,100.00,true\n102,120.00,false\n103,-1,true\n104,90.00,true\n')
+    out, err = io.StringIO(), io.StringIO()
+    call_command('import_rooms', str(path), '--batch-size', '2', stdout=out, stderr=err)
+    assert '2 created, 0 updated, 1 unchanged, 1 invalid' in out.getvalue()
+    assert 'Line 4' in err.getvalue()
+    assert Room.objects.get(number='101').price == Decimal('80.00')
+    assert Room.objects.get(number='102').is_available is False
+
+    stdin = io.StringIO('{"number": "101", "price": "100.00", "is_available": true}\n\n{"number": "105", "price": "70.00", "is_available": true}\n')
+    out = io.StringIO()
+    call_command('import_rooms', '-', '--format', 'jsonl', '--update', stdin=stdin, stdout=out, stderr=io.StringIO())
+    assert '1 created, 1 updated' in out.getvalue()
+    assert Room.objects.get(number='101').price == Decimal('100.00')
+    assert Room.objects.count() == 4
+
+@pytest.mark.parametrize('broker_class', ['InProcessBroker', 'CacheBroker'])
+def test_room_event_brokers(broker_class):
+    from rooms import events
+    broker = getattr(events, broker_class)(buffer_size=3)
+    start = broker.last_seq()
+    assert broker.since(start) == []
+    broker.publish([{'id': 1}, {'id': 2}])
+    assert broker.since(start) == [(start + 1, {'id': 1}), (start + 2, {'id': 2})]
+    assert broker.since(start + 2) == []
+    broker.publish([{'id': 3}, {'id': 4}])
+    # Only the last three events are kept: resuming from before them needs a full refetch.
+    assert broker.since(start) == events.RESET
+    assert broker.since(start + 1) == [(start + 2, {'id': 2}), (start + 3, {'id': 3}), (start + 4, {'id': 4})]
+    assert broker.since(start + 10) == events.RESET
+
+@pytest.mark.django_db
+def test_room_changes_are_published_on_commit(django_capture_on_commit_callbacks):
+    from rooms.events import get_broker
+    broker = get_broker()
+    with django_capture_on_commit_callbacks(execute=True):
+        room = Room.objects.create(number='101', price='100.00', is_available=True)
+    start = broker.last_seq()
+    with django_capture_on_commit_callbacks(execute=True):
+        Room.objects.claim(room.pk)
+    with django_capture_on_commit_callbacks(execute=True):
+        # Changes in one transaction are published together, in their final state.
+        Room.objects.release(room.pk)
+        Room.objects.claim(room.pk)
+    with django_capture_on_commit_callbacks(execute=True):
+        Room.objects.filter(pk=room.pk).delete()
+    assert [payload for _, payload in broker.since(start)] == [
+        {'id': room.pk, 'property': room.property_id, 'number': '101', 'price': '100.00', 'is_available': False},
+        {'id': room.pk, 'property': room.property_id, 'number': '101', 'price': '100.00', 'is_available': False},
+        {'id': room.pk, 'property': room.property_id, 'deleted': True},
+    ]
+
+@pytest.mark.django_db
+def test_room_events_stream():
+    """A new subscriber gets a ready event, then live room events; a stale resume gets a reset."""
+    from asgiref.sync import async_to_sync
+    from django.test import AsyncClient
+    from rooms.events import get_broker
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+    broker = get_broker()
+    url = reverse('async-room-events')
+
+    async def read(after=None, publish=None):
+        response = await AsyncClient().get(url, headers={**headers, **({'Last-Event-ID': str(after)} if after else {})})
+        assert response['Content-Type'] == 'text/event-stream'
+        stream = aiter(response.streaming_content)
+        chunks = [(await anext(stream)).decode()]
+        if publish:
+            broker.publish(publish)
+            chunks.append((await anext(stream)).decode())
+        await stream.aclose()
+        return chunks
+
+    seq = broker.last_seq()
+    ready, room = async_to_sync(read)(publish=[{'id': 7, 'property': DEFAULT_PROPERTY_ID, 'is_available': True}])
+    assert ready == f'id: {seq}\nevent: ready\ndata: {{}}\n\n'
+    assert room == f'id: {seq + 1}\nevent: room\ndata: {{"id":7,"property":{DEFAULT_PROPERTY_ID},"is_available":true}}\n\n'
+    assert async_to_sync(read)(after=seq) == [room]
+    assert async_to_sync(read)(after=1)[0].startswith(f'id: {seq + 1}\nevent: reset')
+    # The WSGI service does not hold endless streams.
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=headers['Authorization'])
+    assert client.get(url).status_code == status.HTTP_404_NOT_FOUND
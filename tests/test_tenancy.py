@@ -0,0 +1,142 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from analytics.rollups import rebuild
+from bookings.models import Booking
+from rooms.models import DEFAULT_PROPERTY_ID, Property, Room
+from rooms.tenancy import PROPERTY_CLAIM
+
+def property_client(user, prop):
+    token = AccessToken.for_user(user)
+    token[PROPERTY_CLAIM] = prop.pk
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+@pytest.fixture
+def properties():
+    main = Property.objects.get(pk=DEFAULT_PROPERTY_ID)
+    lake = Property.objects.create(code='lake', name='Lake')
+    return main, lake
+
+@pytest.mark.django_db
+def test_login_chooses_a_property_the_user_belongs_to(properties):
+    main, lake = properties
+    client = APIClient()
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    lake.members.add(user)
+    User.objects.create_user(username='manager', email='manager@example.com', password='User1234!', is_staff=True)
+
+    response = client.post(reverse('login'), {'username': 'user', 'password': 'User1234!', 'property': 'lake'}, format='json')
+    assert response.status_code == status.HTTP_200_OK
+    assert AccessToken(response.data['access'])[PROPERTY_CLAIM] == lake.pk
+
+    # Every user may work in the default property, which is also the one logged in to without a code.
+    for data in ({}, {'property': 'main'}):
+        response = client.post(reverse('login'), {'username': 'user', 'password': 'User1234!', **data}, format='json')
+        assert AccessToken(response.data['access'])[PROPERTY_CLAIM] == main.pk
+
+    User.objects.create_user(username='outsider', email='outsider@example.com', password='User1234!')
+    for username, code in (('outsider', 'lake'), ('user', 'nowhere')):
+        response = client.post(reverse('login'), {'username': username, 'password': 'User1234!', 'property': code}, format='json')
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert response.data['detail'].code == 'property_access_denied'
+    # Staff may work in any property.
+    response = client.post(reverse('login'), {'username': 'manager', 'password': 'User1234!', 'property': 'lake'}, format='json')
+    assert AccessToken(response.data['access'])[PROPERTY_CLAIM] == lake.pk
+
+@pytest.mark.django_db
+def test_tokens_without_a_property_work_in_the_default_one(properties):
+    """Tokens issued before logins chose a property keep working until they expire."""
+    main, lake = properties
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    Room.objects.create(number='101', price='100.00')
+    Room.objects.create(property=lake, number='201', price='100.00')
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+    for url in (reverse('room-list-create'), reverse('async-room-list')):
+        response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert [room['number'] for room in response.json()['results']] == ['101']
+
+@pytest.mark.django_db
+def test_properties_only_see_their_own_rooms_and_bookings(properties):
+    main, lake = properties
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    main_client, lake_client = property_client(user, main), property_client(user, lake)
+    # Room numbers are unique within a property only.
+    main_room = Room.objects.create(number='101', price='100.00')
+    response = lake_client.post(reverse('room-list-create'), {'number': '101', 'price': '200.00', 'is_available': True}, format='json')
+    assert response.status_code == status.HTTP_201_CREATED
+    lake_room = Room.objects.get(pk=response.data['id'])
+    assert lake_room.property_id == lake.pk
+    response = lake_client.post(reverse('room-list-create'), {'number': '101', 'price': '200.00', 'is_available': True}, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    assert [room['id'] for room in main_client.get(reverse('room-list-create')).data['results']] == [main_room.pk]
+    assert [room['id'] for room in lake_client.get(reverse('room-available-list')).data['results']] == [lake_room.pk]
+    assert main_client.get(reverse('room-detail', args=[lake_room.pk])).status_code == status.HTTP_404_NOT_FOUND
+
+    # The same room number books, and checks out, the room of the token's property.
+    response = lake_client.post(reverse('booking-list-create'), {'room_number': '101'}, format='json')
+    assert response.status_code == status.HTTP_201_CREATED
+    booking = Booking.objects.get(pk=response.data['id'])
+    assert (booking.room_id, booking.property_id) == (lake_room.pk, lake.pk)
+    assert main_client.get(reverse('booking-detail', args=[booking.pk])).status_code == status.HTTP_404_NOT_FOUND
+    assert main_client.get(reverse('booking-list-create')).data['results'] == []
+    response = main_client.post(reverse('booking-checkout'), {'room_number': '101'}, format='json')
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert lake_client.post(reverse('booking-checkout'), {'room_number': '101'}, format='json').status_code == status.HTTP_200_OK
+    assert Booking.objects.get(pk=booking.pk).status == 'CHECKED_OUT'
+
+@pytest.mark.django_db
+def test_reports_cover_one_property(properties):
+    main, lake = properties
+    guest = User.objects.create_user(username='guest', email='guest@example.com', password='User1234!')
+    manager = User.objects.create_user(username='manager', email='manager@example.com', password='User1234!', is_staff=True)
+    check_in = timezone.now() - timedelta(days=2)
+    for prop, price in ((main, '100.00'), (lake, '300.00')):
+        room = Room.objects.create(property=prop, number='101', price=price)
+        booking = Booking.objects.create(user=guest, room=room, status='CHECKED_OUT', check_out=timezone.now(), full_price=price)
+        Booking.objects.filter(pk=booking.pk).update(check_in=check_in)
+    rebuild(timezone.localdate(check_in), timezone.localdate())
+
+    first = timezone.localdate(check_in)
+    params = {'start': first.isoformat(), 'end': (first + timedelta(days=2)).isoformat()}
+    for prop, revenue in ((main, '100.00'), (lake, '300.00')):
+        response = property_client(manager, prop).get(reverse('report-revenue'), params)
+        assert response.data['totals']['revenue'] == revenue
+
+@pytest.mark.django_db
+def test_room_events_are_scoped_to_the_property(properties, django_capture_on_commit_callbacks):
+    """Subscribers only hear about their property's rooms, deletions included."""
+    from asgiref.sync import async_to_sync
+    from django.test import AsyncClient
+    from rooms.events import get_broker
+    main, lake = properties
+    user = User.objects.create_user(username='user', email='user@example.com', password='User1234!')
+    with django_capture_on_commit_callbacks(execute=True):
+        main_room = Room.objects.create(number='101', price='100.00')
+        lake_room = Room.objects.create(property=lake, number='101', price='100.00')
+    token = AccessToken.for_user(user)
+    token[PROPERTY_CLAIM] = lake.pk
+    seq, lake_room_id = get_broker().last_seq(), lake_room.pk
+    with django_capture_on_commit_callbacks(execute=True):
+        main_room.delete()
+        lake_room.delete()
+
+    async def first_event():
+        headers = {'Authorization': f'Bearer {token}', 'Last-Event-ID': str(seq)}
+        response = await AsyncClient().get(reverse('async-room-events'), headers=headers)
+        stream = aiter(response.streaming_content)
+        event = (await anext(stream)).decode()
+        await stream.aclose()
+        return event
+
+    assert async_to_sync(first_event)() == f'id: {seq + 2}\nevent: room\ndata: {{"id":{lake_room_id},"property":{lake.pk},"deleted":true}}\n\n'